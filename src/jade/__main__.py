@@ -1,6 +1,7 @@
 import argparse
 
 from jade.app.app import JadeApp
+from jade.run.monitor import DEFAULT_POLL_INTERVAL, DEFAULT_WAIT_POLLS
 
 
 def main():
@@ -13,6 +14,17 @@ def main():
         const=True,
         default=False,
     )
+    parser.add_argument(
+        "--jobs",
+        help="number of parallel processes to use for the raw processing and post-processing",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--store",
+        help="also store the raw results of each benchmark in a Parquet file",
+        action="store_true",
+    )
     parser.add_argument(
         "--pp", help="perform complete post-process of the results", action="store_true"
     )
@@ -27,6 +39,37 @@ def main():
         help="Continue the run for not simulated inputs",
         action="store_true",
     )
+    parser.add_argument(
+        "--watch",
+        help="monitor the simulations until they complete, optionally specify the "
+        "poll interval in seconds. Combined with --raw, the raw data of each "
+        "simulation are processed as soon as it completes",
+        nargs="?",
+        type=float,
+        const=DEFAULT_POLL_INTERVAL,
+        default=None,
+    )
+    parser.add_argument(
+        "--watch-timeout",
+        help="maximum time in seconds to monitor the simulations with --watch",
+        type=float,
+        default=None,
+    )
+    parser.add_argument(
+        "--watch-stall",
+        help="number of polls without output changes after which a started "
+        "simulation followed by --watch is reported as stalled and no longer followed",
+        type=int,
+        default=None,
+    )
+    parser.add_argument(
+        "--watch-wait",
+        help="number of polls after which a simulation followed by --watch that "
+        "never started (e.g. still in the queue) is no longer followed. "
+        "0 to wait with no limit",
+        type=int,
+        default=DEFAULT_WAIT_POLLS,
+    )
 
     args = parser.parse_args()
 
@@ -46,11 +89,19 @@ def main():
             raise ValueError("Invalid argument for --raw. Use 'force' or leave empty.")
         else:
             force = False
-        app.raw_process(force=force)
+        app.raw_process(force=force, jobs=args.jobs, store=args.store)
     if args.pp:
-        app.post_process()
+        app.post_process(jobs=args.jobs)
     if args.cnt:
         app.continue_run()
+    if args.watch is not None:
+        app.watch(
+            poll_interval=args.watch,
+            raw=bool(args.raw),
+            timeout=args.watch_timeout,
+            stall_polls=args.watch_stall,
+            wait_polls=args.watch_wait or None,
+        )
 
 
 if __name__ == "__main__":
@@ -15,20 +15,43 @@ from jade import resources
 from jade.app.fetch import fetch_f4e_inputs, fetch_iaea_inputs
 from jade.config.paths_tree import PathsTree
 from jade.config.pp_config import PostProcessConfig
-from jade.config.raw_config import ConfigRawProcessor
 from jade.config.run_config import RunConfig, RunMode
 from jade.config.status import GlobalStatus
-from jade.helper.__optionals__ import TKINTER_AVAIL
+from jade.helper.__optionals__ import PYARROW_AVAIL, TKINTER_AVAIL
 
 if TKINTER_AVAIL:
     from jade.gui.post_config_gui import PostConfigGUI
     from jade.gui.run_config_gui import ConfigGUI
 from jade.helper.aux_functions import PathLike, add_rmode0, get_code_lib, print_code_lib
 from jade.helper.constants import CODE, EXP_TAG, FIRST_INITIALIZATION, JADE_TITLE
-from jade.post.atlas_processor import AtlasProcessor
-from jade.post.excel_processor import ExcelProcessor
-from jade.post.raw_processor import RawProcessor
+from jade.helper.errors import PostProcessConfigError
+from jade.post.plot_cache import PLOT_CACHE_FOLDER, PlotImageCache
+from jade.post.pp_tasks import (
+    PostProcessTask,
+    post_process_parallel,
+    process_benchmark,
+)
+from jade.post.raw_manifest import (
+    MANIFEST_FILE,
+    RawManifest,
+)
+from jade.post.raw_plan import RawProcessingPlan
+from jade.post.raw_processor import RawProcessor, process_raw_parallel
+from jade.post.raw_store import (
+    RAW_STORE_FILE,
+    remove_raw_store,
+    write_raw_index,
+    write_raw_store,
+)
 from jade.run.benchmark import BenchmarkRunFactory, launch_global_jobs
+from jade.run.local_pool import LocalRun, run_local_pool
+from jade.run.monitor import (
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_WAIT_POLLS,
+    MonitoredRun,
+    RunMonitor,
+)
+from jade.run.scheduling import sort_longest_first
 
 DEFAULT_SETTINGS_PATH = files(res).joinpath("default_cfg")
 
@@ -166,6 +189,8 @@ class JadeApp:
                 )
                 commands = benchmark.run()
                 run_commands.extend(commands)
+            # the longest simulations of all benchmarks are started first
+            run_commands = sort_longest_first(run_commands, lambda x: x[2])
             # In case only one job is requested, build it after all commands
             # have been collected
             if self.run_cfg.env_vars.run_mode == RunMode.GLOBAL_JOB:
@@ -174,6 +199,8 @@ class JadeApp:
                 )
                 logging.info("Benchmarks run have been submitted.")
                 return jobs
+            if self.run_cfg.env_vars.run_mode == RunMode.LOCAL_POOL:
+                self._run_local_pool([run for _, run, _ in run_commands])
         logging.info("Benchmarks run completed.")
 
     def continue_run(self, testing: bool = False):
@@ -188,10 +215,119 @@ class JadeApp:
             )
             command = benchmark.continue_run(testing=testing)
             commands.append(command)
+        if self.run_cfg.env_vars.run_mode == RunMode.LOCAL_POOL:
+            self._run_local_pool([run for runs in commands for run in runs])
+            logging.info("Benchmarks run completed.")
+            return commands
         logging.info("Benchmarks run have been submitted.")
         return commands
 
-    def raw_process(self, force: bool = False, subset: list[str] | None = None):
+    def _run_local_pool(self, runs: list[LocalRun | None]) -> None:
+        """Run the queued simulations in the local pool."""
+        # simulations are not queued if only the inputs were requested
+        runs = [run for run in runs if run is not None]
+        if len(runs) == 0:
+            return
+        runs = sort_longest_first(runs, lambda run: run.sim_folder)
+        failed = run_local_pool(runs, self.run_cfg.env_vars.max_concurrent_runs)
+        if len(failed) > 0:
+            logging.warning(
+                "%d simulations failed, check the dump.err file in their folder",
+                len(failed),
+            )
+
+    def watch(
+        self,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        raw: bool = False,
+        timeout: float | None = None,
+        stall_polls: int | None = None,
+        wait_polls: int | None = DEFAULT_WAIT_POLLS,
+    ) -> list[MonitoredRun]:
+        """Monitor the simulations that are not completed yet, reporting their
+        progress and throughput, until all of them complete.
+
+        Parameters
+        ----------
+        poll_interval : float, optional
+            time in seconds between two checks of the simulation folders, by
+            default DEFAULT_POLL_INTERVAL.
+        raw : bool, optional
+            if True, the raw data of each single run are processed as soon as the
+            run completes, while the other simulations are still running. By default
+            False.
+        timeout : float | None, optional
+            maximum time in seconds to monitor the simulations. By default None, no
+            limit.
+        stall_polls : int | None, optional
+            number of consecutive polls without changes in the folder of a run
+            after which the run is reported as stalled and not followed anymore.
+            Only runs that started are counted. By default None, no limit.
+        wait_polls : int | None, optional
+            number of polls after which a run that never started is not followed
+            anymore. None to wait with no limit. By default DEFAULT_WAIT_POLLS.
+
+        Returns
+        -------
+        list[MonitoredRun]
+            runs that were not completed when the monitor stopped.
+        """
+        on_complete = self._process_raw_run if raw else None
+        monitor = RunMonitor(
+            self.tree.simulations,
+            on_complete,
+            stall_polls=stall_polls,
+            wait_polls=wait_polls,
+        )
+        pending = monitor.watch(poll_interval, timeout)
+        self.status.update()
+        return pending
+
+    def _process_raw_run(self, run: MonitoredRun) -> None:
+        """Process the raw data of a single completed run, updating the manifest of
+        its benchmark so that it is not processed again.
+        """
+        cfg_file = Path(
+            self.tree.cfg.bench_raw, f"{run.code.value}/{run.benchmark}.yaml"
+        )
+        try:
+            cfg = RawProcessingPlan.from_yaml(cfg_file)
+        except FileNotFoundError:
+            logging.warning(
+                f"Configuration file for {run.code.value} {run.benchmark} not found"
+            )
+            return
+        out_folder = Path(
+            self.tree.raw, print_code_lib(run.code, run.lib), run.benchmark
+        )
+        manifest = RawManifest.open(out_folder, cfg.config_hash)
+        fingerprint = manifest.check_run(run.name, run.code, run.sim_folder, out_folder)
+        if fingerprint is None:
+            return
+        RawProcessor(cfg, run.sim_folder, out_folder).process_raw_data()
+        manifest.runs[run.name] = fingerprint
+        manifest.dump(out_folder)
+        # the Parquet store is rebuilt by the next raw processing
+        self._sync_raw_folder(out_folder, changed=True, store=False)
+
+    @staticmethod
+    def _sync_raw_folder(out_folder: Path, changed: bool, store: bool) -> None:
+        # keep the Parquet store in sync with the .csv files
+        if store:
+            if changed or not Path(out_folder, RAW_STORE_FILE).exists():
+                write_raw_store(out_folder)
+        elif changed:
+            remove_raw_store(out_folder)
+        # to be done last, the index is checked against the folder mtime
+        write_raw_index(out_folder)
+
+    def raw_process(
+        self,
+        force: bool = False,
+        subset: list[str] | None = None,
+        jobs: int = 1,
+        store: bool = False,
+    ):
         """Process the raw data from the simulations.
 
         Parameters
@@ -201,7 +337,19 @@ class JadeApp:
             previous results, by default False
         subset : list[str] | None, optional
             A list of specific benchmarks to process, by default None
+        jobs : int, optional
+            Number of parallel processes to use. Each single run of a benchmark is
+            processed independently. By default 1 (serial processing).
+        store : bool, optional
+            Whether to also collect the raw data of each benchmark in a single
+            Parquet file, which is then used by the post-processing. The .csv files
+            are always produced. Requires pyarrow. By default False.
         """
+        if store and not PYARROW_AVAIL:
+            raise ImportError(
+                "pyarrow is needed for the Parquet raw data store, install it with "
+                "'pip install jadevv[parquet]'"
+            )
         logging.info("Processing raw data")
         # first identify all simulations that were successful but were not processed
         root_cfg = self.tree.cfg.bench_raw
@@ -209,11 +357,12 @@ class JadeApp:
 
         def get_config(
             root_cfg: Path, code: CODE, bench: str
-        ) -> ConfigRawProcessor | None:
-            # get the correspondent raw processor configuration
+        ) -> RawProcessingPlan | None:
+            # get the correspondent raw processor configuration, compiled only once
+            # for all the libraries
             cfg_file = Path(root_cfg, f"{code.value}/{bench}.yaml")
             try:
-                raw_cfg = ConfigRawProcessor.from_yaml(cfg_file)
+                raw_cfg = RawProcessingPlan.from_yaml(cfg_file)
             except FileNotFoundError:
                 logging.warning(
                     f"Configuration file for {code.value} {bench} not found"
@@ -229,34 +378,98 @@ class JadeApp:
                 if raw_cfg is None:
                     continue
                 to_process[(code, lib, bench)] = raw_cfg
-                logging.info(f"Processing {code.value} {lib} {bench} benchmarks")
             else:
-                # only process if not already done
-                if (code, lib, bench) not in self.status.raw_data:
-                    if subset is not None and bench not in subset:
-                        continue
-                    raw_cfg = get_config(root_cfg, code, bench)
-                    if raw_cfg is None:
-                        continue
-                    to_process[(code, lib, bench)] = raw_cfg
-                    logging.info(f"Processing {code.value} {lib} {bench} benchmarks")
+                if subset is not None and bench not in subset:
+                    continue
+                # raw data produced before the introduction of the manifest cannot
+                # be checked, consider them up to date
+                out_folder = Path(self.tree.raw, print_code_lib(code, lib), bench)
+                if (code, lib, bench) in self.status.raw_data and not Path(
+                    out_folder, MANIFEST_FILE
+                ).exists():
+                    continue
+                raw_cfg = get_config(root_cfg, code, bench)
+                if raw_cfg is None:
+                    continue
+                to_process[(code, lib, bench)] = raw_cfg
 
-        # process the raw data
-        for (code, lib, bench), cfg in tqdm(to_process.items(), desc="Process raw"):
+        # collect the single runs to be processed. Only the runs whose outputs or
+        # raw configuration changed since the last processing are selected
+        units = []
+        pending = []
+        manifests = {}
+        changed = set()
+        for (code, lib, bench), cfg in to_process.items():
             folders = self.tree.get_bench_sim_folders(code, lib, bench)
             out_folder = Path(self.tree.raw, print_code_lib(code, lib), bench)
-            # always ovveride eventual previous results here
-            if out_folder.exists():
-                shutil.rmtree(out_folder)
-            os.makedirs(out_folder, exist_ok=True)
-            for sim_folder, _ in folders:
+            config_hash = cfg.config_hash
+            n_previous = len(units)
+            manifest = RawManifest.open(out_folder, config_hash, reset=force)
+
+            run_names = []
+            for sim_folder, run_name in folders:
+                run_names.append(run_name)
+                fingerprint = manifest.check_run(run_name, code, sim_folder, out_folder)
+                if fingerprint is None:
+                    continue
+                units.append((cfg, sim_folder, out_folder))
+                pending.append((out_folder, run_name, fingerprint))
+            # drop the results of runs that do not exist anymore
+            for run_name in list(manifest.runs):
+                if run_name not in run_names:
+                    manifest.remove_run(run_name, out_folder)
+                    changed.add(out_folder)
+            # runs are added to the manifest only once they have been processed
+            manifest.dump(out_folder)
+            manifests[out_folder] = manifest
+            n_runs = len(units) - n_previous
+            if n_runs > 0:
+                logging.info(
+                    f"Processing {code.value} {lib} {bench} benchmarks ({n_runs} runs)"
+                )
+            else:
+                logging.info(f"Raw data of {code.value} {lib} {bench} are up to date")
+
+        # process the raw data
+        failed = []
+        if jobs > 1:
+            failed = process_raw_parallel(units, jobs)
+            if len(failed) > 0:
+                logging.warning(
+                    "Raw processing failed for %d simulations, check the log",
+                    len(failed),
+                )
+        else:
+            for cfg, sim_folder, out_folder in tqdm(units, desc="Process raw"):
                 processor = RawProcessor(cfg, sim_folder, out_folder)
                 processor.process_raw_data()
 
+        # record the processed runs
+        for (_, sim_folder, _), (out_folder, run_name, fingerprint) in zip(
+            units, pending
+        ):
+            if sim_folder not in failed:
+                manifests[out_folder].runs[run_name] = fingerprint
+        for out_folder, manifest in manifests.items():
+            manifest.dump(out_folder)
+
+        changed.update(out_folder for _, _, out_folder in units)
+        for out_folder in manifests:
+            self._sync_raw_folder(out_folder, out_folder in changed, store)
+
         logging.info("Raw data processing completed.")
 
-    def post_process(self):
-        """Post-process the data."""
+    def post_process(self, jobs: int = 1):
+        """Post-process the data.
+
+        Parameters
+        ----------
+        jobs : int, optional
+            Number of parallel processes to use. The excel and atlas of each
+            benchmark are produced independently. If only one benchmark is
+            post-processed, the processes are used to render the atlas figures
+            instead. By default 1 (serial processing).
+        """
         logging.info("Post-processing data")
         # load the pp code-lib requests
         with open(self.tree.cfg.pp_cfg) as f:
@@ -264,12 +477,20 @@ class JadeApp:
         codelibs_tags = to_pp["code_libs"]
         benchmarks = to_pp["benchmarks"]
 
-        for benchmark in tqdm(benchmarks, desc="Benchmarks"):
-            logging.info(f"Post-processing {benchmark}")
-            # get the benchmark configurations
-            excel_cfg = self.pp_cfg.excel_cfgs[benchmark]
-            atlas_cfg = self.pp_cfg.atlas_cfgs[benchmark]
+        # check the configurations before producing anything
+        for benchmark in benchmarks:
+            if (
+                benchmark not in self.pp_cfg.excel_cfgs
+                or benchmark not in self.pp_cfg.atlas_cfgs
+            ):
+                raise PostProcessConfigError(
+                    f"Excel or atlas configuration not found for {benchmark}"
+                )
 
+        # plots whose inputs did not change are not rendered again
+        plot_cache = PlotImageCache(Path(self.tree.postprocessing, PLOT_CACHE_FOLDER))
+        tasks = []
+        for benchmark in benchmarks:
             code_libs = []
             # if exp is in the libraries, put it always first
             if EXP_TAG in codelibs_tags:
@@ -299,26 +520,33 @@ class JadeApp:
             os.mkdir(excel_folder)
             os.mkdir(atlas_folder)
 
-            # perform the excel processing
-            logging.info("Processing Excel files for %s", benchmark)
-            excel_processor = ExcelProcessor(
-                self.tree.raw,
-                excel_folder,
-                excel_cfg,
-                code_libs,
+            tasks.append(
+                PostProcessTask(
+                    benchmark,
+                    excel_folder,
+                    atlas_folder,
+                    self.pp_cfg.excel_cfgs[benchmark],
+                    self.pp_cfg.atlas_cfgs[benchmark],
+                    code_libs,
+                    plot_cache=plot_cache,
+                )
             )
-            excel_processor.process()
-
-            # perform the atlas processing
-            logging.info("Processing Atlas files for %s", benchmark)
-            atlas_processor = AtlasProcessor(
-                self.tree.raw,
-                atlas_folder,
-                atlas_cfg,
-                code_libs,
-                files(resources).joinpath("atlas_template.docx"),
+
+        template = files(resources).joinpath("atlas_template.docx")
+        # with a single benchmark the processes are better used for the rendering of
+        # the atlas figures
+        if jobs > 1 and len(tasks) > 1:
+            failed = post_process_parallel(
+                self.tree.raw, tasks, template, jobs, self.tree.logs
             )
-            atlas_processor.process()
+            if len(failed) > 0:
+                logging.warning(
+                    "Post-processing failed for: %s, check the log", ", ".join(failed)
+                )
+        else:
+            for task in tqdm(tasks, desc="Benchmarks"):
+                logging.info(f"Post-processing {task.benchmark}")
+                process_benchmark(self.tree.raw, task, template, jobs=jobs)
 
     def start_run_config_gui(self):
         """Start the configuration GUI."""
@@ -49,15 +49,15 @@ class ResultConfig:
         function should also be provided.
     concat_option : TallyConcatOption
         How to combine the tallies
-    apply_to: list[str] | None
+    apply_to: list[str] | str | None
         if None, the result config applies to run. If not, it applies only to
-        the specified runs in the list.
+        the specified runs in the list (or to the single run named by a string).
     """
 
     name: int
     modify: dict[int, list[tuple[TallyModOption, dict]]]
     concat_option: TallyConcatOption
-    apply_to: list[str] | None = None
+    apply_to: list[str] | str | None = None
 
     @classmethod
     def from_dict(cls, dictionary: dict, name) -> ResultConfig:
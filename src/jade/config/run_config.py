@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 import os
 import xml.etree.ElementTree as ET
 from abc import ABC, abstractmethod
@@ -151,6 +152,26 @@ class EnvironmentVariables:
     exe_prefix: str | None
         optional prefix to prepend to all executable commands (e.g. for wrappers like
         srun, mpirun, etc.). By default None.
+    max_concurrent_runs: int | None
+        maximum number of simulations running at the same time if run_mode is
+        "local_pool". The number is limited so that the cores used by all the
+        simulations (MPI tasks x OpenMP threads each) do not exceed the cores of the
+        machine. By default None, as many simulations as the cores allow.
+    global_jobs: int
+        number of jobs the simulations of each code are split into if run_mode is
+        "global_job". The simulations are distributed so that the jobs have a similar
+        estimated duration. Each job requests the resources of a single simulation
+        (MPI tasks x OpenMP threads). By default 1.
+    job_array: bool
+        if True, the jobs of each code are submitted as a single job array whose
+        tasks read their simulations from an index file. This applies to the
+        "global_job" run mode and, for the Sphere and SphereSDDR benchmarks, to the
+        "job" run mode (one task for each single run). By default False.
+    job_array_option: str | None
+        option of the scheduler command requesting a job array, where ``{n}`` is
+        replaced by the number of tasks (e.g. "-J 1-{n}" for PBS Pro). By default
+        None, "--array=1-{n}" for sbatch, "-t 1-{n}" for qsub (Torque) and
+        "-J JADE[1-{n}]" for bsub.
     """
 
     # parallel options
@@ -164,6 +185,10 @@ class EnvironmentVariables:
     scheduler_command: str | None = None
     exe_cfg_root: PathLike | None = None
     exe_prefix: str | None = None
+    max_concurrent_runs: int | None = None
+    global_jobs: int = 1
+    job_array: bool = False
+    job_array_option: str | None = None
 
     def __post_init__(self):
         if self.mpi_tasks is not None:
@@ -177,6 +202,9 @@ class EnvironmentVariables:
             raise ConfigError(
                 "Scheduler command is needed if run_mode is 'job', please provide one"
             )
+        self.global_jobs = int(self.global_jobs)
+        if self.global_jobs < 1:
+            raise ConfigError("global_jobs should be at least 1")
         code_job_template = {}
         if self.code_job_template is not None and self.exe_cfg_root is not None:
             for code, path in self.code_job_template.items():
@@ -188,6 +216,24 @@ class EnvironmentVariables:
                     )
                 code_job_template[code] = path
         self.code_job_template = code_job_template
+        if self.run_mode == RunMode.LOCAL_POOL:
+            max_runs = max(1, (os.cpu_count() or 1) // self.cores_per_run)
+            if self.max_concurrent_runs is None:
+                self.max_concurrent_runs = max_runs
+            elif int(self.max_concurrent_runs) > max_runs:
+                logging.warning(
+                    "max_concurrent_runs reduced from %s to %d: each run uses %d cores",
+                    self.max_concurrent_runs,
+                    max_runs,
+                    self.cores_per_run,
+                )
+                self.max_concurrent_runs = max_runs
+            self.max_concurrent_runs = max(1, int(self.max_concurrent_runs))
+
+    @property
+    def cores_per_run(self) -> int:
+        """Number of cores used by a single simulation."""
+        return max(1, self.mpi_tasks or 1) * max(1, self.openmp_threads or 1)
 
     @classmethod
     def from_yaml(
@@ -219,6 +265,10 @@ class EnvironmentVariables:
             scheduler_command=cfg.get("scheduler_command", None),
             exe_cfg_root=env_cfg_folder,
             exe_prefix=cfg.get("exe_prefix", None),
+            max_concurrent_runs=cfg.get("max_concurrent_runs", None),
+            global_jobs=cfg.get("global_jobs", 1),
+            job_array=cfg.get("job_array", False),
+            job_array_option=cfg.get("job_array_option", None),
         )
 
 
@@ -516,5 +566,6 @@ class RunMode(Enum):
     """Enumeration of the possible run modes for JADE."""
 
     LOCAL = "local"
+    LOCAL_POOL = "local_pool"
     JOB_SUBMISSION = "job"
     GLOBAL_JOB = "global_job"
@@ -11,6 +11,14 @@ except ImportError:
         "OpenMC has not been installed - see JADE installation instructions"
     )
 
+# Columnar raw data store optional dependency
+try:
+    import pyarrow  # noqa: F401
+
+    PYARROW_AVAIL = True
+except ImportError:
+    PYARROW_AVAIL = False
+
 try:
     import tkinter as tk
 
@@ -14,3 +14,7 @@ class PostProcessConfigError(Exception):
     ):
         self.message = message
         super().__init__(self.message)
+
+
+class TallyNotFoundError(KeyError):
+    """Exception raised when a tally is not available in a simulation output."""
@@ -52,24 +52,19 @@ class Atlas:
         width : Inches, optional
             width in docx Inches, by default Inches(7.5)
         """
-        # Convert the figure to an in-memory binary stream
-        img_stream = io.BytesIO()
-        # Be sure to include extra artists if present
-        extra_artists = figure.get_default_bbox_extra_artists()
-        for ax in figure.get_axes():
-            extra_artists.extend(ax.get_children())
-        figure.savefig(
-            img_stream,
-            format="png",
-            dpi=200,
-            bbox_inches="tight",
-            bbox_extra_artists=extra_artists,
-        )
-        img_stream.seek(0)
-
-        self.doc.add_picture(img_stream, width=width)
-        # be sure to close the figure once it has been added
-        plt.close(figure)
+        self.insert_png(figure_to_png(figure), width=width)
+
+    def insert_png(self, png: bytes, width=Inches(7.5)):
+        """Insert an already rendered PNG image in the word document
+
+        Parameters
+        ----------
+        png : bytes
+            content of the PNG image.
+        width : Inches, optional
+            width in docx Inches, by default Inches(7.5)
+        """
+        self.doc.add_picture(io.BytesIO(png), width=width)
         last_paragraph = self.doc.paragraphs[-1]
         last_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
@@ -239,3 +234,34 @@ class Atlas:
     #         r'<w:shd {} w:fill="'.format(nsdecls("w")) + color + r'"/>'
     #     )
     #     cell._tc.get_or_add_tcPr().append(shading_elm_1)
+
+
+def figure_to_png(figure: Figure) -> bytes:
+    """Render a matplotlib figure as PNG image. The figure is closed afterwards.
+
+    Parameters
+    ----------
+    figure : Figure
+        matplotlib figure to render.
+
+    Returns
+    -------
+    bytes
+        content of the PNG image.
+    """
+    # Convert the figure to an in-memory binary stream
+    img_stream = io.BytesIO()
+    # Be sure to include extra artists if present
+    extra_artists = figure.get_default_bbox_extra_artists()
+    for ax in figure.get_axes():
+        extra_artists.extend(ax.get_children())
+    figure.savefig(
+        img_stream,
+        format="png",
+        dpi=200,
+        bbox_inches="tight",
+        bbox_extra_artists=extra_artists,
+    )
+    # be sure to close the figure once it has been rendered
+    plt.close(figure)
+    return img_stream.getvalue()
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import logging
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from copy import deepcopy
 from pathlib import Path
 
@@ -9,9 +11,11 @@ import pandas as pd
 from jade.config.atlas_config import ConfigAtlasProcessor, PlotConfig
 from jade.helper.aux_functions import PathLike, print_code_lib
 from jade.helper.constants import CODE
-from jade.post.atlas import Atlas
+from jade.post.atlas import Atlas, figure_to_png
 from jade.post.excel_processor import ExcelProcessor
+from jade.post.plot_cache import PlotImageCache
 from jade.post.plotter import PlotFactory
+from jade.post.result_cache import RawResultCache
 
 
 class AtlasProcessor:
@@ -22,6 +26,9 @@ class AtlasProcessor:
         cfg: ConfigAtlasProcessor,
         codelibs: list[tuple[str, str]],
         word_templatee_path: PathLike,
+        cache: RawResultCache | None = None,
+        jobs: int = 1,
+        plot_cache: PlotImageCache | None = None,
     ) -> None:
         """Object responsible to produce the excel comparison results for a given
         benchmark.
@@ -39,23 +46,52 @@ class AtlasProcessor:
             interpreted as the reference data.
         word_templatee_path : PathLike
             path to the word template to be used in the atlas generation.
+        cache : RawResultCache | None, optional
+            cache of the raw results, can be shared with other processors. By
+            default None, the raw results are read every time they are needed.
+        jobs : int, optional
+            number of worker processes used to render the figures, by default 1
+            (figures rendered in the main process).
+        plot_cache : PlotImageCache | None, optional
+            persistent cache of the plot images. Only plots that are not cached
+            are rendered. By default None.
         """
         self.atlas_folder_path = atlas_folder_path
         self.raw_root = raw_root
         self.cfg = cfg
         self.codelibs = codelibs
         self.word_template_path = word_templatee_path
+        self.cache = cache
+        self.jobs = jobs
+        self.plot_cache = plot_cache
 
     def process(self) -> None:
         """Process the atlas comparison for the given benchmark. It will produce one
         atlas file comparing all requested code-lib results in each plot.
+
+        If more than one job is requested, the figures are rendered to PNG by a pool
+        of worker processes while the main process assembles the atlas, always in
+        the order of the configuration.
         """
         # instantiate the atlas
         atlas = Atlas(self.word_template_path, self.cfg.benchmark)
 
+        if self.jobs > 1:
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                self._build_atlas(atlas, executor)
+        else:
+            self._build_atlas(atlas, None)
+
+        # Save the atlas
+        atlas.save(self.atlas_folder_path)
+
+    def _build_atlas(self, atlas: Atlas, executor: ProcessPoolExecutor | None):
+        """Add headings and figures of all the requested plots to the atlas."""
+        # headings and figures still to be added to the atlas, in order
+        content = deque()
         for plot_cfg in self.cfg.plots:
             # Add a chapter for each plo type
-            atlas.doc.add_heading(plot_cfg.name, level=1)
+            content.append((plot_cfg.name, 1))
 
             dfs = []
             cases = {}
@@ -69,7 +105,10 @@ class AtlasProcessor:
 
                 try:
                     df = ExcelProcessor._get_table_df(
-                        plot_cfg.results, raw_folder, subsets=plot_cfg.subsets
+                        plot_cfg.results,
+                        raw_folder,
+                        subsets=plot_cfg.subsets,
+                        cache=self.cache,
                     )
                     _dfs, _cases = self._select_runs(plot_cfg, df, codelib_pretty)
                     dfs.extend(_dfs)
@@ -86,36 +125,69 @@ class AtlasProcessor:
 
             # create the plot
             if plot_cfg.expand_runs:  # one plot for each case/run
-                self._generate_expanded_plots(plot_cfg, cases, atlas)
+                self._generate_expanded_plots(plot_cfg, cases, content, executor)
             else:
-                self._generate_plot(plot_cfg, dfs, atlas)
+                content.append(self._generate_plot(plot_cfg, dfs, executor))
+            self._flush(atlas, content)
 
-        # Save the atlas
-        atlas.save(self.atlas_folder_path)
+        self._flush(atlas, content, wait=True)
 
     def _generate_expanded_plots(
         self,
         plot_cfg: PlotConfig,
         cases: dict[str, list[tuple[str, pd.DataFrame]]],
-        atlas: Atlas,
+        content: deque,
+        executor: ProcessPoolExecutor | None,
     ):
         """Generate a plot for each case/run"""
         for case, data in cases.items():
-            atlas.doc.add_heading(case, level=2)
+            content.append((case, 2))
             cfg = deepcopy(plot_cfg)
             cfg.name = f"{cfg.name} {case}"
             cfg.title = f"{cfg.title} - {case}"
-            self._generate_plot(cfg, data, atlas)
+            content.append(self._generate_plot(cfg, data, executor))
 
-    @staticmethod
     def _generate_plot(
-        plot_cfg: PlotConfig, dfs: list[tuple[str, pd.DataFrame]], atlas: Atlas
-    ):
-        """Generate a single plot (that can be composed by more figures)"""
-        plot = PlotFactory.create_plot(plot_cfg, dfs)
-        item = plot.plot()
-        for fig, _ in item:
-            atlas.insert_img(fig)
+        self,
+        plot_cfg: PlotConfig,
+        dfs: list[tuple[str, pd.DataFrame]],
+        executor: ProcessPoolExecutor | None,
+    ) -> tuple[Future, str | None]:
+        """Generate a single plot (that can be composed by more figures). Cached
+        images are reused, otherwise the rendering is submitted to the executor if
+        provided."""
+        key = None
+        future = Future()
+        if self.plot_cache is not None:
+            key = self.plot_cache.get_key(plot_cfg, dfs)
+            images = self.plot_cache.get(key)
+            if images is not None:
+                future.set_result(images)
+                # already cached, no need to store it again
+                return future, None
+        if executor is not None:
+            return executor.submit(render_plot, plot_cfg, dfs), key
+        future.set_result(render_plot(plot_cfg, dfs))
+        return future, key
+
+    def _flush(self, atlas: Atlas, content: deque, wait: bool = False):
+        """Add to the atlas the headings and the figures that are ready, keeping
+        their order. If wait is True, all pending figures are waited for."""
+        while len(content) > 0:
+            item = content[0]
+            if isinstance(item[0], Future):
+                future, key = item
+                if not wait and not future.done():
+                    return
+                images = future.result()
+                if key is not None:
+                    self.plot_cache.put(key, images)
+                for png in images:
+                    atlas.insert_png(png)
+            else:
+                heading, level = item
+                atlas.doc.add_heading(heading, level=level)
+            content.popleft()
 
     @staticmethod
     def _select_runs(
@@ -147,3 +219,25 @@ class AtlasProcessor:
             df = df[~df["Case"].isin(to_drop)]
             dfs.append((codelib_pretty, df))
         return dfs, cases
+
+
+def render_plot(
+    plot_cfg: PlotConfig, dfs: list[tuple[str, pd.DataFrame]]
+) -> list[bytes]:
+    """Build a plot (that can be composed by more figures) and render its figures
+    as PNG images.
+
+    Parameters
+    ----------
+    plot_cfg : PlotConfig
+        configuration of the plot.
+    dfs : list[tuple[str, pd.DataFrame]]
+        data to be plotted for each code-lib.
+
+    Returns
+    -------
+    list[bytes]
+        content of the PNG image of each figure.
+    """
+    plot = PlotFactory.create_plot(plot_cfg, dfs)
+    return [figure_to_png(fig) for fig, _ in plot.plot()]
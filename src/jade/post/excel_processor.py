@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import logging
-import os
 import re
 from pathlib import Path
 
@@ -11,6 +10,8 @@ from jade.config.excel_config import ConfigExcelProcessor
 from jade.helper.aux_functions import PathLike, print_code_lib
 from jade.helper.constants import CODE
 from jade.post.excel_routines import TableFactory
+from jade.post.raw_store import iter_run_results
+from jade.post.result_cache import RawResultCache
 
 TITLE = "{}-{} Vs {}-{}. Result: {}"
 FILE_NAME = "{}_{}-{}_Vs_{}-{}.xlsx"
@@ -23,6 +24,7 @@ class ExcelProcessor:
         excel_folder_path: PathLike,
         cfg: ConfigExcelProcessor,
         codelibs: list[tuple[str, str]],
+        cache: RawResultCache | None = None,
     ) -> None:
         """Object responsible to produce the excel comparison results for a given
         benchmark.
@@ -38,11 +40,15 @@ class ExcelProcessor:
         codelibs : list[tuple[str, str]]
             list of code-lib results that should be compared. The first one is
             interpreted as the reference data.
+        cache : RawResultCache | None, optional
+            cache of the raw results, can be shared with other processors. By
+            default None, the raw results are read every time they are needed.
         """
         self.excel_folder_path = excel_folder_path
         self.raw_root = raw_root
         self.cfg = cfg
         self.codelibs = codelibs
+        self.cache = cache
 
     def process(self) -> None:
         """Process the excel comparison for the given benchmark. It will produce one
@@ -62,7 +68,10 @@ class ExcelProcessor:
                 ref_lib = lib
                 for table_cfg in self.cfg.tables:
                     target_df = self._get_table_df(
-                        table_cfg.results, raw_folder, subsets=table_cfg.subsets
+                        table_cfg.results,
+                        raw_folder,
+                        subsets=table_cfg.subsets,
+                        cache=self.cache,
                     )
                     # If requested, select only a subsets of the runs
                     if table_cfg.select_runs:
@@ -85,7 +94,10 @@ class ExcelProcessor:
                         # this gets a concatenated dataframe with all results that needs
                         # to be in the table
                         target_df = self._get_table_df(
-                            table_cfg.results, raw_folder, subsets=table_cfg.subsets
+                            table_cfg.results,
+                            raw_folder,
+                            subsets=table_cfg.subsets,
+                            cache=self.cache,
                         )
                         # If requested, select only a subsets of the runs
                         if table_cfg.select_runs:
@@ -118,6 +130,7 @@ class ExcelProcessor:
         results: list[int | str],
         raw_folder: PathLike,
         subsets: list[dict] | None = None,
+        cache: RawResultCache | None = None,
     ) -> pd.DataFrame:
         """given a list of results, get the concatenated dataframe"""
         dfs = []
@@ -125,7 +138,7 @@ class ExcelProcessor:
             # this gets a concatenated dataframe for each result for different runs
             subset = _check_for_subsets(subsets, result)
             df = ExcelProcessor._get_concat_df_results(
-                result, raw_folder, subset=subset
+                result, raw_folder, subset=subset, cache=cache
             )
             # it may happen that a dataframe is empty since this result is not in the run
             if df.empty:
@@ -136,29 +149,28 @@ class ExcelProcessor:
 
     @staticmethod
     def _get_concat_df_results(
-        target_result: int | str, folder: PathLike, subset: dict | None = None
+        target_result: int | str,
+        folder: PathLike,
+        subset: dict | None = None,
+        cache: RawResultCache | None = None,
     ) -> pd.DataFrame:
         """given a result ID, locate, read the dataframes and concat them (from different
-        single runs)"""
+        single runs). The Parquet raw store is used if available."""
+        if cache is None:
+            runs = iter_run_results(folder, target_result)
+        else:
+            runs = cache.get_run_results(folder, target_result)
         dfs = []
-        for file in os.listdir(folder):
-            if not file.endswith(".csv"):
-                continue
-            splits = file.split(" ")
-            # ASSUMPTION: run name is continous, result name can have spaces
-            run_name = splits[0]
-            result = " ".join(splits[1:])[:-4]  # remove the .csv
-            if result == target_result:
-                df = pd.read_csv(Path(folder, file))
-                # check here if only a subset of the dataframe is needed
-                if subset:
-                    for value, items in subset["values"].items():
-                        try:
-                            df = df.set_index(value).loc[items].reset_index()
-                        except KeyError:
-                            pass  # accept that in some tallies the column may not be present
-                df["Case"] = run_name
-                dfs.append(df)
+        for run_name, df in runs:
+            # check here if only a subset of the dataframe is needed
+            if subset:
+                for value, items in subset["values"].items():
+                    try:
+                        df = df.set_index(value).loc[items].reset_index()
+                    except KeyError:
+                        pass  # accept that in some tallies the column may not be present
+            df["Case"] = run_name
+            dfs.append(df)
         if len(dfs) == 0:
             logging.warning(f"No data found for {target_result}")
             return pd.DataFrame()
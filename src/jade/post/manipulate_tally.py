@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import logging
-import math
 
 import numpy as np
 import pandas as pd
@@ -9,6 +8,9 @@ import pandas as pd
 from jade.config.excel_config import ComparisonType
 from jade.config.raw_config import TallyConcatOption, TallyModOption
 
+# maximum number of (bin, window bin) pairs evaluated at once in the broadening
+_BROADENING_CHUNK = 2**22
+
 
 # --- functions to modify tallies ---
 def by_lethargy(tally: pd.DataFrame) -> pd.DataFrame:
@@ -66,18 +68,33 @@ def condense_groups(
     pd.DataFrame
         modified tally
     """
-    tally["abs err"] = tally["Error"] * tally["Value"]
     # this divides the entries in coarse energy bins
-    tally["coarse_bin"] = pd.cut(tally[group_column], bins=bins, right=False)
-    tally[group_column] = tally["coarse_bin"].apply(
-        lambda x: f"{x.left:g} - {x.right:g}"
-    )
-    del tally["coarse_bin"]
-    grouped = tally.groupby(group_column, observed=False).agg(
-        {"Value": "sum", "abs err": lambda x: math.sqrt((x**2).sum())}
+    coarse_bin = pd.cut(tally[group_column], bins=bins, right=False)
+    codes = coarse_bin.cat.codes.to_numpy()
+    inside = codes >= 0  # entries outside the bins are discarded
+    # label each coarse bin only once
+    labels = [f"{b.left:g} - {b.right:g}" for b in coarse_bin.cat.categories]
+    if len(set(labels)) == len(labels):
+        keys = pd.CategoricalIndex(
+            labels, categories=labels, ordered=True, name=group_column
+        )
+        group_ids = codes[inside]
+    else:
+        # bins with the same label are merged and sorted by label
+        unique_labels, label_ids = np.unique(labels, return_inverse=True)
+        keys = pd.Index(unique_labels, dtype=object, name=group_column)
+        group_ids = label_ids[codes[inside]]
+    values = tally["Value"].to_numpy()[inside]
+    errors = tally["Error"].to_numpy()[inside]
+    grouped = (
+        pd.DataFrame({"Value": values, "abs err": (errors * values) ** 2})
+        .groupby(group_ids)
+        .sum()
+        .reindex(range(len(keys)), fill_value=0)
     )
+    grouped.index = keys
     with np.errstate(divide="ignore", invalid="ignore"):
-        grouped["Error"] = grouped["abs err"] / grouped["Value"]
+        grouped["Error"] = np.sqrt(grouped["abs err"]) / grouped["Value"]
     del grouped["abs err"]
     # drop zero values
     grouped = grouped[grouped["Value"] != 0]
@@ -124,19 +141,17 @@ def add_column_with_dict(
     tally: pd.DataFrame, ref_column: str, values: dict, new_columns: list[str]
 ) -> pd.DataFrame:
     """Add a new column to the tally with the provided values."""
-    # create a new column with the values from the dictionary
+    # look up each distinct key only once and broadcast it to its rows
+    codes, keys = pd.factorize(tally[ref_column], use_na_sentinel=False)
+    rows = [values[key] for key in keys]
     for i, new_column in enumerate(new_columns):
-        vals = []
-        for idx, row in tally.iterrows():
-            key = row[ref_column]
-            vals.append(values[key][i])
-        tally[new_column] = vals
+        tally[new_column] = pd.Series([row[i] for row in rows]).take(codes).values
     return tally
 
 
 def keep_last_row(tally: pd.DataFrame) -> pd.DataFrame:
     """Keep only the last row of the tally."""
-    return tally.iloc[-1:]
+    return tally.iloc[-1:].copy()
 
 
 def groupby(tally: pd.DataFrame, by: str, action: str) -> pd.DataFrame:
@@ -157,19 +172,21 @@ def groupby(tally: pd.DataFrame, by: str, action: str) -> pd.DataFrame:
             name="Error",
         )
     else:
-        value_df = tally.set_index(by)["Value"]
-        error_df = tally.set_index(by)["Error"]
-        rows = []
-        for idx_val in error_df.index.unique():
-            subset_error = error_df.loc[idx_val]
-            subset_value = value_df.loc[idx_val]
-            # Error propagation considering that tally["Error"] are relative errors
-            # Valid both for sum and mean
-            err = (
-                np.sqrt(np.sum((subset_error * subset_value) ** 2)) / subset_value.sum()
+        # Error propagation considering that tally["Error"] are relative errors
+        # Valid both for sum and mean. Values and squared absolute errors are summed
+        # in the same pass.
+        sums = (
+            pd.DataFrame(
+                {
+                    by: tally[by],
+                    "Value": tally["Value"],
+                    "Error": (tally["Error"] * tally["Value"]) ** 2,
+                }
             )
-            rows.append(err)
-        error = pd.Series(rows, name="Error")
+            .groupby(by, sort=False)
+            .agg(value=("Value", "sum"), error=("Error", "sum"))
+        )
+        error = pd.Series(np.sqrt(sums["error"]) / sums["value"], name="Error")
         grouped = tally.groupby(by, sort=False)
 
     if action == "sum":
@@ -295,23 +312,42 @@ def gaussian_broadening(
         raise ValueError("fwhm_frac must be a float or a list of floats.")
 
     Eb = tally["Energy"].values.astype(float)
-    Yb = np.zeros_like(tally["Value"])
-    Errb = np.zeros_like(tally["Error"])
-    sigma = (
-        np.array(fwhm_frac) * np.array(tally["Energy"]) / (2 * np.sqrt(2 * np.log(2)))
+    Yb = np.zeros(len(Eb))
+    Errb = np.zeros(len(Eb))
+    values = tally["Value"].values.astype(float)
+    errors = tally["Error"].values.astype(float)
+    sigma = np.array(fwhm_frac) * Eb / (2 * np.sqrt(2 * np.log(2)))
+
+    # The kernel of each bin only spans the bins within 4 sigma: locate these
+    # windows on the sorted grid instead of masking the full grid for every bin
+    order = np.argsort(Eb, kind="stable")
+    sorted_e = Eb[order]
+    width = 4 * sigma
+    starts = np.searchsorted(sorted_e, Eb - width, side="left")
+    stops = np.searchsorted(sorted_e, Eb + width, side="right")
+    sources = np.flatnonzero(values != 0)
+    counts = stops[sources] - starts[sources]
+    # Process the bins in chunks to bound the memory used by the (bin, window)
+    # pairs of very wide kernels
+    bounds = np.searchsorted(
+        np.cumsum(counts),
+        np.arange(1, 1 + counts.sum() // _BROADENING_CHUNK) * _BROADENING_CHUNK,
     )
-
-    # Apply Gaussian broadening
-    for Ei, si, Yi, Erri in zip(tally["Energy"], sigma, tally["Value"], tally["Error"]):
-        if Yi == 0:
+    for chunk, chunk_counts in zip(np.split(sources, bounds), np.split(counts, bounds)):
+        if len(chunk) == 0:
             continue
-        width = 4 * si
-        mask = (Eb >= Ei - width) & (Eb <= Ei + width)
-        x = Eb[mask]
-        k = np.exp(-0.5 * ((x - Ei) / si) ** 2)
-        k /= k.sum()
-        Yb[mask] += Yi * k
-        Errb[mask] += (Erri * Yi * k) ** 2
+        # flatten the windows: pair each source bin with the bins it spreads to
+        src = np.repeat(np.arange(len(chunk)), chunk_counts)
+        offsets = np.cumsum(chunk_counts) - chunk_counts
+        pos = starts[chunk][src] + np.arange(len(src)) - offsets[src]
+        target = order[pos]
+        k = np.exp(-0.5 * ((Eb[target] - Eb[chunk][src]) / sigma[chunk][src]) ** 2)
+        k /= np.bincount(src, weights=k, minlength=len(chunk))[src]
+        yk = values[chunk][src] * k
+        Yb += np.bincount(target, weights=yk, minlength=len(Eb))
+        Errb += np.bincount(
+            target, weights=(errors[chunk][src] * yk) ** 2, minlength=len(Eb)
+        )
 
     # Assign the new broadened values to the tally
     tally["Value"] = Yb
@@ -319,6 +355,22 @@ def gaussian_broadening(
     return tally
 
 
+def _divide_by_cells(
+    tally: pd.DataFrame, divisors: dict[int, float], quantity: str
+) -> pd.DataFrame:
+    """Divide values and errors of each row by the divisor of its cell."""
+    if "Cells" not in tally:
+        return tally
+    cell_divisors = tally["Cells"].map(divisors)
+    missing = tally.loc[cell_divisors.isna(), "Cells"].unique()
+    if len(missing) > 0:
+        raise KeyError(f"Missing {quantity} for cells: {missing.tolist()}")
+    cell_divisors = cell_divisors.to_numpy(dtype=float)
+    tally["Value"] = tally["Value"].to_numpy() / cell_divisors
+    tally["Error"] = tally["Error"].to_numpy() / cell_divisors
+    return tally
+
+
 def volume(tally: pd.DataFrame, volumes: dict[int, float]) -> pd.DataFrame:
     """Volume divisor function
 
@@ -334,20 +386,7 @@ def volume(tally: pd.DataFrame, volumes: dict[int, float]) -> pd.DataFrame:
     tally : pd.DataFrame
         Modified tally
     """
-    if "Cells" in tally:
-        cells = tally.Cells.unique()
-        for cell in cells:
-            tally["Value"] = np.where(
-                (tally["Cells"] == cell),
-                tally["Value"] / volumes[cell],
-                tally["Value"],
-            )
-            tally["Error"] = np.where(
-                (tally["Cells"] == cell),
-                tally["Error"] / volumes[cell],
-                tally["Error"],
-            )
-    return tally
+    return _divide_by_cells(tally, volumes, "volumes")
 
 
 def mass(tally: pd.DataFrame, masses: dict[int, float]) -> pd.DataFrame:
@@ -365,20 +404,7 @@ def mass(tally: pd.DataFrame, masses: dict[int, float]) -> pd.DataFrame:
     tally : pd.DataFrame
         Modified tally
     """
-    if "Cells" in tally:
-        cells = tally.Cells.unique()
-        for cell in cells:
-            tally["Value"] = np.where(
-                (tally["Cells"] == cell),
-                tally["Value"] / masses[cell],
-                tally["Value"],
-            )
-            tally["Error"] = np.where(
-                (tally["Cells"] == cell),
-                tally["Error"] / masses[cell],
-                tally["Error"],
-            )
-    return tally
+    return _divide_by_cells(tally, masses, "masses")
 
 
 MOD_FUNCTIONS = {
@@ -403,6 +429,17 @@ MOD_FUNCTIONS = {
     TallyModOption.MASS: mass,
 }
 
+# modifications that never change the input tally, they return either a new
+# dataframe or the input tally itself. All the others may modify it in place.
+READ_ONLY_MODS = {
+    TallyModOption.NO_ACTION,
+    TallyModOption.CONDENSE_GROUPS,
+    TallyModOption.SELECT_SUBSET,
+    TallyModOption.KEEP_LAST_ROW,
+    TallyModOption.GROUPBY,
+    TallyModOption.DELETE_COLS,
+}
+
 
 # --- functions to combine tallies ---
 def sum_tallies(tallies: list[pd.DataFrame]) -> pd.DataFrame:
@@ -498,33 +535,26 @@ def compare_data(
 ) -> tuple[pd.Series | np.ndarray, pd.Series | np.ndarray]:
     """Returns the values and propagated errors for the chosen comparison between two data sets."""
 
-    error = []
     if ignore_index:
         val1 = val1.values
         val2 = val2.values
 
     if comparison_type == ComparisonType.ABSOLUTE:
         value = val1 - val2
-        for v1, v2, e1, e2 in zip(val1, val2, err1, err2):
-            if v1 != v2:
-                error.append(
-                    np.sqrt((v1 * e1) ** 2 + (v2 * e2) ** 2) / (v1 - v2)
-                )  # relative error propagation for substraction
-            else:
-                error.append(
-                    e1 + e2
-                )  # Conservative choice, only applied if the values are equal
+        v1, v2, e1, e2 = (np.asarray(x) for x in (val1, val2, err1, err2))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # relative error propagation for substraction
+            error = np.sqrt((v1 * e1) ** 2 + (v2 * e2) ** 2) / (v1 - v2)
+        # Conservative choice, only applied if the values are equal
+        error = np.where(v1 != v2, error, e1 + e2)
     elif comparison_type == ComparisonType.PERCENTAGE:
         value = (val1 - val2) / val1 * 100
-        for v1, v2, e1, e2 in zip(val1, val2, err1, err2):
-            if v1 != v2:
-                error.append(
-                    np.sqrt((v1 * v2 * e1) ** 2 + (v2 * e2) ** 2) / (v1 - v2)
-                )  # relative error propagation for percentage
-            else:
-                error.append(
-                    e1 + e2
-                )  # Conservative choice, only applied if the values are equal
+        v1, v2, e1, e2 = (np.asarray(x) for x in (val1, val2, err1, err2))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # relative error propagation for percentage
+            error = np.sqrt((v1 * v2 * e1) ** 2 + (v2 * e2) ** 2) / (v1 - v2)
+        # Conservative choice, only applied if the values are equal
+        error = np.where(v1 != v2, error, e1 + e2)
     elif comparison_type == ComparisonType.RATIO:
         value = val2 / val1  # reference / target
         error = np.sqrt(err1**2 + err2**2)  # relative error propagation for ratio
@@ -546,5 +576,5 @@ def compare_data(
         error = pd.Series(error)
         error.index = val1.index
     else:
-        error = np.array(error)
+        error = np.asarray(error)
     return value, error
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from jade.config.atlas_config import PlotConfig
+from jade.helper.aux_functions import PathLike, get_jade_version
+
+# folder of the plot cache inside the post-processing folder
+PLOT_CACHE_FOLDER = ".plot_cache"
+
+
+class PlotImageCache:
+    def __init__(self, folder: PathLike) -> None:
+        """Persistent cache of the PNG images of the atlas plots. The images are
+        stored on disk, addressed by a hash of the plot configuration, of the
+        plotted data and of the JADE version, so that only new or changed plots
+        need to be rendered when an atlas is produced again.
+
+        Parameters
+        ----------
+        folder : PathLike
+            folder where the images are stored. It is created if needed.
+        """
+        self.folder = Path(folder)
+        self.jade_version = get_jade_version()
+
+    def get_key(self, plot_cfg: PlotConfig, dfs: list[tuple[str, pd.DataFrame]]) -> str:
+        """Compute the key of a plot.
+
+        Parameters
+        ----------
+        plot_cfg : PlotConfig
+            configuration of the plot.
+        dfs : list[tuple[str, pd.DataFrame]]
+            data to be plotted for each code-lib.
+
+        Returns
+        -------
+        str
+            hash identifying the plot images.
+        """
+        sha = hashlib.sha256()
+        sha.update(self.jade_version.encode())
+        sha.update(repr(plot_cfg).encode())
+        for label, df in dfs:
+            sha.update(label.encode())
+            sha.update(repr(list(df.columns)).encode())
+            sha.update(repr([str(dtype) for dtype in df.dtypes]).encode())
+            sha.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        return sha.hexdigest()
+
+    def get(self, key: str) -> list[bytes] | None:
+        """Get the PNG images of a plot, None if they are not cached."""
+        folder = self._get_folder(key)
+        try:
+            files = sorted(os.listdir(folder), key=lambda name: int(name[:-4]))
+        except FileNotFoundError:
+            return None
+        images = []
+        for file in files:
+            with open(Path(folder, file), "rb") as f:
+                images.append(f.read())
+        return images
+
+    def put(self, key: str, images: list[bytes]) -> None:
+        """Store the PNG images of a plot."""
+        folder = self._get_folder(key)
+        if folder.exists():
+            return
+        os.makedirs(folder.parent, exist_ok=True)
+        # write to a temporary folder first, a plot is either fully cached or not
+        tmp_folder = tempfile.mkdtemp(dir=folder.parent)
+        for i, image in enumerate(images):
+            with open(Path(tmp_folder, f"{i}.png"), "wb") as f:
+                f.write(image)
+        try:
+            os.rename(tmp_folder, folder)
+        except OSError:
+            # the same plot was cached in the meantime
+            shutil.rmtree(tmp_folder)
+
+    def _get_folder(self, key: str) -> Path:
+        return Path(self.folder, key[:2], key)
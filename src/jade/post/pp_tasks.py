@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import logging
+import os
+import traceback
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+from tqdm import tqdm
+
+from jade.config.atlas_config import ConfigAtlasProcessor
+from jade.config.excel_config import ConfigExcelProcessor
+from jade.helper.aux_functions import PathLike
+from jade.helper.errors import ConfigError, PostProcessConfigError
+from jade.post.atlas_processor import AtlasProcessor
+from jade.post.excel_processor import ExcelProcessor
+from jade.post.plot_cache import PlotImageCache
+from jade.post.result_cache import RawResultCache
+
+
+@dataclass
+class PostProcessTask:
+    """Everything that is needed to post-process a single benchmark.
+
+    Attributes
+    ----------
+    benchmark : str
+        name of the benchmark.
+    excel_folder : PathLike
+        folder where the excel files are stored.
+    atlas_folder : PathLike
+        folder where the atlas is stored.
+    excel_cfg : ConfigExcelProcessor
+        excel processor configuration of the benchmark.
+    atlas_cfg : ConfigAtlasProcessor
+        atlas processor configuration of the benchmark.
+    code_libs : list[tuple[str, str]]
+        code-lib results to be compared, the first one is the reference.
+    plot_cache : PlotImageCache | None
+        persistent cache of the atlas plot images, by default None.
+    """
+
+    benchmark: str
+    excel_folder: PathLike
+    atlas_folder: PathLike
+    excel_cfg: ConfigExcelProcessor
+    atlas_cfg: ConfigAtlasProcessor
+    code_libs: list[tuple[str, str]]
+    plot_cache: PlotImageCache | None = None
+
+
+def process_excel(
+    raw_root: PathLike, task: PostProcessTask, cache: RawResultCache | None = None
+) -> None:
+    """Produce the excel comparisons of a benchmark."""
+    logging.info("Processing Excel files for %s", task.benchmark)
+    excel_processor = ExcelProcessor(
+        raw_root, task.excel_folder, task.excel_cfg, task.code_libs, cache=cache
+    )
+    excel_processor.process()
+
+
+def process_atlas(
+    raw_root: PathLike,
+    task: PostProcessTask,
+    template: PathLike,
+    cache: RawResultCache | None = None,
+    jobs: int = 1,
+) -> None:
+    """Produce the atlas of a benchmark, rendering the figures with the requested
+    number of processes."""
+    logging.info("Processing Atlas files for %s", task.benchmark)
+    atlas_processor = AtlasProcessor(
+        raw_root,
+        task.atlas_folder,
+        task.atlas_cfg,
+        task.code_libs,
+        template,
+        cache=cache,
+        jobs=jobs,
+        plot_cache=task.plot_cache,
+    )
+    atlas_processor.process()
+
+
+def process_benchmark(
+    raw_root: PathLike, task: PostProcessTask, template: PathLike, jobs: int = 1
+) -> None:
+    """Produce excel and atlas of a benchmark. The raw results are read once and
+    shared by the excel and atlas processing. The atlas figures are rendered with
+    the requested number of processes.
+    """
+    cache = RawResultCache()
+    process_excel(raw_root, task, cache=cache)
+    process_atlas(raw_root, task, template, cache=cache, jobs=jobs)
+    logging.debug(
+        "Raw results cache for %s: %d hits, %d misses",
+        task.benchmark,
+        cache.hits,
+        cache.misses,
+    )
+
+
+def post_process_parallel(
+    raw_root: PathLike,
+    tasks: list[PostProcessTask],
+    template: PathLike,
+    jobs: int,
+    log_folder: PathLike,
+) -> list[str]:
+    """Post-process multiple benchmarks using a pool of processes. The excel and
+    the atlas of each benchmark are produced by different workers.
+
+    Each worker logs to its own file in the log folder. A configuration error in
+    any of the benchmarks stops the whole post-processing, while other failures
+    are logged and do not affect the remaining benchmarks.
+
+    Parameters
+    ----------
+    raw_root : PathLike
+        path to the raw data folder root.
+    tasks : list[PostProcessTask]
+        benchmarks to be post-processed.
+    template : PathLike
+        path to the word template used for the atlas.
+    jobs : int
+        number of worker processes to use.
+    log_folder : PathLike
+        folder where the worker log files are stored.
+
+    Returns
+    -------
+    list[str]
+        description of the failed excel or atlas processing.
+
+    Raises
+    ------
+    ConfigError, PostProcessConfigError
+        if the configuration of one of the benchmarks is not valid.
+    """
+    failed = []
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(log_folder,)
+    ) as executor:
+        futures = {}
+        for task in tasks:
+            future = executor.submit(_run_task, process_excel, raw_root, task)
+            futures[future] = f"{task.benchmark} excel"
+            future = executor.submit(_run_task, process_atlas, raw_root, task, template)
+            futures[future] = f"{task.benchmark} atlas"
+
+        for future in tqdm(
+            as_completed(futures), total=len(futures), desc="Post-processing"
+        ):
+            try:
+                error = future.result()
+            except (ConfigError, PostProcessConfigError):
+                # fail fast, the remaining tasks are not started
+                for pending in futures:
+                    pending.cancel()
+                logging.error("Configuration error in %s", futures[future])
+                raise
+            if error is not None:
+                logging.error(
+                    "Post-processing failed for %s:\n%s", futures[future], error
+                )
+                failed.append(futures[future])
+    failed.sort()
+    return failed
+
+
+def _init_worker(log_folder: PathLike) -> None:
+    """Redirect the logs of a worker process to its own file."""
+    logger = logging.getLogger()
+    # the handlers inherited from the main process are not used by the workers
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    file_handler = logging.FileHandler(
+        Path(log_folder, f"pp_worker_{os.getpid()}.txt"), encoding="utf-8", delay=True
+    )
+    file_handler.setLevel(logging.INFO)
+    file_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+    logger.addHandler(file_handler)
+    logger.setLevel(logging.INFO)
+
+
+def _run_task(func: Callable, *args) -> str | None:
+    """Worker function for the parallel post-processing. Configuration errors are
+    raised, other exceptions are returned as formatted tracebacks.
+    """
+    try:
+        func(*args)
+    except (ConfigError, PostProcessConfigError):
+        raise
+    except Exception:
+        return traceback.format_exc()
+    return None
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+from jade.helper.aux_functions import PathLike
+from jade.helper.constants import CODE
+from jade.post.sim_output import MCNPSimOutput, OpenMCSimOutput
+
+MANIFEST_FILE = "manifest.json"
+CHUNK_SIZE = 2**20  # 1 MB
+
+
+class RawManifest:
+    def __init__(self, config_hash: str, runs: dict[str, dict] | None = None) -> None:
+        """Record of the simulation outputs that were used to produce the raw data
+        of a benchmark. It allows to reprocess only the single runs whose outputs
+        (or raw processing configuration) changed since the last processing.
+
+        Parameters
+        ----------
+        config_hash : str
+            hash of the raw processing configuration file used for the benchmark.
+        runs : dict[str, dict] | None, optional
+            fingerprints of the output files of each processed single run, indexed by
+            single run name. By default None (no run processed).
+        """
+        self.config_hash = config_hash
+        if runs is None:
+            runs = {}
+        self.runs = runs
+
+    @classmethod
+    def from_folder(cls, raw_folder: PathLike) -> RawManifest | None:
+        """Read the manifest stored in a raw data benchmark folder.
+
+        Parameters
+        ----------
+        raw_folder : PathLike
+            raw data folder of the benchmark.
+
+        Returns
+        -------
+        RawManifest | None
+            the manifest, None if it was never written or it cannot be read.
+        """
+        try:
+            with open(Path(raw_folder, MANIFEST_FILE)) as f:
+                data = json.load(f)
+            return cls(data["config_hash"], data["runs"])
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    @classmethod
+    def open(
+        cls, raw_folder: PathLike, config_hash: str, reset: bool = False
+    ) -> RawManifest:
+        """Get the manifest of a raw data benchmark folder for a new processing.
+
+        If the manifest does not exist, was produced with a different raw
+        processing configuration or a reset is requested, all the previous raw data
+        of the benchmark are deleted and an empty manifest is returned.
+
+        Parameters
+        ----------
+        raw_folder : PathLike
+            raw data folder of the benchmark. It is created if needed.
+        config_hash : str
+            hash of the current raw processing configuration of the benchmark.
+        reset : bool, optional
+            if True, previous results are always deleted. By default False.
+
+        Returns
+        -------
+        RawManifest
+            manifest of the benchmark.
+        """
+        manifest = None if reset else cls.from_folder(raw_folder)
+        if manifest is None or manifest.config_hash != config_hash:
+            # always ovveride eventual previous results here
+            if os.path.exists(raw_folder):
+                shutil.rmtree(raw_folder)
+            os.makedirs(raw_folder, exist_ok=True)
+            manifest = cls(config_hash)
+        return manifest
+
+    def dump(self, raw_folder: PathLike) -> None:
+        """Write the manifest in the raw data benchmark folder."""
+        with open(Path(raw_folder, MANIFEST_FILE), "w") as f:
+            json.dump({"config_hash": self.config_hash, "runs": self.runs}, f, indent=4)
+
+    def is_up_to_date(self, run_name: str, fingerprint: dict[str, dict]) -> bool:
+        """Check if the outputs of a single run are the same that were processed.
+        Only the content hash is compared, i.e. a file that was only touched is not
+        considered modified.
+        """
+        try:
+            previous = self.runs[run_name]
+        except KeyError:
+            return False
+        if previous.keys() != fingerprint.keys():
+            return False
+        for file, info in fingerprint.items():
+            if previous[file]["hash"] != info["hash"]:
+                return False
+        return True
+
+    def check_run(
+        self, run_name: str, code: CODE, sim_folder: PathLike, raw_folder: PathLike
+    ) -> dict[str, dict] | None:
+        """Check if a single run needs to be processed.
+
+        If the run is up to date, the size and modification time of its files are
+        refreshed in the manifest. Otherwise, its previous raw results are deleted
+        and the run is dropped from the manifest until it is processed again.
+
+        Parameters
+        ----------
+        run_name : str
+            name of the single run.
+        code : CODE
+            code used for the simulation.
+        sim_folder : PathLike
+            path to the single run simulation folder.
+        raw_folder : PathLike
+            raw data folder of the benchmark.
+
+        Returns
+        -------
+        dict[str, dict] | None
+            fingerprint to be recorded once the run is processed, None if the run
+            is up to date.
+        """
+        fingerprint = fingerprint_run(code, sim_folder, self.runs.get(run_name))
+        if self.is_up_to_date(run_name, fingerprint):
+            self.runs[run_name] = fingerprint
+            return None
+        self.remove_run(run_name, raw_folder)
+        return fingerprint
+
+    def remove_run(self, run_name: str, raw_folder: PathLike) -> None:
+        """Delete the raw results of a single run and drop it from the manifest."""
+        for file in os.listdir(raw_folder):
+            # ASSUMPTION: run name is continous, result name can have spaces
+            if file.endswith(".csv") and file.split(" ")[0] == run_name:
+                os.remove(Path(raw_folder, file))
+        self.runs.pop(run_name, None)
+
+
+def hash_file(path: PathLike) -> str:
+    """Compute the sha256 hash of a file reading it in chunks."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def get_output_files(code: CODE, sim_folder: PathLike) -> list[Path]:
+    """Get the output files of a single run that are used for the raw processing."""
+    if code in (CODE.MCNP, CODE.D1S):
+        files = MCNPSimOutput.retrieve_files(sim_folder)
+    elif code == CODE.OPENMC:
+        # the .out file is not used for the raw processing
+        files = OpenMCSimOutput.retrieve_file(sim_folder)[1:]
+    else:
+        raise NotImplementedError(
+            f"Code {code} not implemented yet for raw data processing"
+        )
+    return [Path(file) for file in files if file is not None]
+
+
+def fingerprint_run(
+    code: CODE, sim_folder: PathLike, previous: dict[str, dict] | None = None
+) -> dict[str, dict]:
+    """Compute size, modification time and hash of the output files of a single run.
+
+    Parameters
+    ----------
+    code : CODE
+        code used for the simulation.
+    sim_folder : PathLike
+        path to the single run simulation folder.
+    previous : dict[str, dict] | None, optional
+        previous fingerprint of the same run. If size and modification time of a
+        file did not change, its hash is not recomputed. By default None.
+
+    Returns
+    -------
+    dict[str, dict]
+        for each output file name, its size, modification time (ns) and hash.
+    """
+    if previous is None:
+        previous = {}
+    fingerprint = {}
+    for file in get_output_files(code, sim_folder):
+        stat = os.stat(file)
+        old = previous.get(file.name)
+        if (
+            old is not None
+            and old["size"] == stat.st_size
+            and old["mtime"] == stat.st_mtime_ns
+        ):
+            digest = old["hash"]
+        else:
+            digest = hash_file(file)
+        fingerprint[file.name] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": digest,
+        }
+    return fingerprint
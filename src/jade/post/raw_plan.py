@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from jade.config.raw_config import ConfigRawProcessor, ResultConfig
+from jade.helper.aux_functions import PathLike
+from jade.post.raw_manifest import hash_file
+from jade.post.tally_pipeline import TallyPipeline
+
+# plans already compiled, indexed by config file with its modification time and size
+_PLANS: dict[str, tuple[tuple[int, int], RawProcessingPlan]] = {}
+
+
+class RawProcessingPlan:
+    def __init__(self, cfg: ConfigRawProcessor, config_hash: str | None = None) -> None:
+        """Raw processing configuration of a benchmark compiled once for all its
+        single runs.
+
+        The runs each result applies to are stored as sets, and the tally
+        modification pipeline is compiled only once for each distinct set of
+        applicable results.
+
+        Parameters
+        ----------
+        cfg : ConfigRawProcessor
+            raw processing configuration of the benchmark.
+        config_hash : str | None, optional
+            hash of the configuration file, if the plan was read from file. By
+            default None.
+        """
+        self.cfg = cfg
+        self.config_hash = config_hash
+        # results applying to all runs and results applying to specific runs
+        self._general = []
+        self._specific: dict[str, list[int]] = {}
+        for i, result in enumerate(cfg.results):
+            if result.apply_to is None:
+                self._general.append(i)
+            else:
+                # a single run can also be given as a plain string
+                apply_to = result.apply_to
+                if isinstance(apply_to, str):
+                    apply_to = [apply_to]
+                for run_name in set(apply_to):
+                    self._specific.setdefault(run_name, []).append(i)
+        self._pipelines: dict[tuple[int, ...], TallyPipeline] = {}
+
+    @classmethod
+    def from_yaml(cls, config_file: PathLike) -> RawProcessingPlan:
+        """Get the plan of a raw processing configuration file. The plan is cached
+        and compiled again only if the file is modified.
+        """
+        path = Path(config_file).resolve()
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = _PLANS.get(str(path))
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        plan = cls(ConfigRawProcessor.from_yaml(path), hash_file(path))
+        _PLANS[str(path)] = (signature, plan)
+        return plan
+
+    def _get_indices(self, run_name: str) -> tuple[int, ...]:
+        return tuple(sorted(self._general + self._specific.get(run_name, [])))
+
+    def get_results(self, run_name: str) -> list[ResultConfig]:
+        """Get the results that apply to a single run, in the configuration order."""
+        return [self.cfg.results[i] for i in self._get_indices(run_name)]
+
+    def get_pipeline(self, run_name: str) -> TallyPipeline:
+        """Get the compiled tally modifications of the results that apply to a single
+        run.
+        """
+        indices = self._get_indices(run_name)
+        pipeline = self._pipelines.get(indices)
+        if pipeline is None:
+            pipeline = TallyPipeline([self.cfg.results[i] for i in indices])
+            self._pipelines[indices] = pipeline
+        return pipeline
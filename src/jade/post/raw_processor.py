@@ -3,26 +3,36 @@ from __future__ import annotations
 import json
 import logging
 import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+from tqdm import tqdm
+
 from jade.config.raw_config import ConfigRawProcessor, TallyModOption
 from jade.helper.aux_functions import PathLike, get_jade_version
 from jade.helper.constants import CODE
-from jade.post.manipulate_tally import CONCAT_FUNCTIONS, MOD_FUNCTIONS
+from jade.post.manipulate_tally import CONCAT_FUNCTIONS
+from jade.post.raw_plan import RawProcessingPlan
+from jade.post.raw_store import INDEX_KEY
 from jade.post.sim_output import MCNPSimOutput, OpenMCSimOutput
 
 
 class RawProcessor:
     def __init__(
-        self, cfg: ConfigRawProcessor, sim_folder: PathLike, out_folder: PathLike
+        self,
+        cfg: ConfigRawProcessor | RawProcessingPlan,
+        sim_folder: PathLike,
+        out_folder: PathLike,
     ) -> None:
         """Object in charge of processing the raw data from the simulation and to obtain
         the final raw csv results.
 
         Parameters
         ----------
-        cfg : ConfigRawProcessor
-            Instructions on how to process the raw data.
+        cfg : ConfigRawProcessor | RawProcessingPlan
+            Instructions on how to process the raw data. A compiled plan can be
+            shared by all the single runs of a benchmark.
         sim_folder : PathLike
             Path to the simulation folder containing the output files.
         out_folder : PathLike
@@ -38,11 +48,10 @@ class RawProcessor:
         self.single_run_name = os.path.basename(sim_folder)
 
         # Retain only the applicable result config
-        applicable_results = []
-        for result in cfg.results:
-            if result.apply_to is None or self.single_run_name in result.apply_to:
-                applicable_results.append(result)
-        self.cfg = ConfigRawProcessor(applicable_results)
+        if isinstance(cfg, ConfigRawProcessor):
+            cfg = RawProcessingPlan(cfg)
+        self.cfg = ConfigRawProcessor(cfg.get_results(self.single_run_name))
+        self.pipeline = cfg.get_pipeline(self.single_run_name)
 
         # adjourn the metadata
         self.metadata = self._read_metadata_run()
@@ -50,7 +59,8 @@ class RawProcessor:
 
         # decide the proper simulation parser depending on codes
         if self.code in (CODE.MCNP, CODE.D1S):
-            self.sim_output = MCNPSimOutput(sim_folder)
+            # the statistical checks of the output file are not needed here
+            self.sim_output = MCNPSimOutput(sim_folder, tallies_only=True)
         elif self.code == CODE.OPENMC:
             self.sim_output = OpenMCSimOutput(sim_folder)
         else:
@@ -62,38 +72,34 @@ class RawProcessor:
         """Process the raw data from the simulation and store the results in the output
         folder as .csv files.
         """
-        # dump the metadata
+        # dump the metadata. They are rewritten for each processed run, previous
+        # raw data of the benchmark may come from older simulations
         metadatafile = Path(self.out_folder, "metadata.json")
-        # if it is still not present, dump the metadata
-        if not metadatafile.exists():
-            self.metadata["jade_version"] = get_jade_version()
-            self.metadata["code_version"] = self.sim_output._read_code_version()
-            with open(metadatafile, "w") as file:
-                json.dump(self.metadata, file, indent=4)
-
-        for result in self.cfg.results:
-            mod_tallies = []
-            # first apply the modifications to the requested tallies
-            for tallyid, modifications in result.modify.items():
-                try:
-                    tally = self.sim_output.tallydata[tallyid].copy()
-                except KeyError:
-                    # for some benchmarks it may happen that the tally is not found
-                    logging.warning(
-                        "Tally %s not found for %s", tallyid, self.single_run_name
-                    )
-                    continue
-                for mod_option, keyargs in modifications:
-                    if mod_option == TallyModOption.VOLUME:
-                        keyargs = {
-                            "volumes": self.sim_output.output.cell_data.cell_volumes
-                        }
-                    if mod_option == TallyModOption.MASS:
-                        keyargs = {
-                            "masses": self.sim_output.output.cell_data.cell_masses
-                        }
-                    tally = MOD_FUNCTIONS[mod_option](tally, **keyargs)
-                mod_tallies.append(tally)
+        self.metadata["jade_version"] = get_jade_version()
+        self.metadata["code_version"] = self.sim_output._read_code_version()
+        # keep the index of the raw results, it is updated after the processing
+        try:
+            with open(metadatafile) as file:
+                index = json.load(file).get(INDEX_KEY)
+        except (FileNotFoundError, json.JSONDecodeError):
+            index = None
+        if index is not None:
+            self.metadata[INDEX_KEY] = index
+        # write to a run specific file first and then move it, different runs
+        # of the same benchmark may be processed concurrently
+        tmpfile = Path(self.out_folder, f".metadata_{self.single_run_name}.json")
+        with open(tmpfile, "w") as file:
+            json.dump(self.metadata, file, indent=4)
+        os.replace(tmpfile, metadatafile)
+
+        for result, mod_tallies, missing in self.pipeline.run(
+            self.sim_output.tallydata, self._get_keyargs
+        ):
+            for tallyid in missing:
+                # for some benchmarks it may happen that the tally is not found
+                logging.warning(
+                    "Tally %s not found for %s", tallyid, self.single_run_name
+                )
             # in case the number of found tallies is zero skip the df printing
             if len(mod_tallies) == 0:
                 continue
@@ -102,6 +108,14 @@ class RawProcessor:
             outfile = Path(self.out_folder, f"{self.single_run_name} {result.name}.csv")
             df.to_csv(outfile, header=True, index=False)
 
+    def _get_keyargs(self, mod_option: TallyModOption, keyargs: dict) -> dict:
+        """Keyargs of the modifications that are taken from the simulation output."""
+        if mod_option == TallyModOption.VOLUME:
+            return {"volumes": self.sim_output.output.cell_data.cell_volumes}
+        if mod_option == TallyModOption.MASS:
+            return {"masses": self.sim_output.output.cell_data.cell_masses}
+        return keyargs
+
     def _read_metadata_run(self) -> dict:
         """
         Retrieve the metadata from the run
@@ -116,3 +130,61 @@ class RawProcessor:
             metadata = {}
 
         return metadata
+
+
+def _process_single_run(
+    cfg: ConfigRawProcessor | RawProcessingPlan,
+    sim_folder: PathLike,
+    out_folder: PathLike,
+) -> str | None:
+    """Worker function for the parallel raw processing. Exceptions are not raised but
+    returned as formatted tracebacks so that a failure does not stop the other runs.
+    """
+    try:
+        processor = RawProcessor(cfg, sim_folder, out_folder)
+        processor.process_raw_data()
+    except Exception:
+        return traceback.format_exc()
+    return None
+
+
+def process_raw_parallel(
+    units: list[tuple[ConfigRawProcessor | RawProcessingPlan, PathLike, PathLike]],
+    jobs: int,
+) -> list[PathLike]:
+    """Process the raw data of multiple single runs using a pool of processes.
+
+    Each single run writes its own .csv files in its output folder, hence the
+    results do not depend on the order of completion of the different workers.
+
+    Parameters
+    ----------
+    units : list[tuple[ConfigRawProcessor | RawProcessingPlan, PathLike, PathLike]]
+        list of (raw config, simulation folder, output folder) to be processed.
+    jobs : int
+        number of worker processes to use.
+
+    Returns
+    -------
+    list[PathLike]
+        simulation folders for which the processing failed.
+    """
+    failed = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(
+                _process_single_run, cfg, sim_folder, out_folder
+            ): sim_folder
+            for cfg, sim_folder, out_folder in units
+        }
+        for future in tqdm(
+            as_completed(futures), total=len(futures), desc="Process raw"
+        ):
+            sim_folder = futures[future]
+            error = future.result()
+            if error is not None:
+                logging.error("Raw processing failed for %s:\n%s", sim_folder, error)
+                failed.append(sim_folder)
+    # keep a deterministic order in the report
+    failed.sort(key=str)
+    return failed
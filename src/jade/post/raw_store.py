@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from jade.helper.__optionals__ import PYARROW_AVAIL
+from jade.helper.aux_functions import PathLike
+
+if PYARROW_AVAIL:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+RAW_STORE_FILE = "raw_data.parquet"
+METADATA_FILE = "metadata.json"
+# key of the raw folder metadata storing the index of the .csv files
+INDEX_KEY = "raw_index"
+
+# raw folder indexes already loaded, with the folder modification time
+_INDEXES: dict[str, tuple[int, dict[str, list[tuple[str, str]]]]] = {}
+# key of the parquet metadata storing the columns and dtypes of each result
+SCHEMA_KEY = b"jade_results"
+
+
+def write_raw_store(raw_folder: PathLike) -> None:
+    """Collect all the .csv raw results of a benchmark in a single Parquet file.
+
+    All runs and results are stored in the same table, with the additional "Case"
+    (single run name) and "Result" columns. Each result is written in its own row
+    group so that reading a single result only touches its data. Columns that have
+    different types in different results are stored as strings, the original
+    columns and dtypes of each run and result are saved in the file metadata and
+    restored when reading.
+
+    Parameters
+    ----------
+    raw_folder : PathLike
+        raw data folder of the benchmark containing the .csv files.
+    """
+    results = {}
+    for run_name, result, file in _iter_csv_files(raw_folder):
+        df = pd.read_csv(file)
+        results.setdefault(result, {})[run_name] = df
+
+    schemas = {}
+    frames = []
+    for result in sorted(results):
+        # different runs may have different columns and dtypes for the same result
+        schemas[result] = {}
+        for run_name, df in results[result].items():
+            schemas[result][run_name] = {
+                col: str(dtype) for col, dtype in df.dtypes.items()
+            }
+            df["Case"] = run_name
+        df = pd.concat(results[result].values(), ignore_index=True)
+        df["Result"] = result
+        frames.append(df)
+
+    store_file = Path(raw_folder, RAW_STORE_FILE)
+    if len(frames) == 0:
+        if store_file.exists():
+            os.remove(store_file)
+        return
+
+    full = pd.concat(frames, ignore_index=True)
+    for col in full.columns[full.dtypes == object]:
+        # columns mixing strings and numbers cannot be typed, store them as strings
+        mask = full[col].notna()
+        full.loc[mask, col] = full.loc[mask, col].astype(str)
+
+    table = pa.Table.from_pandas(full, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**table.schema.metadata, SCHEMA_KEY: json.dumps(schemas).encode()}
+    )
+    # write to a temporary file first, the store is never left half written
+    tmpfile = Path(raw_folder, f".{RAW_STORE_FILE}")
+    with pq.ParquetWriter(tmpfile, table.schema) as writer:
+        offset = 0
+        for df in frames:
+            writer.write_table(table.slice(offset, len(df)))
+            offset += len(df)
+    os.replace(tmpfile, store_file)
+
+
+def read_raw_store(
+    raw_folder: PathLike, result: str, cases: Iterable[str] | None = None
+) -> dict[str, pd.DataFrame]:
+    """Read the data of a single result from the Parquet raw store of a benchmark.
+    The filters on result and cases are pushed down to the Parquet reader.
+
+    Parameters
+    ----------
+    raw_folder : PathLike
+        raw data folder of the benchmark.
+    result : str
+        name of the result to be read.
+    cases : Iterable[str] | None, optional
+        single runs to be read, by default None (all runs).
+
+    Returns
+    -------
+    dict[str, pd.DataFrame]
+        data of the requested result for each single run, with the same columns
+        and dtypes of the correspondent .csv file. Empty if the result is not in the
+        store.
+    """
+    store_file = Path(raw_folder, RAW_STORE_FILE)
+    schemas = json.loads(pq.read_schema(store_file).metadata[SCHEMA_KEY])
+    try:
+        run_schemas = schemas[result]
+    except KeyError:
+        return {}
+    if cases is not None:
+        run_schemas = {case: run_schemas[case] for case in cases if case in run_schemas}
+    if len(run_schemas) == 0:
+        return {}
+
+    columns = []
+    for schema in run_schemas.values():
+        columns.extend(col for col in schema if col not in columns)
+    filters = [("Result", "==", result)]
+    if cases is not None:
+        filters.append(("Case", "in", list(run_schemas)))
+    df = pq.read_table(
+        store_file, columns=["Case", *columns], filters=filters
+    ).to_pandas()
+
+    # missing strings are read as None, the .csv reader gives NaN instead
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].fillna(np.nan)
+
+    # the rows of each run are stored contiguously
+    case_col = df.pop("Case").to_numpy()
+    bounds = np.flatnonzero(case_col[1:] != case_col[:-1]) + 1
+    slices = {
+        case_col[start]: (start, stop)
+        for start, stop in zip(np.r_[0, bounds], np.r_[bounds, len(df)])
+        if start < stop
+    }
+    data = {}
+    for case, schema in run_schemas.items():
+        # runs with no data have no rows in the store
+        start, stop = slices.get(case, (0, 0))
+        run_df = df.iloc[start:stop]
+        if list(run_df.columns) != list(schema):
+            run_df = run_df[list(schema)]
+        run_df = run_df.reset_index(drop=True)
+        current = run_df.dtypes
+        for col, dtype in schema.items():
+            if str(current[col]) == dtype:
+                continue
+            if dtype == "bool":
+                run_df[col] = run_df[col] == "True"
+            else:
+                run_df[col] = run_df[col].astype(dtype)
+        data[case] = run_df
+    return data
+
+
+def iter_run_results(
+    raw_folder: PathLike, result: str
+) -> Iterator[tuple[str, pd.DataFrame]]:
+    """Yield the single run name and the data of a result for each run of a
+    benchmark. The Parquet raw store is used if available, otherwise the .csv files
+    are read.
+
+    Parameters
+    ----------
+    raw_folder : PathLike
+        raw data folder of the benchmark.
+    result : str
+        name of the result to be read.
+
+    Yields
+    ------
+    Iterator[tuple[str, pd.DataFrame]]
+        single run name and its data for the requested result.
+    """
+    if Path(raw_folder, RAW_STORE_FILE).exists():
+        yield from read_raw_store(raw_folder, result).items()
+    else:
+        for run_name, file in get_raw_index(raw_folder).get(result, []):
+            yield run_name, pd.read_csv(Path(raw_folder, file))
+
+
+def build_raw_index(raw_folder: PathLike) -> dict[str, list[tuple[str, str]]]:
+    """Index the .csv raw results of a benchmark by result name.
+
+    Parameters
+    ----------
+    raw_folder : PathLike
+        raw data folder of the benchmark.
+
+    Returns
+    -------
+    dict[str, list[tuple[str, str]]]
+        for each result, the single run names and the names of their .csv files.
+    """
+    index = {}
+    for run_name, result, file in _iter_csv_files(raw_folder):
+        index.setdefault(result, []).append((run_name, file.name))
+    return index
+
+
+def write_raw_index(raw_folder: PathLike) -> None:
+    """Store the index of the .csv raw results in the metadata of the raw folder,
+    together with the modification time of the folder. Nothing is done if the
+    metadata file does not exist.
+
+    Parameters
+    ----------
+    raw_folder : PathLike
+        raw data folder of the benchmark.
+    """
+    metadata_file = Path(raw_folder, METADATA_FILE)
+    if not metadata_file.exists():
+        return
+    # the metadata file is overwritten in place, which does not change the
+    # modification time of the folder
+    mtime = os.stat(raw_folder).st_mtime_ns
+    with open(metadata_file) as f:
+        metadata = json.load(f)
+    metadata[INDEX_KEY] = {"mtime": mtime, "results": build_raw_index(raw_folder)}
+    with open(metadata_file, "w") as f:
+        json.dump(metadata, f, indent=4)
+
+
+def get_raw_index(raw_folder: PathLike) -> dict[str, list[tuple[str, str]]]:
+    """Get the index of the .csv raw results of a benchmark. The index stored in
+    the folder metadata is used if the folder was not modified since it was
+    written, otherwise the folder is scanned again. Indexes are kept in memory
+    while the folder does not change.
+
+    Parameters
+    ----------
+    raw_folder : PathLike
+        raw data folder of the benchmark.
+
+    Returns
+    -------
+    dict[str, list[tuple[str, str]]]
+        for each result, the single run names and the names of their .csv files.
+    """
+    key = str(raw_folder)
+    mtime = os.stat(raw_folder).st_mtime_ns
+    cached = _INDEXES.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    index = None
+    try:
+        with open(Path(raw_folder, METADATA_FILE)) as f:
+            stored = json.load(f)[INDEX_KEY]
+        if stored["mtime"] == mtime:
+            index = {
+                result: [tuple(item) for item in items]
+                for result, items in stored["results"].items()
+            }
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        pass
+    if index is None:
+        index = build_raw_index(raw_folder)
+    _INDEXES[key] = (mtime, index)
+    return index
+
+
+def remove_raw_store(raw_folder: PathLike) -> None:
+    """Delete the Parquet raw store of a benchmark, if present."""
+    store_file = Path(raw_folder, RAW_STORE_FILE)
+    if store_file.exists():
+        os.remove(store_file)
+
+
+def _iter_csv_files(raw_folder: PathLike) -> Iterator[tuple[str, str, Path]]:
+    """Yield single run name, result name and path of the .csv raw results."""
+    for file in sorted(os.listdir(raw_folder)):
+        if not file.endswith(".csv"):
+            continue
+        splits = file.split(" ")
+        # ASSUMPTION: run name is continous, result name can have spaces
+        yield splits[0], " ".join(splits[1:])[:-4], Path(raw_folder, file)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+
+import pandas as pd
+
+from jade.helper.aux_functions import PathLike
+from jade.post.raw_store import iter_run_results
+
+DEFAULT_MAX_SIZE = 2**30  # 1 GB
+
+
+class RawResultCache:
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        """In-memory cache of the raw results read during the post-processing, so
+        that the excel and atlas processors parse each raw result only once.
+
+        The memory used by the cached dataframes is bounded, when the bound is
+        exceeded the least recently used results are evicted.
+
+        Parameters
+        ----------
+        max_size : int, optional
+            maximum memory (in bytes) used by the cached dataframes, by default
+            1 GB.
+
+        Attributes
+        ----------
+        size : int
+            memory (in bytes) currently used by the cached dataframes.
+        hits : int
+            number of requests served from the cache.
+        misses : int
+            number of requests that required reading the raw data.
+        """
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[tuple[str, str], list[tuple[str, pd.DataFrame]]] = (
+            OrderedDict()
+        )
+        self._sizes: dict[tuple[str, str], int] = {}
+
+    def get_run_results(
+        self, raw_folder: PathLike, result: str
+    ) -> list[tuple[str, pd.DataFrame]]:
+        """Get the data of a result for each single run of a benchmark, reading it
+        only if it is not cached.
+
+        Parameters
+        ----------
+        raw_folder : PathLike
+            raw data folder of the benchmark and code-lib.
+        result : str
+            name of the result.
+
+        Returns
+        -------
+        list[tuple[str, pd.DataFrame]]
+            single run names and their data. The dataframes are copies and can be
+            freely modified.
+        """
+        key = (str(raw_folder), result)
+        try:
+            runs = self._data[key]
+            self._data.move_to_end(key)
+            self.hits += 1
+        except KeyError:
+            runs = list(iter_run_results(raw_folder, result))
+            self.misses += 1
+            self._add(key, runs)
+        return [(run_name, df.copy()) for run_name, df in runs]
+
+    def _add(self, key: tuple[str, str], runs: list[tuple[str, pd.DataFrame]]) -> None:
+        size = sum(int(df.memory_usage(deep=True).sum()) for _, df in runs)
+        if size > self.max_size:
+            logging.debug("%s %s is too large to be cached", *key)
+            return
+        # evict the least recently used results
+        while self.size + size > self.max_size:
+            old_key, _ = self._data.popitem(last=False)
+            self.size -= self._sizes.pop(old_key)
+        self._data[key] = runs
+        self._sizes[key] = size
+        self.size += size
+
+    def clear(self) -> None:
+        """Remove all cached results."""
+        self._data.clear()
+        self._sizes.clear()
+        self.size = 0
@@ -2,8 +2,13 @@ from __future__ import annotations
 
 import logging
 import os
+import re
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from functools import partial
+from itertools import islice
 from pathlib import Path
+from types import SimpleNamespace
 from typing import TYPE_CHECKING
 
 import pandas as pd
@@ -12,6 +17,7 @@ from f4enix.output.mctal import Mctal, Tally
 from f4enix.output.meshtal import Meshtal
 
 from jade.helper.__optionals__ import OMC_AVAIL
+from jade.helper.errors import TallyNotFoundError
 
 if TYPE_CHECKING:
     from jade.helper.aux_functions import PathLike
@@ -19,6 +25,9 @@ if TYPE_CHECKING:
 if OMC_AVAIL:
     import jade.helper.openmc as omc
 
+# number of lines of the MCNP output file header scanned for the code version
+HEADER_LINES = 34
+
 
 class AbstractSimOutput(ABC):
     def __init__(self, sim_folder: PathLike) -> None:
@@ -38,6 +47,8 @@ class AbstractSimOutput(ABC):
     @abstractmethod
     def tallydata(self) -> dict[int, pd.DataFrame]:
         """This contains for each tally in the simulation the data in a pandas DataFrame.
+        The dataframes may be built only when accessed for the first time (see
+        LazyTallyData).
 
         Returns
         -------
@@ -94,17 +105,155 @@ class AbstractSimOutput(ABC):
         pass
 
 
+def _scan_code_version(output_file: PathLike) -> str:
+    """Read the MCNP (or D1SUNED) version from the header of the output file,
+    without reading the whole file. Same logic of the f4enix Output parser: if the
+    version is not in the header, the first lines of the .out or .dump files in the
+    same folder are checked.
+
+    Parameters
+    ----------
+    output_file : PathLike
+        path to the MCNP output file.
+
+    Returns
+    -------
+    str
+        the code version.
+
+    Raises
+    ------
+    ValueError
+        if the version is not found.
+    """
+    pat_d1s_header = re.compile(r"d1suned\s+version\s+\d+")
+    pat_version = re.compile(r"(?<=version)\s+\d+")
+    pat_mcnp = re.compile(r"(?<=MCNP_)[\d.]+")
+
+    with open(output_file, "r", errors="ignore") as infile:
+        header = list(islice(infile, HEADER_LINES))
+    for line in header:
+        if pat_d1s_header.search(line) is not None:
+            version = pat_version.search(line).group().strip()
+            return f"d1suned{version}"
+    for line in header[:4]:
+        if pat_mcnp.search(line) is not None:
+            return pat_mcnp.search(line).group().strip("0")
+
+    # In case is not in the header (it happens on sbatch runs) try to look
+    # in the same folder for a .out or .dump file
+    pat_d1s = re.compile(r"(?<=d1suned  ver=)\d+")
+    folder = os.path.dirname(output_file)
+    for file in os.listdir(folder):
+        if file.endswith((".out", ".dump")):
+            with open(os.path.join(folder, file), "r", errors="ignore") as infile:
+                for line in islice(infile, 4):
+                    if pat_d1s.search(line) is not None:
+                        return f"d1suned{pat_d1s.search(line).group()}"
+                    if pat_mcnp.search(line) is not None:
+                        return pat_mcnp.search(line).group().strip("0")
+
+    raise ValueError("No version was found in the output file or aux files")
+
+
+class LazyTallyData(dict):
+    def __init__(self, loaders: dict[int, Callable[[], pd.DataFrame | None]]) -> None:
+        """Dictionary of tally dataframes where each dataframe is built only the
+        first time it is accessed. Loaders raising a TallyNotFoundError mean that the
+        tally is not available after all, and the key is removed. Any other error is
+        propagated.
+
+        Parameters
+        ----------
+        loaders : dict[int, Callable[[], pd.DataFrame | None]]
+            functions building the tally dataframes, indexed by tally number.
+        """
+        super().__init__()
+        self._loaders = {}
+        for key, loader in loaders.items():
+            self._loaders[key] = loader
+            dict.__setitem__(self, key, None)
+
+    def __getitem__(self, key: int) -> pd.DataFrame | None:
+        if key in self._loaders:
+            loader = self._loaders.pop(key)
+            try:
+                value = loader()
+            except TallyNotFoundError:
+                dict.__delitem__(self, key)
+                raise
+            dict.__setitem__(self, key, value)
+        return dict.__getitem__(self, key)
+
+    def __setitem__(self, key: int, value: pd.DataFrame | None) -> None:
+        self._loaders.pop(key, None)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key: int) -> None:
+        self._loaders.pop(key, None)
+        dict.__delitem__(self, key)
+
+    def get(self, key: int, default=None) -> pd.DataFrame | None:
+        if key not in self:
+            return default
+        try:
+            return self[key]
+        except TallyNotFoundError:
+            return default
+
+    def items(self) -> list[tuple[int, pd.DataFrame | None]]:
+        items = []
+        for key in list(self.keys()):
+            try:
+                items.append((key, self[key]))
+            except TallyNotFoundError:
+                continue
+        return items
+
+    def values(self) -> list[pd.DataFrame | None]:
+        return [value for _, value in self.items()]
+
+    @property
+    def loaded(self) -> list[int]:
+        """Tally numbers whose dataframe has already been built."""
+        return [key for key in self.keys() if key not in self._loaders]
+
+
+class _LazyMctal(Mctal):
+    """Mctal parser that does not convert all tallies to dataframes at
+    initialization. The conversion can then be requested tally by tally.
+
+    f4enix has no public API to convert a single tally, so its (private) conversion
+    of all the tallies is applied to a list containing only the requested one. The
+    f4enix version is pinned accordingly and the conversion is checked against the
+    full f4enix parsing in the tests.
+    """
+
+    def _get_dfs(self, collapse: bool = False) -> tuple[dict, dict]:
+        return {}, {}
+
+    def get_tally_dfs(self, tally: Tally) -> tuple[pd.DataFrame, pd.DataFrame | None]:
+        """Convert a single tally to the dataframes of its bins and total bins."""
+        # the f4enix conversion only needs the list of tallies to convert
+        tallydata, totalbin = Mctal._get_dfs(SimpleNamespace(tallies=[tally]))
+        return tallydata[tally.tallyNumber], totalbin[tally.tallyNumber]
+
+
 class MCNPSimOutput(AbstractSimOutput):
-    def __init__(
-        self,
-        sim_folder: PathLike,
-    ) -> None:
+    def __init__(self, sim_folder: PathLike, tallies_only: bool = False) -> None:
         """
-        Class parsing all outputs coming from MCNP run
+        Class parsing all outputs coming from MCNP run. Only the mctal file is read
+        at initialization, the tallies are converted to dataframes when first
+        accessed. The output file and the meshtal file are parsed only if needed.
 
         Parameters
         ----------
         sim_folder : PathLike
+            path to the MCNP simulation folder.
+        tallies_only : bool, optional
+            if True, the MCNP output file is never fully parsed: the code version is
+            read from its header and the statistical checks are not available. By
+            default False.
 
         Returns
         -------
@@ -112,99 +261,38 @@ class MCNPSimOutput(AbstractSimOutput):
 
         """
         self.sim_folder = sim_folder
+        self.tallies_only = tallies_only
         mctal_file, output_file, meshtal_file = self.retrieve_files(sim_folder)
-
-        # Read and parse the mctal file
-        mctal = Mctal(mctal_file)
-        # --- restore cabability to collapse segment and cells ---
-        # The double binning Surfaces/cells with segments can create
-        # issues for JADE since if another binning is added
-        # (such as energy) it is not supported. Nevertheless,
-        # the additional segmentation can be quite useful and this can be
-        # collapsed de facto in a single geometrical binning
-        tallydata = mctal.tallydata
-        total_bin = mctal.totalbin
-        for dictionary in [tallydata, total_bin]:
-            for _, df in dictionary.items():
-                if df is not None:
-                    if (
-                        "Cells" in df.columns
-                        and "Segments" in df.columns
-                        and len(df) > 1
-                    ):
-                        # Then we can collapse this in a single geometrical binning
-                        values = []
-                        for cell, segment in zip(df.Cells, df.Segments):
-                            val = str(int(cell)) + "-" + str(int(segment))
-                            values.append(val)
-                        df["Cells-Segments"] = values
-                        # delete the collapsed columns
-                        del df["Cells"]
-                        del df["Segments"]
-
-                    # another thing that can happen mostly for d1s is that there
-                    # are user bins with fake total bin, i.e., there is only one bin
-                    # and a total bin having the same value. This is a problem
-                    # since f4enix parser will not drop the "fake" additional column
-                    try:
-                        usr_bins = set(df["User"].to_list())
-                        if len(usr_bins) <= 2 and "total" in usr_bins:
-                            # then the column does not add any additional info, to drop
-                            del df["User"]
-                            # and drop the duplicates ignoring the warning
-                            with pd.option_context("mode.chained_assignment", None):
-                                df.drop_duplicates(inplace=True)
-                    except KeyError:
-                        pass  # no user column
-
-        self.mctal = mctal
-        self._tally_numbers = []
-        self._tally_comments = []
-        # Read the output file
-        self.out = Output(output_file)
-        stat_checks = self.out.get_statistical_checks_tfc_bins()
-        self.stat_checks = self.out.assign_tally_description(
-            stat_checks, self.mctal.tallies
-        )
-        # Read the meshtal file
+        self._output_file = output_file
+        self._out = None
+        self._stat_checks = None
+        self._tally_numbers = None
+        self._tally_comments = None
+        self._converted = {}
+        self._mesh_tallies = None
+
+        # Read the mctal file
+        self.mctal = _LazyMctal(mctal_file)
+        self._tallies = {tally.tallyNumber: tally for tally in self.mctal.tallies}
+        tally_loaders = {}
+        totalbin_loaders = {}
+        for tallynum in self._tallies:
+            tally_loaders[tallynum] = partial(self._get_tally, tallynum)
+            totalbin_loaders[tallynum] = partial(self._get_totalbin, tallynum)
+
+        # Only the position of the meshes is scanned here
         if meshtal_file is not None:
-            self.meshtal = Meshtal(meshtal_file)
-            self.meshtal.readMesh()
-            # Extract the available 1D to be merged with normal tallies
-            for msh in self.meshtal.mesh.values():
-                try:
-                    tallynum, tallydata1D, comment = msh.convert2tally()
-                    # Add them to the tallly data
-                    tallydata[tallynum] = tallydata1D
-                    total_bin[tallynum] = None
-                    # Create fake tallies to be added to the mctal
-                    dummyTally = Tally(tallynum)
-                    dummyTally.tallyComment = [comment]
-                    self.mctal.tallies.append(dummyTally)
-                except RuntimeError:
-                    continue  # not a 1D mesh
-        for tally in self.mctal.tallies:
-            self._tally_numbers.append(tally.tallyNumber)
-            if len(tally.tallyComment) > 0:
-                self._tally_comments.append(tally.tallyComment[0])
-            else:
-                self._tally_comments.append("")
-
-        for df in tallydata.values():
-            # drop a row if it contains total in whatever column
-            if "total" in df.values:
-                df.drop(
-                    df[
-                        df.apply(
-                            lambda row: row.astype(str).str.contains("total").any(),
-                            axis=1,
-                        )
-                    ].index,
-                    inplace=True,
-                )
-
-        self._tallydata = tallydata
-        self._totalbin = total_bin
+            self._meshtal = Meshtal(meshtal_file)
+            self._meshtal_read = False
+            # 1D meshes will be merged with normal tallies
+            for tallynum in self._meshtal.mesh_ids:
+                tally_loaders[tallynum] = partial(self._get_mesh_tally, tallynum)
+                totalbin_loaders[tallynum] = partial(self._get_mesh_totalbin, tallynum)
+        else:
+            self._meshtal = None
+
+        self._tallydata = LazyTallyData(tally_loaders)
+        self._totalbin = LazyTallyData(totalbin_loaders)
 
     @property
     def tallydata(self) -> dict[int, pd.DataFrame]:
@@ -216,16 +304,144 @@ class MCNPSimOutput(AbstractSimOutput):
 
     @property
     def tally_numbers(self) -> list[int]:
+        if self._tally_numbers is None:
+            self._read_tally_info()
         return self._tally_numbers
 
     @property
     def tally_comments(self) -> list[str]:
+        if self._tally_comments is None:
+            self._read_tally_info()
         return self._tally_comments
 
+    @property
+    def out(self) -> Output:
+        """Parsed MCNP output file."""
+        if self._out is None:
+            self._out = Output(self._output_file)
+        return self._out
+
+    @property
+    def stat_checks(self) -> dict | None:
+        """Results of the statistical checks of the MCNP output file. None in
+        tallies-only mode."""
+        if self.tallies_only:
+            return None
+        if self._stat_checks is None:
+            stat_checks = self.out.get_statistical_checks_tfc_bins()
+            self._stat_checks = self.out.assign_tally_description(
+                stat_checks, list(self._tallies.values())
+            )
+        return self._stat_checks
+
+    @property
+    def meshtal(self) -> Meshtal | None:
+        """Parsed meshtal file, None if no meshtal file was produced."""
+        if self._meshtal is not None and not self._meshtal_read:
+            self._meshtal.readMesh()
+            self._meshtal_read = True
+        return self._meshtal
+
+    def _get_tally(self, tallynum: int) -> pd.DataFrame:
+        return self._convert_tally(tallynum)[0]
+
+    def _get_totalbin(self, tallynum: int) -> pd.DataFrame | None:
+        return self._convert_tally(tallynum)[1]
+
+    def _convert_tally(self, tallynum: int) -> tuple[pd.DataFrame, pd.DataFrame | None]:
+        """Convert a single mctal tally to the dataframes of its bins and of its
+        total bins."""
+        if tallynum in self._converted:
+            return self._converted[tallynum]
+
+        try:
+            tally = self._tallies[tallynum]
+        except KeyError:
+            raise TallyNotFoundError(tallynum) from None
+        df, dftotal = self.mctal.get_tally_dfs(tally)
+        for data in [df, dftotal]:
+            if data is not None:
+                # --- restore cabability to collapse segment and cells ---
+                # The double binning Surfaces/cells with segments can create
+                # issues for JADE since if another binning is added
+                # (such as energy) it is not supported. Nevertheless,
+                # the additional segmentation can be quite useful and this can be
+                # collapsed de facto in a single geometrical binning
+                if (
+                    "Cells" in data.columns
+                    and "Segments" in data.columns
+                    and len(data) > 1
+                ):
+                    # Then we can collapse this in a single geometrical binning
+                    _collapse_cells_segments(data)
+
+                # another thing that can happen mostly for d1s is that there
+                # are user bins with fake total bin, i.e., there is only one bin
+                # and a total bin having the same value. This is a problem
+                # since f4enix parser will not drop the "fake" additional column
+                try:
+                    usr_bins = set(data["User"].to_list())
+                    if len(usr_bins) <= 2 and "total" in usr_bins:
+                        # then the column does not add any additional info, to drop
+                        del data["User"]
+                        # and drop the duplicates ignoring the warning
+                        with pd.option_context("mode.chained_assignment", None):
+                            data.drop_duplicates(inplace=True)
+                except KeyError:
+                    pass  # no user column
+
+        # drop a row if it contains total in whatever column
+        _drop_total_rows(df)
+        self._converted[tallynum] = (df, dftotal)
+        return df, dftotal
+
+    def _load_mesh_tallies(self) -> dict[int, tuple[pd.DataFrame, str]]:
+        """Extract all 1D meshes from the meshtal file as tallies."""
+        if self._mesh_tallies is None:
+            self._mesh_tallies = {}
+            for msh in self.meshtal.mesh.values():
+                try:
+                    tallynum, tallydata1D, comment = msh.convert2tally()
+                except RuntimeError:
+                    continue  # not a 1D mesh
+                _drop_total_rows(tallydata1D)
+                self._mesh_tallies[tallynum] = (tallydata1D, comment)
+                # Create fake tallies to be added to the mctal
+                dummyTally = Tally(tallynum)
+                dummyTally.tallyComment = [comment]
+                self.mctal.tallies.append(dummyTally)
+        return self._mesh_tallies
+
+    def _get_mesh_tally(self, tallynum: int) -> pd.DataFrame:
+        mesh_tallies = self._load_mesh_tallies()
+        if tallynum in mesh_tallies:
+            return mesh_tallies[tallynum][0]
+        # not a 1D mesh, a normal tally may still have the same number
+        return self._get_tally(tallynum)
+
+    def _get_mesh_totalbin(self, tallynum: int) -> pd.DataFrame | None:
+        if tallynum in self._load_mesh_tallies():
+            return None
+        return self._get_totalbin(tallynum)
+
+    def _read_tally_info(self) -> None:
+        if self._meshtal is not None:
+            # meshes need to be read to know which ones are 1D tallies
+            self._load_mesh_tallies()
+        self._tally_numbers = []
+        self._tally_comments = []
+        for tally in self.mctal.tallies:
+            self._tally_numbers.append(tally.tallyNumber)
+            if len(tally.tallyComment) > 0:
+                self._tally_comments.append(tally.tallyComment[0])
+            else:
+                self._tally_comments.append("")
+
     def _read_code_version(self) -> str | None:
         try:
-            version = self.out.get_code_version()
-            return version
+            if self.tallies_only:
+                return _scan_code_version(self._output_file)
+            return self.out.get_code_version()
         except ValueError:
             logging.warning(
                 "Code version not found in the output file or aux file for %s",
@@ -284,27 +500,37 @@ class OpenMCSimOutput(AbstractSimOutput):
         _, statefile, volfile = self.retrieve_file(sim_folder)
 
         self.output = omc.OpenMCStatePoint(statefile, volfile)
-        self._tally_numbers = self.output.tally_numbers
-        self._tally_comments = self.output.tally_comments
-        self._tallydata, self._totalbin = self._process_tally()
+        # heating tallies are combined between them, hence the tallies are all
+        # converted together the first time they are accessed
+        self._tallydata = None
+        self._totalbin = None
         self.stat_checks = None
 
     @property
     def tally_numbers(self) -> list[int]:
-        return self._tally_numbers
+        # the tally numbers are updated during the tallies conversion
+        self._load_tallies()
+        return self.output.tally_numbers
 
     @property
     def tally_comments(self) -> list[str]:
-        return self._tally_comments
+        self._load_tallies()
+        return self.output.tally_comments
 
     @property
     def tallydata(self) -> dict[int, pd.DataFrame]:
+        self._load_tallies()
         return self._tallydata
 
     @property
     def totalbin(self) -> dict[int, pd.DataFrame]:
+        self._load_tallies()
         return self._totalbin
 
+    def _load_tallies(self) -> None:
+        if self._tallydata is None:
+            self._tallydata, self._totalbin = self._process_tally()
+
     @staticmethod
     def retrieve_file(
         results_path: PathLike,
@@ -439,3 +665,37 @@ def _remove_constant_columns(df: pd.DataFrame) -> pd.DataFrame:
                 # Should work as long as they are the exact same value
                 del df[column]
     return df
+
+
+def _collapse_cells_segments(df: pd.DataFrame) -> None:
+    """Collapse inplace the Cells and Segments columns of an MCNP tally in a single
+    "Cells-Segments" column with "<cell>-<segment>" labels. The labels are built only
+    once for each unique cell-segment couple and then broadcasted to the rows.
+    """
+    cells, cell_labels = pd.factorize(df["Cells"].astype(int))
+    segments, segment_labels = pd.factorize(df["Segments"].astype(int))
+    n_segments = len(segment_labels)
+    # encode each couple in a single integer
+    codes, couples = pd.factorize(cells * n_segments + segments)
+    labels = (
+        cell_labels.astype(str)[couples // n_segments]
+        + "-"
+        + segment_labels.astype(str)[couples % n_segments]
+    )
+    df["Cells-Segments"] = labels.to_numpy()[codes]
+    # delete the collapsed columns
+    del df["Cells"]
+    del df["Segments"]
+
+
+def _drop_total_rows(df: pd.DataFrame) -> None:
+    """Drop inplace the rows of an MCNP tally containing a "total" bin in any column.
+    Only the non numerical columns can contain the "total" label, hence the numerical
+    ones are not checked.
+    """
+    mask = None
+    for column in df.select_dtypes(include=["object", "category"]).columns:
+        is_total = (df[column] == "total").to_numpy(dtype=bool)
+        mask = is_total if mask is None else mask | is_total
+    if mask is not None and mask.any():
+        df.drop(df.index[mask], inplace=True)
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Mapping
+
+import pandas as pd
+
+from jade.config.raw_config import ResultConfig, TallyModOption
+from jade.post.manipulate_tally import MOD_FUNCTIONS, READ_ONLY_MODS
+
+
+class _Step:
+    def __init__(
+        self,
+        tallyid: int,
+        mod_option: TallyModOption | None = None,
+        keyargs: dict | None = None,
+        parent: _Step | None = None,
+    ) -> None:
+        """Node of the tree of modifications applied to a tally. The root node (no
+        modification) represents the tally as read from the simulation output.
+        """
+        self.tallyid = tallyid
+        self.mod_option = mod_option
+        self.keyargs = keyargs
+        self.parent = parent
+        self.children: list[_Step] = []
+        # number of (result, tally) pairs whose modifications pass by this step
+        self.users = 0
+
+    def child(self, mod_option: TallyModOption, keyargs: dict) -> _Step:
+        """Get the step that follows this one with the given modification."""
+        for step in self.children:
+            if step.mod_option == mod_option and step.keyargs == keyargs:
+                return step
+        step = _Step(self.tallyid, mod_option, keyargs, self)
+        self.children.append(step)
+        return step
+
+
+class TallyPipeline:
+    def __init__(self, results: list[ResultConfig]) -> None:
+        """Compiled modifications of the tallies needed to build a list of results.
+
+        The modifications of all results are merged in a tree so that when several
+        results start from the same tally with the same first modifications, these
+        are applied only once. Each tally is copied only before the first
+        modification that would change it in place, and it is not copied at all if
+        it is only read.
+
+        Parameters
+        ----------
+        results : list[ResultConfig]
+            results to build from the simulation tallies.
+        """
+        self.results = results
+        self._roots: dict[int, _Step] = {}
+        self._leaves: list[list[_Step]] = []
+        for result in results:
+            leaves = []
+            for tallyid, modifications in result.modify.items():
+                if tallyid not in self._roots:
+                    self._roots[tallyid] = _Step(tallyid)
+                step = self._roots[tallyid]
+                step.users += 1
+                for mod_option, keyargs in modifications:
+                    step = step.child(mod_option, keyargs)
+                    step.users += 1
+                leaves.append(step)
+            self._leaves.append(leaves)
+
+    def run(
+        self,
+        tallies: Mapping[int, pd.DataFrame],
+        get_keyargs: Callable[[TallyModOption, dict], dict] | None = None,
+    ) -> Iterator[tuple[ResultConfig, list[pd.DataFrame], list[int]]]:
+        """Apply the modifications to the tallies of a simulation, one result at a
+        time. The tallies are never modified.
+
+        Parameters
+        ----------
+        tallies : Mapping[int, pd.DataFrame]
+            tallies of the simulation indexed by tally id.
+        get_keyargs : Callable[[TallyModOption, dict], dict] | None, optional
+            function returning the actual keyargs of a modification given its option
+            and configured keyargs, used for the keyargs that depend on the
+            simulation. By default None, the configured keyargs are used.
+
+        Yields
+        ------
+        tuple[ResultConfig, list[pd.DataFrame], list[int]]
+            the result config, its modified tallies and the ids of the tallies that
+            were not found in the simulation.
+        """
+        # intermediate tallies that are still needed by other results, with a
+        # flag telling if they can be modified in place by their last user
+        shared: dict[_Step, tuple[pd.DataFrame, bool]] = {}
+        remaining = {}
+        # tallies already given to the caller, which cannot be modified anymore
+        yielded: set[int] = set()
+        for result, leaves in zip(self.results, self._leaves):
+            mod_tallies = []
+            missing = []
+            for leaf in leaves:
+                tally = self._evaluate(
+                    leaf, tallies, get_keyargs, shared, remaining, yielded
+                )
+                if tally is None:
+                    missing.append(leaf.tallyid)
+                else:
+                    yielded.add(id(tally))
+                    mod_tallies.append(tally)
+            yield result, mod_tallies, missing
+
+    def _evaluate(
+        self,
+        leaf: _Step,
+        tallies: Mapping[int, pd.DataFrame],
+        get_keyargs: Callable[[TallyModOption, dict], dict] | None,
+        shared: dict[_Step, tuple[pd.DataFrame, bool]],
+        remaining: dict[_Step, int],
+        yielded: set[int],
+    ) -> pd.DataFrame | None:
+        # go back to the last step that was already computed
+        path = []
+        step = leaf
+        while step is not None and step not in shared:
+            path.append(step)
+            step = step.parent
+        if step is None:
+            root = path.pop()
+            try:
+                tally = tallies[root.tallyid]
+            except KeyError:
+                return None
+            # the tally of the simulation output is never owned
+            tally, owned = self._share(root, tally, False, shared, remaining)
+        else:
+            tally, owned = self._take(step, shared, remaining)
+
+        for step in reversed(path):
+            keyargs = step.keyargs
+            if get_keyargs is not None:
+                keyargs = get_keyargs(step.mod_option, keyargs)
+            if id(tally) in yielded:
+                owned = False
+            if not owned and step.mod_option not in READ_ONLY_MODS:
+                tally = tally.copy()
+                owned = True
+            new_tally = MOD_FUNCTIONS[step.mod_option](tally, **keyargs)
+            # read only modifications may return the input tally itself
+            owned = owned or new_tally is not tally
+            tally, owned = self._share(step, new_tally, owned, shared, remaining)
+        return tally
+
+    @staticmethod
+    def _share(
+        step: _Step,
+        tally: pd.DataFrame,
+        owned: bool,
+        shared: dict[_Step, tuple[pd.DataFrame, bool]],
+        remaining: dict[_Step, int],
+    ) -> tuple[pd.DataFrame, bool]:
+        """Store the tally of a step if other results still need it. In that case it
+        cannot be modified in place anymore.
+        """
+        remaining[step] = remaining.get(step, step.users) - 1
+        if remaining[step] > 0:
+            shared[step] = (tally, owned)
+            return tally, False
+        return tally, owned
+
+    @staticmethod
+    def _take(
+        step: _Step,
+        shared: dict[_Step, tuple[pd.DataFrame, bool]],
+        remaining: dict[_Step, int],
+    ) -> tuple[pd.DataFrame, bool]:
+        """Get a stored tally. The last user of a tally gets also its ownership."""
+        tally, owned = shared[step]
+        if remaining[step] > 1:
+            owned = False
+        # the previous steps are used too
+        while step is not None:
+            remaining[step] -= 1
+            if remaining[step] == 0:
+                shared.pop(step, None)
+            step = step.parent
+        return tally, owned
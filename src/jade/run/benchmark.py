@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
 import shutil
 import subprocess
+import time
 from abc import ABC, abstractmethod
 from pathlib import Path
 
@@ -39,6 +41,21 @@ from jade.run.input import (
     InputOpenMcSphere,
     InputSerpent,
 )
+from jade.run.job_array import (
+    array_log_suffix,
+    array_script_body,
+    array_submit_options,
+    build_index,
+)
+from jade.run.local_pool import LocalRun
+from jade.run.scheduling import (
+    NPS_KEY,
+    carry_wall_time,
+    pack_runs,
+    read_wall_times,
+    record_wall_time,
+    sort_longest_first,
+)
 
 
 class SingleRun(ABC):
@@ -65,10 +82,11 @@ class SingleRun(ABC):
         self.input = input
         self.name = self.input.name
         self.lib = library
+        self.nps = int(nps)
         # Translate the input to the requested library
         input.translate()
         # Set nps
-        input.set_nps(int(nps))
+        input.set_nps(self.nps)
 
     @property
     @abstractmethod
@@ -135,13 +153,14 @@ class SingleRun(ABC):
         metadata["jade_run_version"] = get_jade_version()
         metadata["library"] = self.lib.name
         metadata["code"] = self.code.value
+        metadata[NPS_KEY] = self.nps
         outfile = os.path.join(outpath, "metadata.json")
         with open(outfile, "w", encoding="utf-8") as f:
             json.dump(metadata, f, indent=4)
 
     def run(
         self, env_vars: EnvironmentVariables, sim_folder: PathLike, test=False
-    ) -> bool | str | list[str]:
+    ) -> bool | str | list[str] | LocalRun:
         """Run the simulation.
 
         Parameters
@@ -155,21 +174,16 @@ class SingleRun(ABC):
 
         Returns
         -------
-        bool | str | list[str]
+        bool | str | list[str] | LocalRun
             True if the simulation run correctly, False otherwise.
             If the test flag is set, the command to run the simulation is returned instead
             in case of global job, only returns the command list.
+            In case of local pool, the simulation is not run but returned to be
+            queued in the pool.
         """
-        run_command = self._build_command(env_vars)
+        run_command = self._get_run_command(env_vars)
         name, value = self._get_lib_data_command()
         lib_data_command = f'export {name}="{value}"'
-        # if the exe prefix is present it takes precedence
-        if env_vars.exe_prefix is not None:
-            run_command.insert(0, env_vars.exe_prefix)
-
-        elif env_vars.mpi_tasks is not None and env_vars.mpi_tasks > 1:
-            run_command.insert(0, f"-np {env_vars.mpi_tasks}")
-            run_command.insert(0, "mpirun")
 
         flagnotrun = False
         if env_vars.run_mode == RunMode.JOB_SUBMISSION:
@@ -187,6 +201,10 @@ class SingleRun(ABC):
         elif env_vars.run_mode == RunMode.GLOBAL_JOB:
             return run_command
 
+        elif env_vars.run_mode == RunMode.LOCAL_POOL:
+            # the output is redirected to the run logs by the pool
+            return LocalRun(run_command, sim_folder, {name: value})
+
         elif env_vars.run_mode == RunMode.LOCAL:
             # in case of run in console dump the prints to a file
             # to get the code version in the metadata
@@ -198,6 +216,7 @@ class SingleRun(ABC):
             else:
                 # Be sure that the datapath has been set correctly
                 os.environ[name] = value
+                start = time.perf_counter()
                 subprocess.run(
                     " ".join(run_command),
                     cwd=sim_folder,
@@ -205,9 +224,39 @@ class SingleRun(ABC):
                     check=True,
                     # timeout=43200, serial can also last days on workstations
                 )
+                record_wall_time(sim_folder, time.perf_counter() - start)
 
         return flagnotrun
 
+    def _get_run_command(self, env_vars: EnvironmentVariables) -> list[str]:
+        run_command = self._build_command(env_vars)
+        # if the exe prefix is present it takes precedence
+        if env_vars.exe_prefix is not None:
+            run_command.insert(0, env_vars.exe_prefix)
+
+        elif env_vars.mpi_tasks is not None and env_vars.mpi_tasks > 1:
+            run_command.insert(0, f"-np {env_vars.mpi_tasks}")
+            run_command.insert(0, "mpirun")
+        return run_command
+
+    def get_job_command(self, env_vars: EnvironmentVariables) -> str:
+        """Get the shell command running the simulation in a job, including the
+        export of the nuclear data path.
+
+        Parameters
+        ----------
+        env_vars : EnvironmentVariables
+            environment variables for JADE execution in general.
+
+        Returns
+        -------
+        str
+            command to be executed from the simulation folder.
+        """
+        name, value = self._get_lib_data_command()
+        run_command = " ".join(self._get_run_command(env_vars))
+        return f'export {name}="{value}" && {run_command}'
+
     @staticmethod
     def _submit_job(
         env_vars: EnvironmentVariables,
@@ -381,6 +430,9 @@ class SingleRunFactory:
 
 
 class BenchmarkRun:
+    # if True, in job submission mode the single runs can be submitted as a job array
+    array_submission = False
+
     def __init__(
         self,
         config: BenchmarkRunConfig,
@@ -408,12 +460,20 @@ class BenchmarkRun:
         self.env_vars = env_vars
         self.simulation_root = simulation_root
 
-    def continue_run(self, testing=False):
+    def continue_run(self, testing=False) -> str | list[LocalRun] | None:
         """Allow to continue a run on previously generated inputs. This allows to launch
         a single job and optimize HPC resources usage.
+
+        In case of local pool, the simulations that need to be continued are
+        returned to be queued in the pool.
         """
+        pool_runs = []
         # recover the code and library from simulation root
         for code, lib in self.config.run:
+            if self.env_vars.run_mode == RunMode.LOCAL_POOL:
+                for single_run, single_run_root in self._get_incomplete_runs(code, lib):
+                    pool_runs.append(single_run.run(self.env_vars, single_run_root))
+                continue
             command = self._get_continue_run_command(code, lib)
             # if serial, send the command, otherwis build a job script
             if self.env_vars.run_mode == RunMode.LOCAL:
@@ -428,15 +488,22 @@ class BenchmarkRun:
                     self.env_vars, cwd, command, "", code, test=testing
                 )
                 return command
-
-    def _get_continue_run_command(self, code: CODE, lib: Library) -> str:
+        if self.env_vars.run_mode == RunMode.LOCAL_POOL:
+            return pool_runs
+
+    def _get_incomplete_runs(
+        self, code: CODE, lib: Library
+    ) -> list[tuple[SingleRun, Path]]:
+        """Get the single runs of the benchmark that were not completed, together
+        with their simulation folder.
+        """
         # we can assume that the single run has been already originated
-        total_command = ""
         codelib_folder = print_code_lib(code, lib)
         benchmark_root = os.path.join(
             self.simulation_root, codelib_folder, self.config.name
         )
         flag_datapath = False
+        runs = []
         for single_run_folder in os.listdir(benchmark_root):
             single_run_root = Path(benchmark_root, single_run_folder)
             # check if the simulation has been completed
@@ -462,7 +529,12 @@ class BenchmarkRun:
                 name, value = single_run._get_lib_data_command()
                 os.environ[name] = value
                 flag_datapath = True
+            runs.append((single_run, single_run_root))
+        return runs
 
+    def _get_continue_run_command(self, code: CODE, lib: Library) -> str:
+        total_command = ""
+        for single_run, single_run_root in self._get_incomplete_runs(code, lib):
             command = single_run.run(
                 env_vars=self.env_vars, sim_folder=single_run_root, test=True
             )
@@ -481,6 +553,7 @@ class BenchmarkRun:
             The executable for the code to be used was not set in the main config file.
         """
         benchmark_runs = []
+        pending = []
         # first we run the benchmark for each code-lib couple
         for code, lib in self.config.run:
             # --- perform some consistency checks here ---
@@ -498,6 +571,8 @@ class BenchmarkRun:
             root_benchmark = os.path.join(
                 self.simulation_root, code_lib, self.config.name
             )
+            # wall times of the previous run are used to estimate the new ones
+            previous = read_wall_times(root_benchmark)
             try:
                 os.makedirs(root_benchmark, exist_ok=False)
             except OSError:
@@ -507,14 +582,52 @@ class BenchmarkRun:
                 os.mkdir(root_benchmark)
 
             runs = self._run_sub_benchmarks(root_benchmark, code, lib)
+            for _, folder in runs:
+                carry_wall_time(folder, previous)
             # add the code to each tuple
-            runs = [(code, commands, folder) for commands, folder in runs]
-            benchmark_runs.extend(runs)
+            pending.extend([(code, single_run, folder) for single_run, folder in runs])
+
+        # the runs are executed (or submitted) after all the inputs have been
+        # generated, starting from the longest ones
+        array_runs = {}
+        for code, single_run, folder in sort_longest_first(pending, lambda x: x[2]):
+            ans = None
+            if single_run is not None and self._submit_as_array():
+                command = single_run.get_job_command(self.env_vars)
+                array_runs.setdefault(code, []).append([(folder, command)])
+            elif single_run is not None:
+                ans = single_run.run(self.env_vars, folder)
+                if not isinstance(ans, (list, LocalRun)):
+                    ans = None
+            benchmark_runs.append((code, ans, folder))
+
+        # a single array job is submitted for each code instead of one job per run
+        for code, tasks in array_runs.items():
+            logging.info(
+                "Submitting %s %s as an array of %d jobs",
+                self.config.name,
+                code.value,
+                len(tasks),
+            )
+            submit_job_array(
+                code,
+                tasks,
+                self.simulation_root,
+                f"{self.config.name}_{code.value}",
+                self.env_vars,
+            )
         return benchmark_runs
 
+    def _submit_as_array(self) -> bool:
+        return (
+            self.array_submission
+            and self.env_vars.job_array
+            and self.env_vars.run_mode == RunMode.JOB_SUBMISSION
+        )
+
     def _run_sub_benchmarks(
         self, root_benchmark: PathLike, code: CODE, lib: Library
-    ) -> list[tuple[list[str] | None, PathLike]]:
+    ) -> list[tuple[SingleRun | None, PathLike]]:
         # now create a single run for each of the benchmark subfolders
         run_returns = []
         for sub_bench in os.listdir(self.benchmark_templates_root):
@@ -542,15 +655,16 @@ class BenchmarkRun:
         sub_bench_folder: PathLike,
         root_templates: PathLike,
         single_run: SingleRun,
-    ) -> list[str] | None:
+    ) -> SingleRun | None:
+        """Write the inputs and metadata of a single run. The single run is returned
+        if it needs to be executed.
+        """
         single_run.write(sub_bench_folder)
         input_metadata_file = os.path.join(root_templates, "benchmark_metadata.json")
         single_run.print_metadata(sub_bench_folder, input_metadata_file)
 
         if not self.config.only_input:
-            ans = single_run.run(self.env_vars, sub_bench_folder)
-            if isinstance(ans, list):
-                return ans
+            return single_run
 
 
 class SphereBenchmarkRun(BenchmarkRun):
@@ -560,6 +674,8 @@ class SphereBenchmarkRun(BenchmarkRun):
     avaialble in the libraries.
     """
 
+    array_submission = True
+
     def _run_sub_benchmarks(self, root_benchmark: PathLike, code: CODE, lib: Library):
         # we need to do things differntly here as there is only one template that
         # will be used for all the sub-benchmarks
@@ -883,6 +999,7 @@ def replace_template_vars(
     code: CODE,
     directory: PathLike,
     env_vars: EnvironmentVariables,
+    log_name: str | None = None,
 ) -> str:
     """Replace the variables in the template string with the values in the environment variables.
 
@@ -894,6 +1011,9 @@ def replace_template_vars(
         path to the directory where the job script will be created.
     env_vars : EnvironmentVariables
         environment variables for the simulation.
+    log_name : str | None, optional
+        name of the scheduler output and error files (without extension) in the
+        directory. By default None, "<directory name>_job_script".
 
     Returns
     -------
@@ -904,7 +1024,9 @@ def replace_template_vars(
     job_template = env_vars.code_job_template[code]
     # store cwd to get back to it after job submission
     user = subprocess.run("whoami", capture_output=True).stdout.decode("utf-8").strip()
-    job_script = os.path.join(directory, os.path.basename(directory) + "_job_script")
+    if log_name is None:
+        log_name = os.path.basename(directory) + "_job_script"
+    job_script = os.path.join(directory, log_name)
 
     if not os.path.isfile(job_template):
         raise ConfigError(
@@ -922,6 +1044,61 @@ def replace_template_vars(
     return contents
 
 
+def submit_job_array(
+    code: CODE,
+    tasks: list[list[tuple[PathLike, str]]],
+    directory: PathLike,
+    name: str,
+    env_vars: EnvironmentVariables,
+    test: bool = False,
+) -> str:
+    """Submit a job array where each task runs one or more simulations.
+
+    The simulation folders and commands of each task are listed in the
+    ``<name>_index.txt`` file, read by the ``<name>`` job script. The script is
+    the job template of the code, followed by the selection of the commands of the
+    task from the scheduler array index.
+
+    Parameters
+    ----------
+    code : CODE
+        transport code of the simulations.
+    tasks : list[list[tuple[PathLike, str]]]
+        simulation folder and command of the runs executed by each task, in order.
+    directory : PathLike
+        folder where the job script and index file are written.
+    name : str
+        name of the job script.
+    env_vars : EnvironmentVariables
+        environment variables for the simulation.
+    test : bool, optional
+        if True, the job is neither written nor submitted, by default False.
+
+    Returns
+    -------
+    str
+        contents of the job script.
+    """
+    index_file = os.path.join(directory, f"{name}_index.txt")
+    # each task writes its own scheduler logs
+    suffix = array_log_suffix(env_vars.scheduler_command, env_vars.job_array_option)
+    contents = replace_template_vars(code, directory, env_vars, name + suffix)
+    contents = contents + os.linesep + array_script_body(index_file)
+    if test:
+        return contents
+
+    with open(index_file, "w") as fout:
+        fout.write(build_index(tasks))
+    job_script = os.path.join(directory, name)
+    with open(job_script, "w") as fout:
+        fout.write(contents)
+    options = array_submit_options(
+        env_vars.scheduler_command, len(tasks), env_vars.job_array_option
+    )
+    subprocess.run([env_vars.scheduler_command, *options, job_script], cwd=directory)
+    return contents
+
+
 def launch_global_jobs(
     commands: list[tuple[CODE, PathLike, PathLike]],
     env_vars: EnvironmentVariables,
@@ -929,6 +1106,11 @@ def launch_global_jobs(
 ) -> list[str]:
     """Build a global job command list.
 
+    The commands of each code are split into ``env_vars.global_jobs`` job scripts
+    with a similar total estimated wall time. If ``env_vars.job_array`` is set, a
+    single array job is submitted for each code instead, with one task for each
+    group of commands listed in an index file.
+
     Parameters
     ----------
     commands : list[tuple[CODE, PathLike, PathLike]]
@@ -953,22 +1135,40 @@ def launch_global_jobs(
 
     scripts = []
     for code, cmdlist in commands_by_code.items():
+        groups = pack_runs(cmdlist, lambda x: x[1], env_vars.global_jobs)
+        groups = [
+            [
+                (folder, " ".join(command) if isinstance(command, list) else command)
+                for command, folder in group
+            ]
+            for group in groups
+        ]
         # fill the template
-        contents = replace_template_vars(code, cwd, env_vars)
-        # add the commands
-        for command, folder in cmdlist:
-            cd_command = f'cd "{folder}" {os.linesep}'
-            if isinstance(command, list):
-                command = " ".join(command)
-            contents = contents + os.linesep + cd_command + command + os.linesep
+        template = replace_template_vars(code, cwd, env_vars)
 
-        scripts.append(contents)
+        if env_vars.job_array:
+            scripts.append(
+                submit_job_array(code, groups, cwd, f"job_{code.value}", env_vars, test)
+            )
+            continue
 
-        job_script = os.path.join(cwd, f"job_{code.value}")
-        if not test:
-            with open(job_script, "w") as fout:
-                fout.write(contents)
-            subprocess.run([env_vars.scheduler_command, job_script], cwd=cwd)
+        for i, group in enumerate(groups):
+            contents = template
+            # add the commands
+            for folder, command in group:
+                cd_command = f'cd "{folder}" {os.linesep}'
+                contents = contents + os.linesep + cd_command + command + os.linesep
+
+            scripts.append(contents)
+
+            if len(groups) == 1:
+                job_script = os.path.join(cwd, f"job_{code.value}")
+            else:
+                job_script = os.path.join(cwd, f"job_{code.value}_{i + 1}")
+            if not test:
+                with open(job_script, "w") as fout:
+                    fout.write(contents)
+                subprocess.run([env_vars.scheduler_command, job_script], cwd=cwd)
     # return to the original directory
     os.chdir(cwd)
     return scripts
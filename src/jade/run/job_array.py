@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import os
+
+from jade.helper.aux_functions import PathLike
+
+# index of the array task, the variable depends on the scheduler (SLURM, Torque,
+# PBS Pro and LSF). The task indices start from 1.
+TASK_ID = (
+    'TASK_ID="${SLURM_ARRAY_TASK_ID:-${PBS_ARRAYID:-${PBS_ARRAY_INDEX:-'
+    '$LSB_JOBINDEX}}}"'
+)
+
+
+def array_submit_options(
+    scheduler_command: str, n_tasks: int, array_option: str | None = None
+) -> list[str]:
+    """Get the options of the scheduler command to submit an array of jobs.
+
+    Parameters
+    ----------
+    scheduler_command : str
+        command used to submit the jobs (e.g. sbatch, qsub, bsub).
+    n_tasks : int
+        number of tasks of the array, indexed from 1.
+    array_option : str | None, optional
+        option requesting the array, where ``{n}`` is replaced by the number of
+        tasks (e.g. "-J 1-{n}" for PBS Pro). By default None, the option is
+        chosen from the scheduler command: "--array" for SLURM, "-t" for qsub
+        (Torque only, PBS Pro needs "-J 1-{n}") and "-J" for LSF.
+
+    Returns
+    -------
+    list[str]
+        options to add to the scheduler command. SLURM syntax is used for
+        unknown schedulers.
+    """
+    if array_option is not None:
+        return array_option.format(n=n_tasks).split()
+    name = os.path.basename(scheduler_command)
+    if "qsub" in name:
+        return ["-t", f"1-{n_tasks}"]
+    if "bsub" in name:
+        return ["-J", f"JADE[1-{n_tasks}]"]
+    return [f"--array=1-{n_tasks}"]
+
+
+def array_log_suffix(scheduler_command: str, array_option: str | None = None) -> str:
+    """Get the suffix of the scheduler log files that makes them different for each
+    task of an array (e.g. "_%A_%a" for SLURM).
+
+    Parameters
+    ----------
+    scheduler_command : str
+        command used to submit the jobs (e.g. sbatch, qsub, bsub).
+    array_option : str | None, optional
+        option requesting the array, if set by the user. By default None.
+
+    Returns
+    -------
+    str
+        suffix to add to the log file names. Empty for Torque, which already adds
+        the task index to the log files of an array.
+    """
+    name = os.path.basename(scheduler_command)
+    if "qsub" in name:
+        if array_option is not None and array_option.split()[0] == "-J":
+            # PBS Pro
+            return "_^array_index^"
+        return ""
+    if "bsub" in name:
+        return "_%J_%I"
+    return "_%A_%a"
+
+
+def build_index(tasks: list[list[tuple[PathLike, str]]]) -> str:
+    """Build the index file of a job array. Each line contains the task index, the
+    simulation folder and the command to run there, separated by tabs.
+
+    Parameters
+    ----------
+    tasks : list[list[tuple[PathLike, str]]]
+        simulation folder and command of the runs executed by each task, in order.
+
+    Returns
+    -------
+    str
+        contents of the index file.
+    """
+    lines = []
+    for i, runs in enumerate(tasks, start=1):
+        for folder, command in runs:
+            lines.append(f"{i}\t{folder}\t{command}")
+    return os.linesep.join(lines) + os.linesep
+
+
+def array_script_body(index_file: PathLike) -> str:
+    """Commands of an array job script running the simulations of its task, as
+    listed in the index file. They are appended to the filled job template.
+    """
+    return os.linesep.join(
+        [
+            "",
+            TASK_ID,
+            "TAB=\"$(printf '\\t')\"",
+            'while IFS="$TAB" read -r task folder command; do',
+            '    if [ "$task" = "$TASK_ID" ]; then',
+            '        (cd "$folder" && eval "$command") < /dev/null',
+            "    fi",
+            f'done < "{index_file}"',
+            "",
+        ]
+    )
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from tqdm import tqdm
+
+from jade.helper.aux_functions import PathLike
+from jade.run.scheduling import record_wall_time
+
+# per-run logs written in the simulation folder. The standard output is needed to
+# recover the code version in the metadata
+RUN_LOG = "dump.out"
+RUN_ERR_LOG = "dump.err"
+
+
+@dataclass
+class LocalRun:
+    """A simulation queued for the local pool.
+
+    Attributes
+    ----------
+    command : list[str]
+        command to run the simulation. It is executed in a shell from the simulation
+        folder.
+    sim_folder : PathLike
+        path to the simulation folder.
+    env : dict[str, str]
+        additional environment variables needed by the simulation (e.g. path to the
+        nuclear data). By default no additional variables.
+    """
+
+    command: list[str]
+    sim_folder: PathLike
+    env: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.sim_folder)
+
+
+def _execute(run: LocalRun) -> tuple[int, float]:
+    """Run a single simulation and return its exit code and wall time in seconds."""
+    env = {**os.environ, **run.env}
+    start = time.perf_counter()
+    with (
+        open(Path(run.sim_folder, RUN_LOG), "w") as out,
+        open(Path(run.sim_folder, RUN_ERR_LOG), "w") as err,
+    ):
+        process = subprocess.run(
+            " ".join(run.command),
+            cwd=run.sim_folder,
+            shell=True,
+            env=env,
+            stdout=out,
+            stderr=err,
+        )
+    return process.returncode, time.perf_counter() - start
+
+
+def run_local_pool(runs: list[LocalRun], max_concurrent_runs: int) -> list[PathLike]:
+    """Run the simulations on the local machine keeping a fixed number of them in
+    flight. A new simulation is started as soon as one completes, in the order of
+    the list. The wall time of the successful runs is stored in their metadata.
+
+    Parameters
+    ----------
+    runs : list[LocalRun]
+        simulations to run.
+    max_concurrent_runs : int
+        maximum number of simulations running at the same time.
+
+    Returns
+    -------
+    list[PathLike]
+        simulation folders of the runs that failed.
+    """
+    logging.info("Running %d simulations, %d at a time", len(runs), max_concurrent_runs)
+    failed = []
+    executor = ThreadPoolExecutor(max_workers=max_concurrent_runs)
+    try:
+        futures = {executor.submit(_execute, run): run for run in runs}
+        for future in tqdm(
+            as_completed(futures), total=len(futures), desc="Simulations"
+        ):
+            run = futures[future]
+            try:
+                returncode, wall_time = future.result()
+            except OSError as e:
+                logging.error("Simulation %s could not be started: %s", run.name, e)
+                failed.append(run.sim_folder)
+                continue
+            if returncode != 0:
+                logging.error(
+                    "Simulation %s failed with exit code %d, see %s",
+                    run.name,
+                    returncode,
+                    Path(run.sim_folder, RUN_ERR_LOG),
+                )
+                failed.append(run.sim_folder)
+            else:
+                logging.info("Simulation %s completed in %.0f s", run.name, wall_time)
+                record_wall_time(run.sim_folder, wall_time)
+    finally:
+        # on interruption do not start the simulations still in the queue
+        executor.shutdown(wait=True, cancel_futures=True)
+    # keep a deterministic order in the report
+    failed.sort(key=str)
+    return failed
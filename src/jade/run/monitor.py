@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from jade.helper.aux_functions import CODE_CHECKERS, PathLike, get_code_lib
+from jade.helper.constants import CODE
+from jade.run.scheduling import NPS_KEY, WALL_TIME_KEY, read_run_metadata
+
+# default time in seconds between two checks of the simulation folders
+DEFAULT_POLL_INTERVAL = 30
+# default number of polls after which a run that never started is not followed
+DEFAULT_WAIT_POLLS = 240
+
+
+@dataclass
+class MonitoredRun:
+    """Progress of a single run followed by the monitor.
+
+    Attributes
+    ----------
+    code : CODE
+        code used for the simulation.
+    lib : str
+        library used for the simulation. Extended name.
+    benchmark : str
+        name of the benchmark.
+    sim_folder : Path
+        path to the single run simulation folder.
+    nps : int | None
+        number of histories of the run, if stored in the metadata.
+    started : float | None
+        time at which the monitor first saw the run in progress. None if the run
+        was already in progress when the monitor started.
+    completed : float | None
+        time at which the monitor found the run completed.
+    wall_time : float | None
+        duration of the run in seconds, if known.
+    stalled : bool
+        True if the run was dropped by the monitor because its folder did not
+        change for too many polls, either while running or before starting.
+    """
+
+    code: CODE
+    lib: str
+    benchmark: str
+    sim_folder: Path
+    nps: int | None = None
+    started: float | None = None
+    completed: float | None = None
+    wall_time: float | None = None
+    stalled: bool = False
+    # entries of the folder when the run was discovered and output files signature
+    _entries: frozenset[str] = field(default=frozenset(), init=False, repr=False)
+    _signature: tuple | None = field(default=None, init=False, repr=False)
+    # number of consecutive polls without changes in the folder and whether the
+    # folder changed since the run was discovered
+    _idle_polls: int = field(default=0, init=False, repr=False)
+    _active: bool = field(default=False, init=False, repr=False)
+
+    @property
+    def name(self) -> str:
+        return self.sim_folder.name
+
+    @property
+    def histories_per_second(self) -> float | None:
+        """Throughput of the completed run, None if its wall time is unknown."""
+        if self.nps is None or not self.wall_time:
+            return None
+        return self.nps / self.wall_time
+
+
+class RunMonitor:
+    def __init__(
+        self,
+        simulations_root: PathLike,
+        on_complete: Callable[[MonitoredRun], None] | None = None,
+        benchmarks: list[str] | None = None,
+        stall_polls: int | None = None,
+        wait_polls: int | None = DEFAULT_WAIT_POLLS,
+    ) -> None:
+        """Follow the single runs of the simulations folder until they complete.
+
+        A run is considered completed when the output files checked by JADE are
+        available and did not change since the previous poll. The runs that are
+        already completed when the monitor starts are not followed.
+
+        Parameters
+        ----------
+        simulations_root : PathLike
+            root of the simulations folder.
+        on_complete : Callable[[MonitoredRun], None] | None, optional
+            function called for each run as soon as it completes (e.g. to process
+            its raw data). Errors are logged and do not stop the monitor. By default
+            None.
+        benchmarks : list[str] | None, optional
+            benchmarks to follow. By default None, all benchmarks.
+        stall_polls : int | None, optional
+            number of consecutive polls without any new or modified file after
+            which a started run that is not completed is considered stalled (e.g.
+            crashed) and is not followed anymore. By default None, no limit.
+        wait_polls : int | None, optional
+            number of polls after which a run whose folder never changed since the
+            monitor found it (e.g. a run that crashed before the monitor started,
+            an input-only folder or a job still in the queue) is not followed
+            anymore. None to wait with no limit. By default DEFAULT_WAIT_POLLS.
+        """
+        self.simulations_root = Path(simulations_root)
+        self.on_complete = on_complete
+        self.benchmarks = benchmarks
+        self.stall_polls = stall_polls
+        self.wait_polls = wait_polls
+        self.runs: dict[Path, MonitoredRun] = {}
+        # completed runs are kept to avoid checking them again
+        self._done: set[Path] = set()
+        self._scan(initial=True)
+
+    def _iter_run_folders(self):
+        for code_lib in sorted(os.listdir(self.simulations_root)):
+            codelib_path = Path(self.simulations_root, code_lib)
+            if not codelib_path.is_dir():
+                continue
+            code_tag, lib = get_code_lib(code_lib)
+            code = CODE(code_tag)
+            if code == CODE.SERPENT:
+                # the completion of Serpent runs cannot be checked yet
+                continue
+            for benchmark in sorted(os.listdir(codelib_path)):
+                if self.benchmarks is not None and benchmark not in self.benchmarks:
+                    continue
+                bench_path = Path(codelib_path, benchmark)
+                if not bench_path.is_dir():
+                    continue
+                for sub_bench in sorted(os.listdir(bench_path)):
+                    sim_folder = Path(bench_path, sub_bench)
+                    if sim_folder.is_dir():
+                        yield code, lib, benchmark, sim_folder
+
+    def _scan(self, initial: bool = False) -> None:
+        # look for runs that were not seen yet (e.g. created after the start)
+        for code, lib, benchmark, sim_folder in self._iter_run_folders():
+            if sim_folder in self.runs or sim_folder in self._done:
+                continue
+            if initial and CODE_CHECKERS[code](sim_folder):
+                self._done.add(sim_folder)
+                continue
+            nps = read_run_metadata(sim_folder).get(NPS_KEY)
+            run = MonitoredRun(code, lib, benchmark, sim_folder, nps)
+            run._entries = frozenset(os.listdir(sim_folder))
+            self.runs[sim_folder] = run
+
+    @property
+    def pending(self) -> list[MonitoredRun]:
+        """Runs not completed yet and still followed."""
+        return [
+            run
+            for run in self.runs.values()
+            if run.completed is None and not run.stalled
+        ]
+
+    @property
+    def stalled(self) -> list[MonitoredRun]:
+        """Runs that are not followed anymore because they stalled."""
+        return [run for run in self.runs.values() if run.stalled]
+
+    @property
+    def completed(self) -> list[MonitoredRun]:
+        """Runs completed since the monitor started."""
+        return [run for run in self.runs.values() if run.completed is not None]
+
+    def poll(self) -> list[MonitoredRun]:
+        """Check the progress of the runs once.
+
+        Returns
+        -------
+        list[MonitoredRun]
+            runs that completed since the previous poll.
+        """
+        self._scan()
+        now = time.time()
+        newly_completed = []
+        for run in self.pending:
+            entries = frozenset(os.listdir(run.sim_folder))
+            if run.started is None and not entries <= run._entries:
+                # new files appeared in the folder, the simulation started
+                run.started = now
+            # outputs are considered final only if unchanged since the last poll
+            signature = _folder_signature(run.sim_folder)
+            previous, run._signature = run._signature, signature
+            changed = previous is not None and signature != previous
+            if changed:
+                run._active = True
+            if not CODE_CHECKERS[run.code](run.sim_folder):
+                run._idle_polls = 0 if changed else run._idle_polls + 1
+                self._check_stalled(run)
+                continue
+            if previous is None or changed:
+                continue
+            run.completed = now
+            metadata = read_run_metadata(run.sim_folder)
+            if WALL_TIME_KEY in metadata:
+                run.wall_time = metadata[WALL_TIME_KEY]
+            elif run.started is not None:
+                run.wall_time = run.completed - run.started
+            newly_completed.append(run)
+            self._report(run)
+            if self.on_complete is not None:
+                try:
+                    self.on_complete(run)
+                except Exception as e:
+                    logging.error("Processing of %s failed: %s", run.name, e)
+        return newly_completed
+
+    def _check_stalled(self, run: MonitoredRun) -> None:
+        # only the runs that started can stall, the others are waiting
+        limit = self.stall_polls if run._active else self.wait_polls
+        if limit is None or run._idle_polls < limit:
+            return
+        run.stalled = True
+        if run._active:
+            msg = "%s %s %s stalled, no output changes for %d polls"
+        else:
+            msg = "%s %s %s did not start in %d polls"
+        logging.warning(msg, run.code.value, run.lib, run.name, run._idle_polls)
+
+    def _report(self, run: MonitoredRun) -> None:
+        n_done = len(self.completed)
+        n_total = len(self.runs)
+        rate = run.histories_per_second
+        if rate is None:
+            logging.info(
+                "[%d/%d] %s %s %s completed",
+                n_done,
+                n_total,
+                run.code.value,
+                run.lib,
+                run.name,
+            )
+        else:
+            logging.info(
+                "[%d/%d] %s %s %s completed in %.0f s (%.3g histories/s)",
+                n_done,
+                n_total,
+                run.code.value,
+                run.lib,
+                run.name,
+                run.wall_time,
+                rate,
+            )
+
+    def watch(
+        self, poll_interval: float = DEFAULT_POLL_INTERVAL, timeout: float | None = None
+    ) -> list[MonitoredRun]:
+        """Poll the simulation folders until all the runs are completed.
+
+        Parameters
+        ----------
+        poll_interval : float, optional
+            time in seconds between two polls, by default DEFAULT_POLL_INTERVAL.
+        timeout : float | None, optional
+            maximum time in seconds to wait for. By default None, no limit.
+
+        Returns
+        -------
+        list[MonitoredRun]
+            runs that were not completed when the monitor stopped, including the
+            stalled ones.
+        """
+        logging.info("Monitoring %d simulations", len(self.pending))
+        start = time.time()
+        while len(self.pending) > 0:
+            self.poll()
+            n_running = sum(run.started is not None for run in self.pending)
+            logging.info(
+                "%d simulations completed, %d running, %d waiting",
+                len(self.completed),
+                n_running,
+                len(self.pending) - n_running,
+            )
+            if len(self.pending) == 0:
+                break
+            if timeout is not None and time.time() - start + poll_interval > timeout:
+                logging.warning(
+                    "Monitor stopped with %d simulations not completed",
+                    len(self.pending),
+                )
+                break
+            time.sleep(poll_interval)
+        if len(self.stalled) > 0:
+            logging.warning(
+                "%d simulations stalled: %s",
+                len(self.stalled),
+                ", ".join(run.name for run in self.stalled),
+            )
+        return self.pending + self.stalled
+
+
+def _folder_signature(sim_folder: PathLike) -> tuple:
+    # size and modification time of all the files in the folder
+    signature = []
+    for entry in sorted(os.scandir(sim_folder), key=lambda e: e.name):
+        if entry.is_file():
+            stat = entry.stat()
+            signature.append((entry.name, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
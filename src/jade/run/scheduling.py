@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import statistics
+from collections.abc import Callable
+from pathlib import Path
+from typing import TypeVar
+
+from jade.helper.aux_functions import PathLike
+from jade.helper.constants import CODE
+
+T = TypeVar("T")
+
+METADATA_FILE = "metadata.json"
+# wall time in seconds measured for the run
+WALL_TIME_KEY = "wall_time"
+# wall time in seconds expected for the run, derived from a previous run
+ESTIMATED_WALL_TIME_KEY = "estimated_wall_time"
+NPS_KEY = "nps"
+
+# rough time per history in seconds, only used to rank runs that were never timed
+# when no timed run of the same code is available
+DEFAULT_TIME_PER_HISTORY = {
+    CODE.MCNP: 1e-4,
+    CODE.D1S: 2e-4,
+    CODE.OPENMC: 5e-5,
+    CODE.SERPENT: 5e-5,
+}
+
+
+def read_run_metadata(sim_folder: PathLike) -> dict:
+    """Read the metadata file of a single run, empty if it cannot be read."""
+    try:
+        with open(Path(sim_folder, METADATA_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def update_run_metadata(sim_folder: PathLike, values: dict) -> None:
+    """Add or replace some values in the metadata file of a single run."""
+    metadata = read_run_metadata(sim_folder)
+    metadata.update(values)
+    with open(Path(sim_folder, METADATA_FILE), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=4)
+
+
+def record_wall_time(sim_folder: PathLike, wall_time: float) -> None:
+    """Store the wall time of a completed run in its metadata file."""
+    update_run_metadata(sim_folder, {WALL_TIME_KEY: round(wall_time, 3)})
+
+
+def read_wall_times(benchmark_root: PathLike) -> dict[str, tuple[float, int]]:
+    """Read the wall times measured for the single runs of a benchmark.
+
+    Parameters
+    ----------
+    benchmark_root : PathLike
+        simulation folder of the benchmark for a code-library.
+
+    Returns
+    -------
+    dict[str, tuple[float, int]]
+        wall time and number of histories of the timed runs, indexed by single run
+        folder name.
+    """
+    wall_times = {}
+    if not os.path.isdir(benchmark_root):
+        return wall_times
+    for name in os.listdir(benchmark_root):
+        metadata = read_run_metadata(Path(benchmark_root, name))
+        if WALL_TIME_KEY in metadata and metadata.get(NPS_KEY):
+            wall_times[name] = (metadata[WALL_TIME_KEY], metadata[NPS_KEY])
+    return wall_times
+
+
+def carry_wall_time(
+    sim_folder: PathLike, previous: dict[str, tuple[float, int]]
+) -> None:
+    """Store in the metadata of a new run the wall time expected from a previous
+    run of the same simulation, scaled by the number of histories.
+    """
+    try:
+        wall_time, previous_nps = previous[os.path.basename(sim_folder)]
+    except KeyError:
+        return
+    nps = read_run_metadata(sim_folder).get(NPS_KEY)
+    if nps is None:
+        return
+    estimate = wall_time * nps / previous_nps
+    update_run_metadata(sim_folder, {ESTIMATED_WALL_TIME_KEY: round(estimate, 3)})
+
+
+def estimate_costs(sim_folders: list[PathLike]) -> list[float]:
+    """Estimate the wall time of a list of single runs.
+
+    The wall time of the previous execution of the same run is used when available.
+    Otherwise, the number of histories is multiplied by the time per history of the
+    other timed runs of the same code and library (or of the same code).
+
+    Parameters
+    ----------
+    sim_folders : list[PathLike]
+        simulation folders of the runs.
+
+    Returns
+    -------
+    list[float]
+        estimated wall time of each run, in seconds.
+    """
+    metadata = [read_run_metadata(folder) for folder in sim_folders]
+    # time per history measured for each code-library and code
+    rates = {}
+    for meta in metadata:
+        if ESTIMATED_WALL_TIME_KEY in meta and meta.get(NPS_KEY):
+            rate = meta[ESTIMATED_WALL_TIME_KEY] / meta[NPS_KEY]
+            rates.setdefault((meta.get("code"), meta.get("library")), []).append(rate)
+            rates.setdefault(meta.get("code"), []).append(rate)
+
+    costs = []
+    for meta in metadata:
+        if ESTIMATED_WALL_TIME_KEY in meta:
+            costs.append(meta[ESTIMATED_WALL_TIME_KEY])
+            continue
+        code = meta.get("code")
+        for key in ((code, meta.get("library")), code):
+            if key in rates:
+                rate = statistics.median(rates[key])
+                break
+        else:
+            try:
+                rate = DEFAULT_TIME_PER_HISTORY[CODE(code)]
+            except ValueError:
+                rate = max(DEFAULT_TIME_PER_HISTORY.values())
+        costs.append(meta.get(NPS_KEY, 0) * rate)
+    return costs
+
+
+def sort_longest_first(items: list[T], get_folder: Callable[[T], PathLike]) -> list[T]:
+    """Sort runs by decreasing estimated wall time, so that the longest runs do not
+    start last. Runs with the same estimate keep their order.
+
+    Parameters
+    ----------
+    items : list[T]
+        objects representing the runs.
+    get_folder : Callable[[T], PathLike]
+        function returning the simulation folder of a run.
+
+    Returns
+    -------
+    list[T]
+        the sorted runs.
+    """
+    costs = estimate_costs([get_folder(item) for item in items])
+    order = sorted(range(len(items)), key=lambda i: -costs[i])
+    return [items[i] for i in order]
+
+
+def pack_runs(
+    items: list[T], get_folder: Callable[[T], PathLike], n_bins: int
+) -> list[list[T]]:
+    """Split runs into groups with a similar total estimated wall time.
+
+    The runs are assigned from the longest to the shortest, each to the group with
+    the lowest total so far. Each group keeps its runs longest first.
+
+    Parameters
+    ----------
+    items : list[T]
+        objects representing the runs.
+    get_folder : Callable[[T], PathLike]
+        function returning the simulation folder of a run.
+    n_bins : int
+        number of groups. Empty groups are not returned.
+
+    Returns
+    -------
+    list[list[T]]
+        the groups of runs.
+    """
+    costs = estimate_costs([get_folder(item) for item in items])
+    order = sorted(range(len(items)), key=lambda i: -costs[i])
+    # (total cost, group index) of each group
+    loads = [(0.0, i) for i in range(max(1, n_bins))]
+    bins = [[] for _ in loads]
+    for i in order:
+        load, b = heapq.heappop(loads)
+        bins[b].append(items[i])
+        heapq.heappush(loads, (load + costs[i], b))
+    return [b for b in bins if len(b) > 0]
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+import json
 import os
 import shutil
 from importlib.resources import files
 from pathlib import Path
 
 import pytest
+import yaml
 
 import tests
 from jade.app.app import JadeApp
+from jade.config.pp_config import PostProcessConfig
 from jade.config.run_config import (
     BenchmarkRunConfig,
     EnvironmentVariables,
@@ -16,7 +19,13 @@ from jade.config.run_config import (
     RunConfig,
     RunMode,
 )
+from jade.config.status import GlobalStatus
+from jade.helper.__optionals__ import PYARROW_AVAIL
 from jade.helper.constants import CODE
+from jade.helper.errors import PostProcessConfigError
+from jade.post.raw_store import RAW_STORE_FILE
+from jade.resources import default_cfg
+from jade.run.monitor import RunMonitor
 from tests.run import resources as run_res
 
 RUN_RES = files(run_res)
@@ -80,6 +89,126 @@ class TestJadeApp:
         app.raw_process(subset=["Oktavian"], force=True)
         assert os.path.getmtime(filepath) > initial_mod_time
 
+    def test_raw_process_incremental(self, tmpdir):
+        app = JadeApp(root=DUMMY_ROOT, skip_init=True)
+        # work on a copy of the Oktavian simulations
+        codelib = "_mcnp_-_FENDL 3.2c_"
+        shutil.copytree(
+            Path(app.tree.simulations, codelib, "Oktavian"),
+            Path(tmpdir, "simulations", codelib, "Oktavian"),
+        )
+        app.tree.simulations = Path(tmpdir, "simulations")
+        app.tree.raw = Path(tmpdir, "raw")
+        os.mkdir(app.tree.raw)
+        app.status = GlobalStatus(app.tree.simulations, app.tree.raw)
+
+        app.raw_process()
+        app.status.update()
+        folder = Path(app.tree.raw, codelib, "Oktavian")
+        with open(Path(folder, "metadata.json")) as f:
+            assert "raw_index" in json.load(f)
+        al_file = Path(folder, "Oktavian_Al 21.csv")
+        co_file = Path(folder, "Oktavian_Co 21.csv")
+        al_time = os.path.getmtime(al_file)
+        co_time = os.path.getmtime(co_file)
+
+        # only the modified run is reprocessed
+        al_folder = Path(app.tree.simulations, codelib, "Oktavian/Oktavian_Al")
+        with open(Path(al_folder, "Oktavian_Al.m"), "a") as f:
+            f.write("\n")
+        # the run was simulated again with a different JADE version
+        with open(Path(al_folder, "metadata.json")) as f:
+            run_metadata = json.load(f)
+        run_metadata["jade_run_version"] = "new version"
+        with open(Path(al_folder, "metadata.json"), "w") as f:
+            json.dump(run_metadata, f)
+        app.raw_process()
+        assert os.path.getmtime(al_file) > al_time
+        assert os.path.getmtime(co_file) == co_time
+        # the benchmark metadata describe the new outputs
+        with open(Path(folder, "metadata.json")) as f:
+            metadata = json.load(f)
+        assert metadata["jade_run_version"] == "new version"
+        assert "raw_index" in metadata
+
+        # a removed run has its results deleted
+        shutil.rmtree(Path(app.tree.simulations, codelib, "Oktavian/Oktavian_Co"))
+        app.status.update()
+        app.raw_process()
+        assert al_file.exists()
+        assert not co_file.exists()
+
+    def test_watch_raw(self, tmpdir):
+        app = JadeApp(root=DUMMY_ROOT, skip_init=True)
+        # work on a copy of the Oktavian simulations, with the Al run not completed
+        codelib = "_mcnp_-_FENDL 3.2c_"
+        shutil.copytree(
+            Path(app.tree.simulations, codelib, "Oktavian"),
+            Path(tmpdir, "simulations", codelib, "Oktavian"),
+        )
+        app.tree.simulations = Path(tmpdir, "simulations")
+        app.tree.raw = Path(tmpdir, "raw")
+        os.mkdir(app.tree.raw)
+        app.status = GlobalStatus(app.tree.simulations, app.tree.raw)
+        al_folder = Path(app.tree.simulations, codelib, "Oktavian/Oktavian_Al")
+        mctal = Path(al_folder, "Oktavian_Al.m")
+        shutil.move(mctal, Path(tmpdir, "Oktavian_Al.m"))
+
+        monitor = RunMonitor(app.tree.simulations, app._process_raw_run)
+        monitor.poll()
+        shutil.move(Path(tmpdir, "Oktavian_Al.m"), mctal)
+        monitor.poll()
+        # the raw data are produced as soon as the run completes
+        assert len(monitor.poll()) == 1
+        folder = Path(app.tree.raw, codelib, "Oktavian")
+        al_file = Path(folder, "Oktavian_Al 21.csv")
+        assert al_file.exists()
+        assert not Path(folder, "Oktavian_Co 21.csv").exists()
+
+        # the processed run is not processed again
+        al_time = os.path.getmtime(al_file)
+        app.status.update()
+        app.raw_process()
+        assert os.path.getmtime(al_file) == al_time
+        assert Path(folder, "Oktavian_Co 21.csv").exists()
+
+        # nothing left to monitor
+        assert app.watch(poll_interval=0, raw=True) == []
+
+        # a run that never starts is not waited for with no limit
+        shutil.move(mctal, Path(tmpdir, "Oktavian_Al.m"))
+        pending = app.watch(poll_interval=0, raw=True, timeout=5, wait_polls=2)
+        assert [run.name for run in pending] == ["Oktavian_Al"]
+        assert pending[0].stalled
+
+    def test_raw_process_parallel(self, tmpdir):
+        app = JadeApp(root=DUMMY_ROOT, skip_init=True)
+        # override the raw processor folder
+        app.tree.raw = tmpdir
+        app.status.raw_results_path = tmpdir
+        app.status.update()
+
+        app.raw_process(subset=["Oktavian"], jobs=2)
+        folder = Path(tmpdir, "_mcnp_-_FENDL 3.2c_/Oktavian")
+        assert Path(folder, "Oktavian_Al 21.csv").exists()
+        assert Path(folder, "metadata.json").exists()
+
+    @pytest.mark.skipif(not PYARROW_AVAIL, reason="pyarrow is not available")
+    def test_raw_process_store(self, tmpdir):
+        app = JadeApp(root=DUMMY_ROOT, skip_init=True)
+        # override the raw processor folder
+        app.tree.raw = tmpdir
+        app.status.raw_results_path = tmpdir
+        app.status.update()
+
+        folder = Path(tmpdir, "_mcnp_-_FENDL 3.2c_/Oktavian")
+        app.raw_process(subset=["Oktavian"], store=True)
+        assert Path(folder, "Oktavian_Al 21.csv").exists()
+        assert Path(folder, RAW_STORE_FILE).exists()
+        # a store that is not kept up to date is removed
+        app.raw_process(subset=["Oktavian"], force=True)
+        assert not Path(folder, RAW_STORE_FILE).exists()
+
     def test_post_process(self, tmpdir):
         app = JadeApp(root=DUMMY_ROOT, skip_init=True)
         # override the post processor folder
@@ -88,6 +217,40 @@ class TestJadeApp:
 
         app.post_process()
 
+    def test_post_process_parallel(self, tmpdir):
+        app = JadeApp(root=DUMMY_ROOT, skip_init=True)
+        # override the post processor folder
+        app.tree.postprocessing = tmpdir
+        app.tree.logs = tmpdir
+        app.status.update()
+        # more than one benchmark is needed to process them in parallel
+        pp_cfg = Path(tmpdir, "pp_cfg.yml")
+        with open(pp_cfg, "w") as f:
+            yaml.dump(
+                {
+                    "benchmarks": ["Sphere", "Oktavian"],
+                    "code_libs": ["_mcnp_-_FENDL 3.2c_", "_mcnp_-_ENDFB-VIII.0_"],
+                },
+                f,
+            )
+        app.tree.cfg.pp_cfg = pp_cfg
+        app.pp_cfg = PostProcessConfig(files(default_cfg).joinpath("benchmarks_pp"))
+
+        app.post_process(jobs=2)
+        # each worker has its own log file
+        assert any(file.startswith("pp_worker_") for file in os.listdir(tmpdir))
+
+    def test_post_process_config_error(self, tmpdir):
+        app = JadeApp(root=DUMMY_ROOT, skip_init=True)
+        app.tree.postprocessing = tmpdir
+        app.status.update()
+        app.pp_cfg.atlas_cfgs = {}
+
+        with pytest.raises(PostProcessConfigError):
+            app.post_process(jobs=2)
+        # nothing was produced
+        assert len(os.listdir(tmpdir)) == 0
+
     def test_restore_default_cfg(self, tmpdir):
         app = JadeApp(root=DUMMY_ROOT, skip_init=True)
         # override the config folder
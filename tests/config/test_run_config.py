@@ -62,6 +62,33 @@ class TestEnvironmentVariables:
                 scheduler_command=scheduler_command,
             )
 
+    def test_max_concurrent_runs(self, monkeypatch):
+        monkeypatch.setattr("os.cpu_count", lambda: 64)
+        kwargs = {"executables": {CODE.MCNP: "test"}, "run_mode": RunMode.LOCAL_POOL}
+        env_vars = EnvironmentVariables(None, 8, **kwargs)
+        assert env_vars.cores_per_run == 8
+        assert env_vars.max_concurrent_runs == 8
+        env_vars = EnvironmentVariables(2, 8, max_concurrent_runs=2, **kwargs)
+        assert env_vars.max_concurrent_runs == 2
+        # the core budget is never exceeded
+        env_vars = EnvironmentVariables(2, 8, max_concurrent_runs=10, **kwargs)
+        assert env_vars.max_concurrent_runs == 4
+        # at least one simulation runs
+        env_vars = EnvironmentVariables(None, 128, **kwargs)
+        assert env_vars.max_concurrent_runs == 1
+
+    def test_global_jobs(self):
+        kwargs = {"executables": {CODE.MCNP: "test"}, "run_mode": RunMode.GLOBAL_JOB}
+        env_vars = EnvironmentVariables(
+            None, 8, scheduler_command="sbatch", global_jobs="4", **kwargs
+        )
+        assert env_vars.global_jobs == 4
+        assert not env_vars.job_array
+        with pytest.raises(ConfigError):
+            EnvironmentVariables(
+                None, 8, scheduler_command="sbatch", global_jobs=0, **kwargs
+            )
+
 
 class TestBenchmarkExecConfig:
     def test_post(self):
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 from importlib.resources import as_file, files
+from pathlib import Path
+
+import docx
 
 import tests.dummy_structure
 from jade import resources
 from jade.config.atlas_config import ConfigAtlasProcessor
 from jade.post.atlas_processor import AtlasProcessor
+from jade.post.plot_cache import PlotImageCache
 from jade.resources import default_cfg
 
 ROOT_RAW = files(tests.dummy_structure).joinpath("raw_data")
@@ -323,3 +327,66 @@ class TestAtlasProcessor:
         codelibs = [("exp", "exp"), ("mcnp", "FENDL 3.2c")]
         processor = AtlasProcessor(ROOT_RAW, tmpdir, cfg, codelibs, word_template_path)
         processor.process()
+
+    def test_parallel_rendering(self, tmpdir):
+        with as_file(
+            files(default_cfg).joinpath("benchmarks_pp/atlas/Oktavian.yaml")
+        ) as file:
+            cfg = ConfigAtlasProcessor.from_yaml(file)
+
+        word_template_path = files(resources).joinpath("atlas_template.docx")
+        codelibs = [("exp", "exp"), ("mcnp", "ENDFB-VIII.0"), ("mcnp", "FENDL 3.2c")]
+        docs = []
+        for jobs in [1, 2]:
+            folder = tmpdir.mkdir(f"jobs_{jobs}")
+            processor = AtlasProcessor(
+                ROOT_RAW, folder, cfg, codelibs, word_template_path, jobs=jobs
+            )
+            processor.process()
+            docs.append(docx.Document(Path(folder, "atlas_Oktavian.docx")))
+
+        # same headings and figures in the same order
+        serial, parallel = docs
+        assert [p.text for p in serial.paragraphs] == [
+            p.text for p in parallel.paragraphs
+        ]
+        assert len(serial.inline_shapes) == len(parallel.inline_shapes) > 0
+        for shape1, shape2 in zip(serial.inline_shapes, parallel.inline_shapes):
+            assert _image_blob(serial, shape1) == _image_blob(parallel, shape2)
+
+    def test_plot_cache(self, tmpdir, monkeypatch):
+        with as_file(
+            files(default_cfg).joinpath("benchmarks_pp/atlas/Oktavian.yaml")
+        ) as file:
+            cfg = ConfigAtlasProcessor.from_yaml(file)
+
+        word_template_path = files(resources).joinpath("atlas_template.docx")
+        codelibs = [("exp", "exp"), ("mcnp", "ENDFB-VIII.0"), ("mcnp", "FENDL 3.2c")]
+        plot_cache = PlotImageCache(tmpdir.join("cache"))
+        processor = AtlasProcessor(
+            ROOT_RAW,
+            tmpdir.mkdir("first"),
+            cfg,
+            codelibs,
+            word_template_path,
+            plot_cache=plot_cache,
+        )
+        processor.process()
+        first = docx.Document(Path(tmpdir, "first", "atlas_Oktavian.docx"))
+
+        # the second time nothing is rendered
+        def fail(*args):
+            raise AssertionError("plot rendered again")
+
+        monkeypatch.setattr("jade.post.atlas_processor.render_plot", fail)
+        processor.atlas_folder_path = tmpdir.mkdir("second")
+        processor.process()
+        second = docx.Document(Path(tmpdir, "second", "atlas_Oktavian.docx"))
+        assert len(first.inline_shapes) == len(second.inline_shapes) > 0
+        for shape1, shape2 in zip(first.inline_shapes, second.inline_shapes):
+            assert _image_blob(first, shape1) == _image_blob(second, shape2)
+
+
+def _image_blob(doc: docx.Document, shape) -> bytes:
+    rel_id = shape._inline.graphic.graphicData.pic.blipFill.blip.embed
+    return doc.part.related_parts[rel_id].blob
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
 import math
+import os
+import time
 
 import numpy as np
 import pandas as pd
 import pytest
 
+from jade.config.excel_config import ComparisonType
 from src.jade.post.manipulate_tally import (
     add_column,
     add_column_with_dict,
     by_energy,
     by_lethargy,
+    compare_data,
     concat_tallies,
     condense_groups,
     cumulative_sum,
@@ -32,6 +36,9 @@ from src.jade.post.manipulate_tally import (
     tof_to_energy,
 )
 
+# benchmarks are run only if this variable is set
+RUN_BENCHMARKS = os.getenv("JADE_BENCHMARK") is not None
+
 
 def test_by_lethargy():
     data = {"Energy": [1, 2, 3], "Value": [10, 20, 30]}
@@ -78,6 +85,79 @@ def test_no_action():
     assert result.equals(df)
 
 
+def _old_compare_errors(val1, val2, err1, err2, comparison_type) -> list[float]:
+    # previous loop implementation, kept as reference for the benchmark
+    error = []
+    for v1, v2, e1, e2 in zip(val1, val2, err1, err2):
+        if v1 == v2:
+            error.append(e1 + e2)
+        elif comparison_type == ComparisonType.ABSOLUTE:
+            error.append(np.sqrt((v1 * e1) ** 2 + (v2 * e2) ** 2) / (v1 - v2))
+        else:
+            error.append(np.sqrt((v1 * v2 * e1) ** 2 + (v2 * e2) ** 2) / (v1 - v2))
+    return error
+
+
+@pytest.mark.parametrize(
+    "comparison_type", [ComparisonType.ABSOLUTE, ComparisonType.PERCENTAGE]
+)
+def test_compare_data(comparison_type):
+    val1 = pd.Series([10.0, 20.0, 30.0, 0.0], index=[4, 5, 6, 7])
+    val2 = pd.Series([5.0, 20.0, 25.0, 0.0], index=[4, 5, 6, 7])
+    err1 = pd.Series([0.1, 0.2, 0.3, 0.0], index=[4, 5, 6, 7])
+    err2 = pd.Series([0.1, 0.1, 0.3, 0.0], index=[4, 5, 6, 7])
+    _, error = compare_data(val1, val2, err1, err2, comparison_type)
+    expected = _old_compare_errors(val1, val2, err1, err2, comparison_type)
+    assert error.tolist() == expected
+    assert (error.index == val1.index).all()
+    # equal values use the conservative sum of the errors
+    assert error[5] == pytest.approx(0.3)
+
+    # arrays are also accepted
+    _, error = compare_data(
+        val1, val2, err1.values, err2.values, comparison_type, ignore_index=True
+    )
+    assert isinstance(error, np.ndarray)
+    assert error.tolist() == expected
+
+
+def test_compare_data_many_values():
+    rng = np.random.default_rng(0)
+    n = 10**5
+    val1 = pd.Series(rng.random(n))
+    val2 = pd.Series(rng.random(n))
+    val2[::10] = val1[::10]  # some equal values
+    err1 = pd.Series(rng.random(n) * 0.1)
+    err2 = pd.Series(rng.random(n) * 0.1)
+
+    _, error = compare_data(val1, val2, err1, err2, ComparisonType.ABSOLUTE)
+    expected = _old_compare_errors(val1, val2, err1, err2, ComparisonType.ABSOLUTE)
+
+    np.testing.assert_allclose(error.to_numpy(), np.array(expected), rtol=1e-12)
+
+
+@pytest.mark.skipif(not RUN_BENCHMARKS, reason="JADE_BENCHMARK is not set")
+def test_compare_data_benchmark():
+    rng = np.random.default_rng(0)
+    n = 10**6
+    val1 = pd.Series(rng.random(n))
+    val2 = pd.Series(rng.random(n))
+    val2[::10] = val1[::10]  # some equal values
+    err1 = pd.Series(rng.random(n) * 0.1)
+    err2 = pd.Series(rng.random(n) * 0.1)
+
+    start = time.perf_counter()
+    _, error = compare_data(val1, val2, err1, err2, ComparisonType.ABSOLUTE)
+    new_time = time.perf_counter() - start
+    start = time.perf_counter()
+    expected = _old_compare_errors(val1, val2, err1, err2, ComparisonType.ABSOLUTE)
+    old_time = time.perf_counter() - start
+
+    np.testing.assert_allclose(error.to_numpy(), np.array(expected), rtol=1e-12)
+    print(f"compare_data: old {old_time:.3f} s, new {new_time:.3f} s")
+    assert new_time * 10 < old_time
+
+
 def test_sum_tallies():
     data1 = {"Energy": [1, 2, 3], "Value": [10, 20, 30], "Error": [0.1, 0.2, 0.3]}
     data2 = {"Energy": [1, 2, 3], "Value": [5, 15, 25], "Error": [0.1, 0.2, 0.3]}
@@ -164,6 +244,20 @@ def test_condense_groups():
     result = condense_groups(df.copy(), bins=[0, 1, 3])
     assert len(result) == 1
 
+    # groups keep the order of the bins
+    result = condense_groups(df.copy(), bins=[0, 1.5, 1.8, 10, 100])
+    assert result["Energy"].tolist() == ["0 - 1.5", "1.8 - 10"]
+    assert result["Energy"].cat.categories.tolist() == [
+        "0 - 1.5",
+        "1.5 - 1.8",
+        "1.8 - 10",
+        "10 - 100",
+    ]
+    # bins with the same label are merged and sorted by label
+    result = condense_groups(df.copy(), bins=[0, 2, 2.0000001, 2.0000002, 10])
+    assert result["Energy"].tolist() == ["0 - 2", "2 - 10", "2 - 2"]
+    assert result["Value"].tolist() == [10, 70, 20]
+
 
 def test_add_column():
     data = {"Energy": [1, 2, 3], "Value": [10, 20, 30]}
@@ -200,6 +294,20 @@ def test_add_column_with_dict():
     pd.testing.assert_frame_equal(result, expected)
 
 
+def test_add_column_with_dict_many_rows():
+    # detector positions repeated over many energy bins
+    n_det = 2000
+    tally = pd.DataFrame({"Cells": np.tile(np.arange(n_det), 50), "Value": 1.0})
+    values = {det: [det * 0.5, f"P{det}"] for det in range(n_det)}
+    result = add_column_with_dict(tally, "Cells", values, ["x", "label"])
+    assert result["x"].tolist() == (tally["Cells"] * 0.5).tolist()
+    assert result["label"].iloc[n_det + 3] == "P3"
+
+    values.pop(3)
+    with pytest.raises(KeyError):
+        add_column_with_dict(tally, "Cells", values, ["x", "label"])
+
+
 def test_groupby():
     data = {
         "Energy": [1, 1, 2, 2],
@@ -231,6 +339,33 @@ def test_groupby():
     assert len(result) == 1
 
 
+def test_groupby_many_groups():
+    # SDDR-like tally with unsorted cells, single-row groups and negative values
+    rng = np.random.default_rng(0)
+    n = 20000
+    df = pd.DataFrame(
+        {
+            "Cells": rng.integers(0, 5000, n),
+            "Time": rng.integers(0, 3, n),
+            "Value": rng.normal(1, 2, n),
+            "Error": rng.random(n) * 0.1,
+        }
+    )
+    # reference propagation computed group by group
+    expected = []
+    for cell in df["Cells"].unique():
+        subset = df[df["Cells"] == cell]
+        expected.append(
+            np.sqrt(np.sum((subset["Error"] * subset["Value"]) ** 2))
+            / subset["Value"].sum()
+        )
+
+    for action in ["sum", "mean"]:
+        result = groupby(df.copy(), "Cells", action)
+        assert result["Cells"].tolist() == df["Cells"].unique().tolist()
+        np.testing.assert_allclose(result["Error"], expected, rtol=1e-9)
+
+
 def test_delete_cols():
     data = {
         "Energy": [1, 2, 3],
@@ -380,6 +515,61 @@ def test_gaussian_broadening():
         gaussian_broadening(df.copy(), fwhm_frac=[0.1, 0.2])
 
 
+def _old_gaussian_broadening(tally: pd.DataFrame, fwhm_frac: list[float]):
+    # previous loop implementation, kept as reference for the benchmark
+    Eb = tally["Energy"].values.astype(float)
+    Yb = np.zeros(len(Eb))
+    Errb = np.zeros(len(Eb))
+    sigma = np.array(fwhm_frac) * Eb / (2 * np.sqrt(2 * np.log(2)))
+    for Ei, si, Yi, Erri in zip(Eb, sigma, tally["Value"], tally["Error"]):
+        if Yi == 0:
+            continue
+        width = 4 * si
+        mask = (Eb >= Ei - width) & (Eb <= Ei + width)
+        k = np.exp(-0.5 * ((Eb[mask] - Ei) / si) ** 2)
+        k /= k.sum()
+        Yb[mask] += Yi * k
+        Errb[mask] += (Erri * Yi * k) ** 2
+    return Yb, np.sqrt(Errb) / Yb
+
+
+def test_gaussian_broadening_windows():
+    # unsorted grid with repeated energies, zero values and variable fwhm
+    rng = np.random.default_rng(0)
+    n = 500
+    energy = np.concatenate([np.logspace(-2, 1, n // 2)] * 2)
+    rng.shuffle(energy)
+    df = pd.DataFrame(
+        {
+            "Energy": energy,
+            "Value": rng.random(n) * (rng.random(n) > 0.1),
+            "Error": rng.random(n) * 0.1,
+        }
+    )
+    fwhm = (rng.random(n) * 0.2 + 0.01).tolist()
+    expected_value, expected_error = _old_gaussian_broadening(df, fwhm)
+    result = gaussian_broadening(df.copy(), fwhm_frac=fwhm)
+    np.testing.assert_allclose(result["Value"], expected_value, rtol=1e-12)
+    np.testing.assert_allclose(result["Error"], expected_error, rtol=1e-12)
+
+
+def test_gaussian_broadening_many_bins():
+    rng = np.random.default_rng(0)
+    n = 5000
+    df = pd.DataFrame(
+        {
+            "Energy": np.logspace(-3, 1.5, n),
+            "Value": rng.random(n),
+            "Error": rng.random(n) * 0.1,
+        }
+    )
+    result = gaussian_broadening(df.copy(), fwhm_frac=0.01)
+    expected_value, expected_error = _old_gaussian_broadening(df, [0.01] * n)
+
+    np.testing.assert_allclose(result["Value"], expected_value, rtol=1e-12)
+    np.testing.assert_allclose(result["Error"], expected_error, rtol=1e-12)
+
+
 def test_volume():
     data = {
         "Cells": [1, 2, 3, 4, 5],
@@ -404,3 +594,22 @@ def test_mass():
     result = mass(df, masses)
     assert 3.65062e-06 == pytest.approx(result["Value"][0], rel=1e-5)
     assert 0.05 == pytest.approx(result["Error"][0], rel=1e-5)
+
+
+@pytest.mark.parametrize("function", [volume, mass])
+def test_divide_by_cells_many_cells(function):
+    # OpenMC-like heating tally with thousands of unsorted cells
+    rng = np.random.default_rng(0)
+    n_cells = 5000
+    cells = rng.permutation(np.repeat(np.arange(1, n_cells + 1), 4))
+    divisors = {cell: float(cell) for cell in range(1, n_cells + 1)}
+    df = pd.DataFrame({"Cells": cells, "Value": rng.random(len(cells)), "Error": 0.1})
+    result = function(df.copy(), divisors)
+    np.testing.assert_array_equal(result["Value"], df["Value"] / df["Cells"])
+    np.testing.assert_array_equal(result["Error"], 0.1 / df["Cells"])
+
+    # all the missing cells are reported at once
+    divisors.pop(3)
+    divisors.pop(7)
+    with pytest.raises(KeyError, match=r"cells: \[(3, 7|7, 3)\]"):
+        function(df.copy(), divisors)
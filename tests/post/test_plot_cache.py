@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from importlib.resources import as_file, files
+
+import pandas as pd
+
+from jade.config.atlas_config import ConfigAtlasProcessor
+from jade.post.plot_cache import PlotImageCache
+from jade.resources import default_cfg
+
+
+class TestPlotImageCache:
+    def test_key(self, tmpdir):
+        with as_file(
+            files(default_cfg).joinpath("benchmarks_pp/atlas/Oktavian.yaml")
+        ) as file:
+            plot_cfg = ConfigAtlasProcessor.from_yaml(file).plots[0]
+        cache = PlotImageCache(tmpdir)
+        df = pd.DataFrame({"Energy": [1, 2], "Value": [0.1, 0.2]})
+
+        key = cache.get_key(plot_cfg, [("lib", df)])
+        assert key == cache.get_key(plot_cfg, [("lib", df.copy())])
+        # any change in the data or in the configuration changes the key
+        other = df.copy()
+        other.loc[1, "Value"] = 0.3
+        assert key != cache.get_key(plot_cfg, [("lib", other)])
+        assert key != cache.get_key(plot_cfg, [("other lib", df)])
+        plot_cfg.title = "another title"
+        assert key != cache.get_key(plot_cfg, [("lib", df)])
+
+    def test_get_put(self, tmpdir):
+        cache = PlotImageCache(tmpdir)
+        assert cache.get("abcd") is None
+        images = [f"image {i}".encode() for i in range(12)]
+        cache.put("abcd", images)
+        assert cache.get("abcd") == images
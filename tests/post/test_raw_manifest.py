@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import os
+import shutil
+from importlib.resources import files
+from pathlib import Path
+
+import tests.dummy_structure as dummy_struct
+from jade.helper.constants import CODE
+from jade.post.raw_manifest import RawManifest, fingerprint_run, hash_file
+
+SIMULATION_FOLDER = files(dummy_struct).joinpath("simulations")
+OKTAVIAN_AL = Path(SIMULATION_FOLDER, "_mcnp_-_FENDL 3.2c_", "Oktavian", "Oktavian_Al")
+
+
+def test_fingerprint_run(tmpdir):
+    folder = Path(tmpdir, "Oktavian_Al")
+    shutil.copytree(OKTAVIAN_AL, folder)
+    fingerprint = fingerprint_run(CODE.MCNP, folder)
+    assert set(fingerprint) == {"Oktavian_Al.m", "Oktavian_Al.o"}
+    assert fingerprint["Oktavian_Al.m"]["hash"] == hash_file(
+        Path(folder, "Oktavian_Al.m")
+    )
+
+    manifest = RawManifest("dummy_hash", {"Oktavian_Al": fingerprint})
+    # touching a file does not change the hash
+    os.utime(Path(folder, "Oktavian_Al.m"))
+    new = fingerprint_run(CODE.MCNP, folder, fingerprint)
+    assert manifest.is_up_to_date("Oktavian_Al", new)
+    # changing the content does
+    with open(Path(folder, "Oktavian_Al.m"), "a") as f:
+        f.write("\n")
+    new = fingerprint_run(CODE.MCNP, folder, fingerprint)
+    assert not manifest.is_up_to_date("Oktavian_Al", new)
+    assert not manifest.is_up_to_date("Oktavian_Co", new)
+
+
+def test_manifest_io(tmpdir):
+    assert RawManifest.from_folder(tmpdir) is None
+    manifest = RawManifest("dummy_hash", {"run1": {}, "run2": {}})
+    for file in ["run1 1.csv", "run1 result 2.csv", "run2 1.csv", "metadata.json"]:
+        with open(Path(tmpdir, file), "w") as f:
+            f.write("dummy")
+    manifest.remove_run("run1", tmpdir)
+    assert sorted(os.listdir(tmpdir)) == ["metadata.json", "run2 1.csv"]
+
+    manifest.dump(tmpdir)
+    new = RawManifest.from_folder(tmpdir)
+    assert new.config_hash == "dummy_hash"
+    assert new.runs == {"run2": {}}
+
+
+def test_manifest_open_and_check(tmpdir):
+    folder = Path(tmpdir, "Oktavian_Al")
+    shutil.copytree(OKTAVIAN_AL, folder)
+    raw_folder = Path(tmpdir, "raw")
+    manifest = RawManifest.open(raw_folder, "dummy_hash")
+    assert manifest.runs == {}
+    with open(Path(raw_folder, "Oktavian_Al 1.csv"), "w") as f:
+        f.write("dummy")
+    # new run, stale results are removed
+    fingerprint = manifest.check_run("Oktavian_Al", CODE.MCNP, folder, raw_folder)
+    assert fingerprint is not None
+    assert os.listdir(raw_folder) == []
+    manifest.runs["Oktavian_Al"] = fingerprint
+    manifest.dump(raw_folder)
+
+    # same configuration, the run is up to date
+    manifest = RawManifest.open(raw_folder, "dummy_hash")
+    assert manifest.check_run("Oktavian_Al", CODE.MCNP, folder, raw_folder) is None
+    # a different configuration or a reset delete the previous results
+    assert RawManifest.open(raw_folder, "other_hash").runs == {}
+    assert os.listdir(raw_folder) == []
+    manifest.dump(raw_folder)
+    assert RawManifest.open(raw_folder, "dummy_hash", reset=True).runs == {}
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+import shutil
+from importlib.resources import as_file, files
+from pathlib import Path
+
+from jade.config.raw_config import (
+    ConfigRawProcessor,
+    ResultConfig,
+    TallyConcatOption,
+    TallyModOption,
+)
+from jade.post.raw_manifest import hash_file
+from jade.post.raw_plan import RawProcessingPlan
+from jade.resources import default_cfg
+
+RAW_CFG_FILES_MCNP = files(default_cfg).joinpath("benchmarks_pp/raw/mcnp")
+
+
+def _result(name: int, apply_to: list[str] | str | None = None) -> ResultConfig:
+    return ResultConfig(
+        name=name,
+        modify={4: [(TallyModOption.SCALE, {"factor": name})]},
+        concat_option=TallyConcatOption.NO_ACTION,
+        apply_to=apply_to,
+    )
+
+
+class TestRawProcessingPlan:
+    def test_get_results(self):
+        cfg = ConfigRawProcessor(
+            [
+                _result(1, ["run_A"]),
+                _result(2),
+                _result(3, ["run_B", "run_A"]),
+                _result(4, ["run_C"]),
+            ]
+        )
+        plan = RawProcessingPlan(cfg)
+        assert [r.name for r in plan.get_results("run_A")] == [1, 2, 3]
+        assert [r.name for r in plan.get_results("run_B")] == [2, 3]
+        assert [r.name for r in plan.get_results("run_D")] == [2]
+
+        # a single run can be given as a string
+        plan = RawProcessingPlan(ConfigRawProcessor([_result(5, "run_A"), _result(6)]))
+        assert [r.name for r in plan.get_results("run_A")] == [5, 6]
+        assert [r.name for r in plan.get_results("run")] == [6]
+        plan = RawProcessingPlan(cfg)
+
+        # runs with the same results share the same pipeline
+        assert plan.get_pipeline("run_D") is plan.get_pipeline("run_E")
+        assert plan.get_pipeline("run_A") is not plan.get_pipeline("run_D")
+        assert plan.get_pipeline("run_A").results == plan.get_results("run_A")
+
+    def test_from_yaml(self, tmpdir):
+        with as_file(RAW_CFG_FILES_MCNP.joinpath("ISIS-800MeV-C.yaml")) as file:
+            cfg_file = Path(tmpdir, "ISIS-800MeV-C.yaml")
+            shutil.copy(file, cfg_file)
+        plan = RawProcessingPlan.from_yaml(cfg_file)
+        assert plan.config_hash == hash_file(cfg_file)
+        assert len(plan.get_results("ISIS-800MeV-C_Ct")) < len(plan.cfg.results)
+        # the plan is not compiled again
+        assert RawProcessingPlan.from_yaml(cfg_file) is plan
+
+        # unless the file is modified
+        with open(cfg_file, "a") as f:
+            f.write("\n")
+        stat = os.stat(cfg_file)
+        os.utime(cfg_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        new_plan = RawProcessingPlan.from_yaml(cfg_file)
+        assert new_plan is not plan
+        assert new_plan.config_hash != plan.config_hash
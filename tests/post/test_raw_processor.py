@@ -15,7 +15,7 @@ from jade.config.raw_config import (
     TallyModOption,
 )
 from jade.helper.__optionals__ import OMC_AVAIL
-from jade.post.raw_processor import RawProcessor
+from jade.post.raw_processor import RawProcessor, process_raw_parallel
 from jade.resources import default_cfg
 
 SIMULATION_FOLDER = files(dummy_struct).joinpath("simulations")
@@ -391,6 +391,12 @@ class TestRawProcessor:
         for folder in Path(SIMULATION_FOLDER, "_d1s_-_lib 1_", "FNG-SDDR").iterdir():
             processor = RawProcessor(cfg, folder, tmpdir)
             processor.process_raw_data()
+        # results applying to a single run are produced only for that run
+        files = os.listdir(tmpdir)
+        for irr in [1, 2]:
+            for result in ["", " (daughters)", " (parents)"]:
+                assert f"FNG-SDDR_{irr} SDDR in air{result} irr. {irr}.csv" in files
+        assert "FNG-SDDR_2 SDDR in air irr. 1.csv" not in files
 
     def test_TUD_Fe(self, tmpdir):
         with as_file(RAW_CFG_FILES_MCNP.joinpath("TUD-Fe.yaml")) as f:
@@ -509,3 +515,30 @@ class TestRawProcessor:
             for subfolder in folder.iterdir():
                 processor = RawProcessor(cfg, subfolder, path)
                 processor.process_raw_data()
+
+
+def test_process_raw_parallel(tmpdir):
+    with as_file(RAW_CFG_FILES_MCNP.joinpath("Oktavian.yaml")) as f:
+        cfg = ConfigRawProcessor.from_yaml(f)
+
+    folder = Path(SIMULATION_FOLDER, "_mcnp_-_FENDL 3.2c_", "Oktavian")
+    serial = tmpdir.join("serial")
+    parallel = tmpdir.join("parallel")
+    os.makedirs(serial)
+    os.makedirs(parallel)
+    units = []
+    for subfolder in folder.iterdir():
+        processor = RawProcessor(cfg, subfolder, serial)
+        processor.process_raw_data()
+        units.append((cfg, subfolder, parallel))
+    # a broken run should not stop the processing of the others
+    units.append((cfg, Path(folder, "not_existing"), parallel))
+
+    failed = process_raw_parallel(units, 2)
+    assert failed == [Path(folder, "not_existing")]
+    assert sorted(os.listdir(serial)) == sorted(os.listdir(parallel))
+    for file in os.listdir(serial):
+        if file.endswith(".csv"):
+            pd.testing.assert_frame_equal(
+                pd.read_csv(Path(serial, file)), pd.read_csv(Path(parallel, file))
+            )
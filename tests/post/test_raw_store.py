@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from importlib.resources import files
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import tests.dummy_structure as dummy_struct
+from jade.helper.__optionals__ import PYARROW_AVAIL
+from jade.post.raw_store import (
+    INDEX_KEY,
+    RAW_STORE_FILE,
+    build_raw_index,
+    get_raw_index,
+    iter_run_results,
+    read_raw_store,
+    remove_raw_store,
+    write_raw_index,
+    write_raw_store,
+)
+
+RAW_ROOT = files(dummy_struct).joinpath("raw_data")
+
+
+@pytest.fixture
+def sddr_folder(tmpdir) -> Path:
+    # different runs have different columns for the same result
+    source = Path(RAW_ROOT, "_d1s_-_lib 1_", "SphereSDDR")
+    for file in os.listdir(source):
+        if file.endswith(".csv"):
+            shutil.copy(Path(source, file), tmpdir)
+    return Path(tmpdir)
+
+
+@pytest.mark.skipif(not PYARROW_AVAIL, reason="pyarrow is not available")
+class TestRawStore:
+    def test_roundtrip(self, sddr_folder):
+        csv_data = dict(iter_run_results(sddr_folder, "SDDR"))
+        write_raw_store(sddr_folder)
+        assert Path(sddr_folder, RAW_STORE_FILE).exists()
+        store_data = dict(iter_run_results(sddr_folder, "SDDR"))
+
+        assert list(csv_data) == list(store_data)
+        for case, df in csv_data.items():
+            pd.testing.assert_frame_equal(df, store_data[case])
+
+    def test_filters(self, sddr_folder):
+        write_raw_store(sddr_folder)
+        cases = sorted(read_raw_store(sddr_folder, "SDDR"))
+        data = read_raw_store(sddr_folder, "SDDR", cases=cases[:2])
+        assert list(data) == cases[:2]
+        assert read_raw_store(sddr_folder, "not a result") == {}
+
+    def test_remove(self, sddr_folder):
+        write_raw_store(sddr_folder)
+        remove_raw_store(sddr_folder)
+        assert not Path(sddr_folder, RAW_STORE_FILE).exists()
+        # the .csv files are used again
+        assert len(list(iter_run_results(sddr_folder, "SDDR"))) > 0
+
+
+class TestRawIndex:
+    def test_index(self, sddr_folder):
+        shutil.copy(
+            Path(RAW_ROOT, "_d1s_-_lib 1_", "SphereSDDR", "metadata.json"),
+            sddr_folder,
+        )
+        write_raw_index(sddr_folder)
+        with open(Path(sddr_folder, "metadata.json")) as f:
+            stored = json.load(f)[INDEX_KEY]
+        assert stored["mtime"] == os.stat(sddr_folder).st_mtime_ns
+        index = get_raw_index(sddr_folder)
+        assert index == build_raw_index(sddr_folder)
+        assert len(index["SDDR"]) > 0
+
+        # a new file changes the folder modification time and the index
+        _, file = index["SDDR"][0]
+        shutil.copy(Path(sddr_folder, file), Path(sddr_folder, "NewRun SDDR.csv"))
+        index = get_raw_index(sddr_folder)
+        assert ("NewRun", "NewRun SDDR.csv") in index["SDDR"]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from importlib.resources import files
+from pathlib import Path
+
+import pandas as pd
+
+import tests.dummy_structure as dummy_struct
+from jade.post.excel_processor import ExcelProcessor
+from jade.post.result_cache import RawResultCache
+
+RAW_FOLDER = Path(
+    files(dummy_struct).joinpath("raw_data"), "_mcnp_-_FENDL 3.2c_", "Oktavian"
+)
+
+
+class TestRawResultCache:
+    def test_get_run_results(self):
+        cache = RawResultCache()
+        runs = cache.get_run_results(RAW_FOLDER, "Neutron flux")
+        assert len(runs) > 0
+        assert cache.misses == 1
+        # modifications of the returned dataframes do not affect the cache
+        runs[0][1]["Value"] = 0
+        cached = cache.get_run_results(RAW_FOLDER, "Neutron flux")
+        assert cache.hits == 1
+        assert not (cached[0][1]["Value"] == 0).all()
+
+    def test_eviction(self):
+        sizes = []
+        for result in ["Neutron flux", "Coarse neutron flux"]:
+            cache = RawResultCache()
+            cache.get_run_results(RAW_FOLDER, result)
+            sizes.append(cache.size)
+        # the two results do not fit together in the cache
+        cache = RawResultCache(max_size=max(sizes) + min(sizes) // 2)
+        cache.get_run_results(RAW_FOLDER, "Neutron flux")
+        cache.get_run_results(RAW_FOLDER, "Coarse neutron flux")
+        assert cache.size == sizes[1]
+        cache.get_run_results(RAW_FOLDER, "Neutron flux")
+        assert cache.misses == 3
+        assert cache.size <= cache.max_size
+
+    def test_excel_processor(self):
+        cache = RawResultCache()
+        df = ExcelProcessor._get_table_df(
+            ["Neutron flux", "Coarse neutron flux"], RAW_FOLDER, cache=cache
+        )
+        cached_df = ExcelProcessor._get_table_df(
+            ["Neutron flux", "Coarse neutron flux"], RAW_FOLDER, cache=cache
+        )
+        assert cache.hits == 2
+        pd.testing.assert_frame_equal(df, cached_df)
+        pd.testing.assert_frame_equal(
+            df,
+            ExcelProcessor._get_table_df(
+                ["Neutron flux", "Coarse neutron flux"], RAW_FOLDER
+            ),
+        )
@@ -1,16 +1,117 @@
 from __future__ import annotations
 
+import inspect
+import os
+import time
 from importlib.resources import files
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pytest
+from f4enix.output.mctal import Mctal
 
 import tests.dummy_structure as dummy_struct
 from jade.helper.__optionals__ import OMC_AVAIL
-from jade.post.sim_output import MCNPSimOutput, OpenMCSimOutput
+from jade.helper.errors import TallyNotFoundError
+from jade.post.sim_output import (
+    LazyTallyData,
+    MCNPSimOutput,
+    OpenMCSimOutput,
+    _collapse_cells_segments,
+    _drop_total_rows,
+    _LazyMctal,
+)
 
 SIMULATION_FOLDER = files(dummy_struct).joinpath("simulations")
+# benchmarks are run only if this variable is set
+RUN_BENCHMARKS = os.getenv("JADE_BENCHMARK") is not None
+
+
+@pytest.fixture
+def big_tally() -> pd.DataFrame:
+    # energy x cell tally as produced by the mctal parser, total bins included
+    n_cells = 50
+    energies = [*np.logspace(-3, 1, 199).tolist(), "total"]
+    cells = [*range(1, n_cells + 1), "total"]
+    df = pd.DataFrame(
+        {
+            "Cells": np.repeat(np.array(cells, dtype=object), len(energies)),
+            "Energy": np.tile(np.array(energies, dtype=object), len(cells)),
+        }
+    )
+    df["Value"] = np.random.default_rng(0).random(len(df))
+    df["Error"] = 0.1
+    return df
+
+
+def _old_drop_total_rows(df: pd.DataFrame) -> None:
+    # previous row-wise implementation, kept as reference
+    if "total" in df.values:
+        df.drop(
+            df[
+                df.apply(
+                    lambda row: row.astype(str).str.contains("total").any(), axis=1
+                )
+            ].index,
+            inplace=True,
+        )
+
+
+def test_drop_total_rows(big_tally):
+    old = big_tally.copy()
+    new = big_tally.copy()
+    _old_drop_total_rows(old)
+    _drop_total_rows(new)
+
+    pd.testing.assert_frame_equal(old, new)
+    assert len(new) == 50 * 199
+
+
+@pytest.mark.skipif(not RUN_BENCHMARKS, reason="JADE_BENCHMARK is not set")
+def test_drop_total_rows_benchmark():
+    # largest mctal of the test simulations, all its tallies have total bins
+    mctal = Mctal(
+        str(
+            Path(
+                SIMULATION_FOLDER,
+                "_mcnp_-_FENDL 2.1c_",
+                "ITER_1D",
+                "ITER_1D",
+                "ITER_1D.m",
+            )
+        )
+    )
+    old = [df.copy() for df in mctal.tallydata.values()]
+    new = [df.copy() for df in mctal.tallydata.values()]
+
+    start = time.perf_counter()
+    for df in old:
+        _old_drop_total_rows(df)
+    old_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for df in new:
+        _drop_total_rows(df)
+    new_time = time.perf_counter() - start
+
+    for old_df, new_df in zip(old, new):
+        pd.testing.assert_frame_equal(old_df, new_df)
+    print(f"drop total rows: old {old_time:.3f} s, new {new_time:.3f} s")
+    assert new_time * 10 < old_time
+
+
+def test_collapse_cells_segments():
+    df = pd.DataFrame(
+        {
+            "Cells": [10.0, 10.0, 2.0, 2.0, 10.0],
+            "Segments": [1.0, 2.0, 1.0, 2.0, 1.0],
+            "Energy": [1, 1, 1, 1, 2],
+            "Value": [1, 2, 3, 4, 5],
+        }
+    )
+    _collapse_cells_segments(df)
+    assert list(df.columns) == ["Energy", "Value", "Cells-Segments"]
+    assert df["Cells-Segments"].tolist() == ["10-1", "10-2", "2-1", "2-2", "10-1"]
 
 
 @pytest.fixture
@@ -45,6 +146,97 @@ class TestMCNPSimOutput:
             isinstance(comment, str) for comment in mcnp_sim_output.tally_comments
         )
 
+    def test_mcnp_lazy_parsing(self, mcnp_sim_output):
+        # nothing is converted or parsed until it is requested
+        assert mcnp_sim_output.tallydata.loaded == []
+        assert mcnp_sim_output._out is None
+        tallynum = next(iter(mcnp_sim_output.tallydata))
+        df = mcnp_sim_output.tallydata[tallynum]
+        assert isinstance(df, pd.DataFrame)
+        assert mcnp_sim_output.tallydata.loaded == [tallynum]
+        # the conversion is cached
+        assert mcnp_sim_output.tallydata[tallynum] is df
+        assert mcnp_sim_output._out is None
+
+    def test_mcnp_single_tally_conversion(self):
+        # the single tally conversion relies on the private f4enix Mctal._get_dfs,
+        # which must convert only the tallies listed in self.tallies
+        assert list(inspect.signature(Mctal._get_dfs).parameters) == [
+            "self",
+            "collapse",
+        ]
+        folder = Path(
+            SIMULATION_FOLDER, "_mcnp_-_FENDL 3.2c_", "Oktavian", "Oktavian_Al"
+        )
+        mctal_file = MCNPSimOutput.retrieve_files(folder)[0]
+        full = Mctal(mctal_file)
+        lazy = _LazyMctal(mctal_file)
+        for tally in lazy.tallies:
+            df, dftotal = lazy.get_tally_dfs(tally)
+            pd.testing.assert_frame_equal(df, full.tallydata[tally.tallyNumber])
+            pd.testing.assert_frame_equal(dftotal, full.totalbin[tally.tallyNumber])
+
+    def test_mcnp_missing_tally(self, mcnp_sim_output):
+        with pytest.raises(TallyNotFoundError):
+            mcnp_sim_output._get_tally(999999)
+
+    def test_mcnp_tallies_only(self):
+        folder = Path(
+            SIMULATION_FOLDER, "_mcnp_-_FENDL 3.2c_", "Oktavian", "Oktavian_Al"
+        )
+        sim_output = MCNPSimOutput(folder, tallies_only=True)
+        version = sim_output._read_code_version()
+        assert sim_output.stat_checks is None
+        # the output file was never fully parsed
+        assert sim_output._out is None
+        assert version == MCNPSimOutput(folder)._read_code_version()
+
+    def test_mcnp_meshtal(self):
+        folder = Path(
+            SIMULATION_FOLDER, "_mcnp_-_FENDL 3.2c_", "HCPB_TBM_1D", "HCPB_TBM_1D"
+        )
+        sim_output = MCNPSimOutput(folder)
+        mesh_ids = sim_output._meshtal.mesh_ids
+        assert len(mesh_ids) > 0
+        for tallynum in mesh_ids:
+            assert tallynum in sim_output.tallydata
+            assert isinstance(sim_output.tallydata[tallynum], pd.DataFrame)
+            assert sim_output.totalbin[tallynum] is None
+
+
+class TestLazyTallyData:
+    def test_lazy_loading(self):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return pd.DataFrame({"Value": [1]})
+
+        data = LazyTallyData({4: loader})
+        assert 4 in data
+        assert calls == []
+        assert data[4]["Value"].iloc[0] == 1
+        data[4]
+        assert len(calls) == 1
+
+    def test_missing_tally(self):
+        def loader():
+            raise TallyNotFoundError(2)
+
+        data = LazyTallyData({2: loader, 4: lambda: None})
+        assert data.get(2) is None
+        assert 2 not in data
+        assert list(data.items()) == [(4, None)]
+
+    def test_loader_error(self):
+        def loader():
+            # a bug in the conversion, not a missing tally
+            raise KeyError("Energy")
+
+        data = LazyTallyData({2: loader})
+        with pytest.raises(KeyError, match="Energy"):
+            data[2]
+
 
 @pytest.mark.skipif(not OMC_AVAIL, reason="OpenMC is not available")
 class TestOpenMCSimoutput:
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from jade.config.raw_config import ResultConfig, TallyConcatOption, TallyModOption
+from jade.post import manipulate_tally
+from jade.post.tally_pipeline import TallyPipeline
+
+
+def _tallies() -> dict[int, pd.DataFrame]:
+    energy = np.logspace(-2, 1, 20)
+    return {
+        4: pd.DataFrame({"Energy": energy, "Value": energy * 2, "Error": 0.1}),
+        14: pd.DataFrame({"Energy": energy, "Value": energy * 3, "Error": 0.2}),
+    }
+
+
+def _naive(result: ResultConfig, tallies: dict[int, pd.DataFrame]):
+    # previous implementation: each result modifies its own copy of the tallies
+    mod_tallies = []
+    for tallyid, modifications in result.modify.items():
+        tally = tallies[tallyid].copy()
+        for mod_option, keyargs in modifications:
+            tally = manipulate_tally.MOD_FUNCTIONS[mod_option](tally, **keyargs)
+        mod_tallies.append(tally)
+    return mod_tallies
+
+
+LETHARGY = (TallyModOption.LETHARGY, {})
+SCALE = (TallyModOption.SCALE, {"factor": 2})
+CONDENSE = (TallyModOption.CONDENSE_GROUPS, {"bins": [0, 0.1, 1, 10]})
+RESULTS = [
+    ResultConfig(1, {4: [LETHARGY]}, TallyConcatOption.NO_ACTION),
+    ResultConfig(2, {4: [LETHARGY, SCALE]}, TallyConcatOption.NO_ACTION),
+    ResultConfig(3, {4: [LETHARGY, CONDENSE, SCALE]}, TallyConcatOption.NO_ACTION),
+    ResultConfig(4, {4: [], 14: [SCALE]}, TallyConcatOption.CONCAT),
+    ResultConfig(5, {4: [CONDENSE], 14: [LETHARGY]}, TallyConcatOption.SUM),
+    ResultConfig(6, {4: [LETHARGY, SCALE, SCALE]}, TallyConcatOption.NO_ACTION),
+]
+
+
+class TestTallyPipeline:
+    def test_run(self):
+        tallies = _tallies()
+        pipeline = TallyPipeline(RESULTS)
+        for result, mod_tallies, missing in pipeline.run(tallies):
+            assert missing == []
+            expected = _naive(result, _tallies())
+            assert len(mod_tallies) == len(expected)
+            for tally, exp in zip(mod_tallies, expected):
+                pd.testing.assert_frame_equal(tally, exp)
+        # the original tallies are never modified
+        for tallyid, tally in _tallies().items():
+            pd.testing.assert_frame_equal(tallies[tallyid], tally)
+
+    def test_outputs_not_modified(self):
+        # all the outputs are collected before being compared, later results must
+        # not modify the tallies already given to the caller
+        outputs = list(TallyPipeline(RESULTS).run(_tallies()))
+        assert len(outputs) == len(RESULTS)
+        for result, mod_tallies, _ in outputs:
+            for tally, exp in zip(mod_tallies, _naive(result, _tallies())):
+                pd.testing.assert_frame_equal(tally, exp)
+
+    def test_shared_prefix(self, monkeypatch):
+        calls = []
+
+        def lethargy(tally):
+            calls.append(1)
+            return manipulate_tally.by_lethargy(tally)
+
+        monkeypatch.setitem(
+            manipulate_tally.MOD_FUNCTIONS, TallyModOption.LETHARGY, lethargy
+        )
+        outputs = list(TallyPipeline(RESULTS).run(_tallies()))
+        assert len(outputs) == len(RESULTS)
+        # once for tally 4 (shared by 4 results) and once for tally 14
+        assert len(calls) == 2
+
+    def test_copies(self, monkeypatch):
+        copies = []
+        copy = pd.DataFrame.copy
+
+        def counted_copy(self, *args, **kwargs):
+            # pandas may copy internally, count only the copies of the pipeline
+            if sys._getframe(1).f_globals["__name__"] == "jade.post.tally_pipeline":
+                copies.append(1)
+            return copy(self, *args, **kwargs)
+
+        monkeypatch.setattr(pd.DataFrame, "copy", counted_copy)
+        results = [
+            ResultConfig(1, {4: [LETHARGY, SCALE, SCALE]}, TallyConcatOption.NO_ACTION),
+            # read only modifications do not need a copy
+            ResultConfig(2, {14: [CONDENSE, SCALE]}, TallyConcatOption.NO_ACTION),
+            ResultConfig(3, {14: []}, TallyConcatOption.NO_ACTION),
+        ]
+        list(TallyPipeline(results).run(_tallies()))
+        assert len(copies) == 1
+
+    def test_missing_tally(self):
+        results = [ResultConfig(1, {4: [], 24: [SCALE]}, TallyConcatOption.CONCAT)]
+        _, mod_tallies, missing = next(TallyPipeline(results).run(_tallies()))
+        assert len(mod_tallies) == 1
+        assert missing == [24]
+
+    def test_get_keyargs(self):
+        results = [
+            ResultConfig(1, {4: [(TallyModOption.SCALE, {})]}, TallyConcatOption.SUM)
+        ]
+
+        def get_keyargs(mod_option, keyargs):
+            return {"factor": 10}
+
+        _, mod_tallies, _ = next(TallyPipeline(results).run(_tallies(), get_keyargs))
+        assert (mod_tallies[0]["Value"] == _tallies()[4]["Value"] * 10).all()
@@ -24,7 +24,9 @@ from jade.run.benchmark import (
     SingleRunOpenMC,
     SphereBenchmarkRun,
     SphereSDDRBenchmarkRun,
+    launch_global_jobs,
 )
+from jade.run.local_pool import LocalRun
 from tests.run import resources
 
 DEFAULT_CFG = files(res).joinpath("default_cfg")
@@ -149,6 +151,87 @@ class TestBenchmarkRun:
         assert commands[0][0] == CODE.MCNP
         assert "srun" in commands[0][1][0]
 
+    def test_global_run_packed(self, tmpdir, monkeypatch):
+        lib = LibraryMCNP(
+            name="FENDL 3.2c", path=RUN_RES.joinpath("xsdir.txt"), suffix="31c"
+        )
+        cfg = BenchmarkRunConfig(
+            description="Oktavian TOF",
+            name="Oktavian",
+            run=[(CODE.MCNP, lib)],
+            nps=10,
+            only_input=False,
+        )
+        # fake scheduler recording its arguments
+        scheduler = Path(tmpdir, "fake_sbatch")
+        with open(scheduler, "w") as f:
+            f.write('#!/bin/sh\necho "$@" >> "$(dirname "$0")/submitted.txt"\n')
+        os.chmod(scheduler, 0o755)
+        env_vars = EnvironmentVariables(
+            1,
+            4,
+            {CODE.MCNP: "mcnp6.2"},
+            run_mode=RunMode.GLOBAL_JOB,
+            code_job_template={
+                CODE.MCNP: Path(DEFAULT_CFG, "exe_config/mcnp_template.sh")
+            },
+            scheduler_command=str(scheduler),
+            exe_cfg_root=DEFAULT_CFG.joinpath("exe_config"),
+            global_jobs=2,
+        )
+        commands = BenchmarkRun(
+            cfg, Path(tmpdir, "sim"), BENCHMARKS_ROOT, env_vars
+        ).run()
+        assert len(commands) == 2
+
+        scripts = launch_global_jobs(commands, env_vars, test=True)
+        assert len(scripts) == 2
+        for script in scripts:
+            assert script.count("cd ") == 1
+
+        # one array job with an index file
+        env_vars.job_array = True
+        monkeypatch.chdir(tmpdir)
+        scripts = launch_global_jobs(commands, env_vars)
+        assert len(scripts) == 1
+        assert "SLURM_ARRAY_TASK_ID" in scripts[0]
+        # each task has its own scheduler logs
+        assert f'"{Path(tmpdir, "job_mcnp_%A_%a.out")}"' in scripts[0]
+        with open(Path(tmpdir, "job_mcnp_index.txt")) as f:
+            tasks = [line.split("\t")[0] for line in f.read().splitlines()]
+        assert tasks == ["1", "2"]
+        with open(Path(tmpdir, "submitted.txt")) as f:
+            assert f.read().split() == ["--array=1-2", str(Path(tmpdir, "job_mcnp"))]
+
+    def test_local_pool_run(self, tmpdir):
+        lib = LibraryMCNP(
+            name="FENDL 3.2c", path=RUN_RES.joinpath("xsdir.txt"), suffix="31c"
+        )
+        cfg = BenchmarkRunConfig(
+            description="Oktavian TOF",
+            name="Oktavian",
+            run=[(CODE.MCNP, lib)],
+            nps=10,
+            only_input=False,
+        )
+        env_vars = EnvironmentVariables(
+            1,
+            4,
+            {CODE.MCNP: "mcnp6.2"},
+            run_mode=RunMode.LOCAL_POOL,
+            max_concurrent_runs=1,
+        )
+
+        benchmark = BenchmarkRun(cfg, tmpdir, BENCHMARKS_ROOT, env_vars)
+        # the simulations are only queued
+        runs = benchmark.run()
+        assert len(runs) == 2
+        for code, run, folder in runs:
+            assert isinstance(run, LocalRun)
+            assert run.sim_folder == folder
+            assert run.command[0] == "mcnp6.2"
+            assert run.env == {"DATAPATH": str(Path(lib.path).parent)}
+
 
 class TestSphereBenchmarkRun:
     def test_run_mcnp(self, tmpdir):
@@ -183,6 +266,55 @@ class TestSphereBenchmarkRun:
             == 2
         )
 
+    def test_run_job_array(self, tmpdir):
+        lib = LibraryMCNP(
+            name="FENDL 3.2c", path=RUN_RES.joinpath("xsdir.txt"), suffix="31c"
+        )
+        cfg = BenchmarkRunConfig(
+            description="Sphere benchmark",
+            name="Sphere",
+            run=[(CODE.MCNP, lib)],
+            nps=10,
+            only_input=False,
+            custom_inp=2,
+            additional_settings_path=DEFAULT_CFG.joinpath("benchmarks/Sphere"),
+        )
+        # fake scheduler recording its arguments
+        scheduler = Path(tmpdir, "fake_sbatch")
+        with open(scheduler, "w") as f:
+            f.write('#!/bin/sh\necho "$@" >> "$(dirname "$0")/submitted.txt"\n')
+        os.chmod(scheduler, 0o755)
+        env_vars = EnvironmentVariables(
+            None,
+            0,
+            {CODE.MCNP: "mcnp6.2"},
+            run_mode=RunMode.JOB_SUBMISSION,
+            code_job_template={
+                CODE.MCNP: Path(DEFAULT_CFG, "exe_config/mcnp_template.sh")
+            },
+            scheduler_command=str(scheduler),
+            exe_cfg_root=DEFAULT_CFG.joinpath("exe_config"),
+            job_array=True,
+        )
+        sim_root = Path(tmpdir, "sim")
+        runs = SphereBenchmarkRun(cfg, sim_root, BENCHMARKS_ROOT, env_vars).run()
+        assert len(runs) == 4
+
+        # a single submission for all the runs
+        with open(Path(tmpdir, "submitted.txt")) as f:
+            submitted = f.read().splitlines()
+        assert submitted == [f"--array=1-4 {Path(sim_root, 'Sphere_mcnp')}"]
+        with open(Path(sim_root, "Sphere_mcnp")) as f:
+            assert str(Path(sim_root, "Sphere_mcnp_%A_%a.err")) in f.read()
+        with open(Path(sim_root, "Sphere_mcnp_index.txt")) as f:
+            lines = [line.split("\t") for line in f.read().splitlines()]
+        assert [line[0] for line in lines] == ["1", "2", "3", "4"]
+        assert sorted(line[1] for line in lines) == sorted(str(r[2]) for r in runs)
+        assert lines[0][2].startswith('export DATAPATH="')
+        # no job script in the single run folders
+        for _, _, folder in runs:
+            assert not any(f.endswith("_job_script") for f in os.listdir(folder))
+
     @pytest.mark.skipif(not OMC_AVAIL, reason="OpenMC not available")
     def test_run_openmc(self, tmpdir):
         with as_file(RUN_RES.joinpath("cross_sections.xml")) as infile:
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from jade.run.job_array import (
+    array_log_suffix,
+    array_script_body,
+    array_submit_options,
+    build_index,
+)
+
+
+class TestJobArray:
+    @pytest.mark.parametrize(
+        ["scheduler", "expected"],
+        [
+            ["sbatch", ["--array=1-4"]],
+            ["/opt/pbs/bin/qsub", ["-t", "1-4"]],
+            ["bsub", ["-J", "JADE[1-4]"]],
+        ],
+    )
+    def test_array_submit_options(self, scheduler, expected):
+        assert array_submit_options(scheduler, 4) == expected
+
+    def test_array_submit_options_configured(self):
+        # PBS Pro uses -J instead of the Torque -t option
+        assert array_submit_options("qsub", 4, "-J 1-{n}") == ["-J", "1-4"]
+
+    @pytest.mark.parametrize(
+        ["scheduler", "option", "expected"],
+        [
+            ["sbatch", None, "_%A_%a"],
+            ["qsub", None, ""],
+            ["qsub", "-J 1-{n}", "_^array_index^"],
+            ["bsub", None, "_%J_%I"],
+        ],
+    )
+    def test_array_log_suffix(self, scheduler, option, expected):
+        assert array_log_suffix(scheduler, option) == expected
+
+    @pytest.mark.skipif(sys.platform.startswith("win"), reason="needs a POSIX shell")
+    @pytest.mark.parametrize(
+        "variable", ["SLURM_ARRAY_TASK_ID", "PBS_ARRAYID", "LSB_JOBINDEX"]
+    )
+    def test_array_script(self, tmpdir, variable):
+        folders = [Path(tmpdir, f"run {i}") for i in range(3)]
+        for folder in folders:
+            os.makedirs(folder)
+        # each run writes a file in its folder
+        tasks = [
+            [(folders[0], "echo a > out.txt"), (folders[1], "echo b > out.txt")],
+            [(folders[2], 'echo "c d" > out.txt')],
+        ]
+        index_file = Path(tmpdir, "index.txt")
+        with open(index_file, "w") as f:
+            f.write(build_index(tasks))
+        script = Path(tmpdir, "job.sh")
+        with open(script, "w") as f:
+            f.write("#!/bin/sh" + os.linesep + array_script_body(index_file))
+
+        env = {k: v for k, v in os.environ.items() if k != "SLURM_ARRAY_TASK_ID"}
+        subprocess.run(["sh", str(script)], env={**env, variable: "1"}, check=True)
+        assert os.listdir(folders[2]) == []
+        for folder, expected in zip(folders[:2], ["a", "b"]):
+            with open(Path(folder, "out.txt")) as f:
+                assert f.read().strip() == expected
+
+        subprocess.run(["sh", str(script)], env={**env, variable: "2"}, check=True)
+        with open(Path(folders[2], "out.txt")) as f:
+            assert f.read().strip() == "c d"
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+from jade.run.local_pool import RUN_ERR_LOG, RUN_LOG, LocalRun, run_local_pool
+
+# records start and end time of the run and prints an environment variable
+SCRIPT = (
+    "import os, sys, time; "
+    "open('start', 'w').write(str(time.time())); "
+    "time.sleep(0.3); "
+    "print(os.environ['JADE_TEST_VAR']); "
+    "open('end', 'w').write(str(time.time())); "
+    "sys.exit(int(os.environ['JADE_TEST_EXIT']))"
+)
+
+
+def _run(folder: Path, exit_code: int = 0) -> LocalRun:
+    os.makedirs(folder)
+    command = [f'"{sys.executable}"', "-c", f'"{SCRIPT}"']
+    env = {"JADE_TEST_VAR": folder.name, "JADE_TEST_EXIT": str(exit_code)}
+    return LocalRun(command, folder, env)
+
+
+def _read_time(folder: Path, name: str) -> float:
+    with open(Path(folder, name)) as f:
+        return float(f.read())
+
+
+class TestLocalPool:
+    def test_run_local_pool(self, tmpdir):
+        runs = [_run(Path(tmpdir, f"run_{i}")) for i in range(6)]
+        runs.append(_run(Path(tmpdir, "failing"), exit_code=3))
+        failed = run_local_pool(runs, 2)
+        assert failed == [Path(tmpdir, "failing")]
+
+        intervals = []
+        for run in runs:
+            # per-run logs
+            with open(Path(run.sim_folder, RUN_LOG)) as f:
+                assert f.read().strip() == run.name
+            assert os.path.exists(Path(run.sim_folder, RUN_ERR_LOG))
+            intervals.append(
+                (_read_time(run.sim_folder, "start"), _read_time(run.sim_folder, "end"))
+            )
+        # never more than two simulations at the same time
+        for start, _ in intervals:
+            running = [1 for s, e in intervals if s <= start < e]
+            assert len(running) <= 2
+        # but they did run concurrently
+        overlaps = [1 for s, e in intervals for s2, _ in intervals if s < s2 < e]
+        assert len(overlaps) > 0
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+import tests.dummy_structure as dummy_struct
+from jade.helper.constants import CODE
+from jade.run.monitor import RunMonitor
+from jade.run.scheduling import METADATA_FILE
+
+CODELIB = "_mcnp_-_FENDL 3.2c_"
+OKTAVIAN = Path(str(dummy_struct.__path__[0]), "simulations", CODELIB, "Oktavian")
+
+
+def _prepare(root: Path) -> tuple[Path, Path]:
+    """Copy the Oktavian simulations, removing the outputs of the Al run."""
+    bench = Path(root, CODELIB, "Oktavian")
+    shutil.copytree(OKTAVIAN, bench)
+    run_folder = Path(bench, "Oktavian_Al")
+    outputs = Path(root.parent, "outputs")
+    os.mkdir(outputs)
+    for ext in [".m", ".o"]:
+        shutil.move(Path(run_folder, "Oktavian_Al" + ext), outputs)
+    with open(Path(run_folder, METADATA_FILE)) as f:
+        metadata = json.load(f)
+    metadata["nps"] = 1000
+    with open(Path(run_folder, METADATA_FILE), "w") as f:
+        json.dump(metadata, f)
+    return run_folder, outputs
+
+
+class TestRunMonitor:
+    def test_poll(self, tmpdir):
+        sim_root = Path(tmpdir, "simulations")
+        run_folder, outputs = _prepare(sim_root)
+        completed = []
+        monitor = RunMonitor(sim_root, completed.append)
+        # the completed run is not followed
+        assert [run.name for run in monitor.pending] == ["Oktavian_Al"]
+        run = monitor.pending[0]
+        assert run.code == CODE.MCNP
+        assert run.lib == "FENDL 3.2c"
+        assert run.nps == 1000
+
+        assert monitor.poll() == []
+        assert run.started is None
+
+        # the simulation starts and completes
+        shutil.copy(Path(outputs, "Oktavian_Al.o"), run_folder)
+        assert monitor.poll() == []
+        assert run.started is not None
+        shutil.copy(Path(outputs, "Oktavian_Al.m"), run_folder)
+        # outputs must be stable for a poll before the run is considered completed
+        assert monitor.poll() == []
+        run.started -= 10
+        assert monitor.poll() == [run]
+        assert completed == [run]
+        assert run.wall_time >= 10
+        assert run.histories_per_second <= 100
+        assert monitor.pending == []
+        assert monitor.watch(poll_interval=0) == []
+
+    def test_new_runs_and_errors(self, tmpdir):
+        sim_root = Path(tmpdir, "simulations")
+        os.mkdir(sim_root)
+        monitor = RunMonitor(sim_root, on_complete=lambda run: 1 / 0)
+        assert monitor.pending == []
+
+        # runs created after the start of the monitor are followed
+        run_folder, outputs = _prepare(sim_root)
+        monitor.poll()
+        assert len(monitor.pending) == 2
+        for file in os.listdir(outputs):
+            shutil.copy(Path(outputs, file), run_folder)
+        with open(Path(run_folder, METADATA_FILE)) as f:
+            metadata = json.load(f)
+        metadata["wall_time"] = 20
+        with open(Path(run_folder, METADATA_FILE), "w") as f:
+            json.dump(metadata, f)
+        # errors in the callback do not stop the monitor
+        assert [run.name for run in monitor.poll()] == ["Oktavian_Co"]
+        assert [run.name for run in monitor.poll()] == ["Oktavian_Al"]
+        run = monitor.completed[0]
+        assert run.wall_time == 20
+        assert run.histories_per_second == 50
+        # no throughput without the number of histories
+        assert monitor.completed[1].histories_per_second is None
+
+        # the runs are not followed again
+        monitor.poll()
+        assert len(monitor.completed) == 2
+
+    def test_watch_timeout(self, tmpdir):
+        sim_root = Path(tmpdir, "simulations")
+        _prepare(sim_root)
+        monitor = RunMonitor(sim_root, benchmarks=["Oktavian"])
+        pending = monitor.watch(poll_interval=0.01, timeout=0.05)
+        assert [run.name for run in pending] == ["Oktavian_Al"]
+        assert RunMonitor(sim_root, benchmarks=["Sphere"]).pending == []
+
+    def test_stalled(self, tmpdir):
+        sim_root = Path(tmpdir, "simulations")
+        run_folder, outputs = _prepare(sim_root)
+        monitor = RunMonitor(sim_root, stall_polls=2)
+        run = monitor.pending[0]
+        monitor.poll()
+        # new files reset the count
+        shutil.copy(Path(outputs, "Oktavian_Al.o"), run_folder)
+        monitor.poll()
+        monitor.poll()
+        assert monitor.pending == [run]
+        monitor.poll()
+        assert monitor.pending == []
+        assert monitor.stalled == [run]
+        assert run.completed is None
+        # the stalled runs are reported when the monitor stops
+        assert monitor.watch(poll_interval=0) == [run]
+
+    def test_not_started(self, tmpdir):
+        sim_root = Path(tmpdir, "simulations")
+        _prepare(sim_root)
+        # runs waiting to start are not considered stalled
+        monitor = RunMonitor(sim_root, stall_polls=1, wait_polls=3)
+        run = monitor.pending[0]
+        monitor.poll()
+        monitor.poll()
+        assert monitor.pending == [run]
+        # but they are not waited for with no limit
+        assert monitor.watch(poll_interval=0) == [run]
+        assert run.stalled
+        assert run.started is None
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from jade.run.scheduling import (
+    ESTIMATED_WALL_TIME_KEY,
+    METADATA_FILE,
+    WALL_TIME_KEY,
+    carry_wall_time,
+    estimate_costs,
+    pack_runs,
+    read_wall_times,
+    record_wall_time,
+    sort_longest_first,
+)
+
+
+def _sim_folder(root: Path, name: str, **metadata) -> Path:
+    folder = Path(root, name)
+    os.makedirs(folder)
+    with open(Path(folder, METADATA_FILE), "w") as f:
+        json.dump(metadata, f)
+    return folder
+
+
+def _read(folder: Path) -> dict:
+    with open(Path(folder, METADATA_FILE)) as f:
+        return json.load(f)
+
+
+class TestScheduling:
+    def test_carry_wall_time(self, tmpdir):
+        old_root = Path(tmpdir, "old")
+        folder = _sim_folder(old_root, "Sphere_1001", code="mcnp", nps=1000)
+        record_wall_time(folder, 20.0)
+        _sim_folder(old_root, "Sphere_1002", code="mcnp", nps=1000)
+        # existing metadata are preserved
+        assert _read(folder)["code"] == "mcnp"
+        previous = read_wall_times(old_root)
+        assert previous == {"Sphere_1001": (20.0, 1000)}
+        assert read_wall_times(Path(tmpdir, "missing")) == {}
+
+        new_root = Path(tmpdir, "new")
+        new_folder = _sim_folder(new_root, "Sphere_1001", code="mcnp", nps=2000)
+        other = _sim_folder(new_root, "Sphere_1002", code="mcnp", nps=2000)
+        carry_wall_time(new_folder, previous)
+        carry_wall_time(other, previous)
+        assert _read(new_folder)[ESTIMATED_WALL_TIME_KEY] == 40.0
+        assert ESTIMATED_WALL_TIME_KEY not in _read(other)
+        assert WALL_TIME_KEY not in _read(new_folder)
+
+    def test_estimate_costs(self, tmpdir):
+        kwargs = {ESTIMATED_WALL_TIME_KEY: 100.0}
+        folders = [
+            _sim_folder(tmpdir, "a", code="mcnp", library="00c", nps=10, **kwargs),
+            # time per history from the same code-library
+            _sim_folder(tmpdir, "b", code="mcnp", library="00c", nps=20),
+            # time per history from the same code
+            _sim_folder(tmpdir, "c", code="mcnp", library="31c", nps=5),
+            # default time per history
+            _sim_folder(tmpdir, "d", code="openmc", library="31c", nps=10),
+            # no metadata at all
+            Path(tmpdir, "e"),
+        ]
+        costs = estimate_costs(folders)
+        assert costs[:3] == [100.0, 200.0, 50.0]
+        assert 0 < costs[3] < 1
+        assert costs[4] == 0
+
+    def test_sort_longest_first(self, tmpdir):
+        folders = [
+            _sim_folder(tmpdir, "short", code="mcnp", nps=10),
+            _sim_folder(tmpdir, "long", code="mcnp", nps=1000),
+            _sim_folder(tmpdir, "short_2", code="mcnp", nps=10),
+            _sim_folder(tmpdir, "timed", nps=10, **{ESTIMATED_WALL_TIME_KEY: 500}),
+        ]
+        items = [(folder.name, folder) for folder in folders]
+        ordered = sort_longest_first(items, lambda x: x[1])
+        # equal estimates keep their order
+        assert [name for name, _ in ordered] == ["timed", "long", "short", "short_2"]
+
+    def test_pack_runs(self, tmpdir):
+        costs = [70, 60, 50, 40, 30, 20, 10, 5]
+        folders = [
+            _sim_folder(tmpdir, f"run_{i}", nps=1, **{ESTIMATED_WALL_TIME_KEY: cost})
+            for i, cost in enumerate(costs)
+        ]
+        groups = pack_runs(folders, lambda x: x, 3)
+        assert len(groups) == 3
+        assert sorted(folder for group in groups for folder in group) == folders
+        totals = [sum(costs[folders.index(f)] for f in group) for group in groups]
+        assert max(totals) - min(totals) <= 10
+        # each group runs its longest simulations first
+        for group in groups:
+            assert group == sorted(group, key=lambda f: -costs[folders.index(f)])
+
+        # empty groups are dropped
+        assert len(pack_runs(folders[:2], lambda x: x, 5)) == 2
+        assert pack_runs(folders, lambda x: x, 1) == [folders]